@@ -1,34 +1,205 @@
-# 초기 설정
-타자목록 = get_팀_타자_csv
-투수정보 = get_예상_선발_투수_csv
-
-def 초기_개체_생성():
-    return 무작위로_타자_9명_선택_및_타순_랜덤_배열(타자목록)
-
-def 적합도(라인업):
-    return 승률_또는_득점_예측(라인업, 투수정보)
-
-# 초기 개체군 생성
-population = [초기_개체_생성() for _ in range(초기개체수)]
-
-for 세대 in range(최대세대수):
-    # 각 개체의 적합도 계산
-    fitness_scores = [적합도(p) for p in population]
-
-    # 상위 개체 선발
-    elite = 상위_n_개체_선택(population, fitness_scores, n=elitism_size)
-
-    # 새로운 개체군 생성
-    new_population = elite.copy()
-    while len(new_population) < 초기개체수:
-        부모1, 부모2 = 선택(population, fitness_scores)
-        자식1, 자식2 = 교차(부모1, 부모2)
-        자식1 = 돌연변이(자식1)
-        자식2 = 돌연변이(자식2)
-        new_population.extend([자식1, 자식2])
-
-    population = new_population[:초기개체수]
-
-# 최종 최적 라인업
-최적_라인업 = population[적합도_가장높은_인덱스]
-출력(최적_라인업)
+# 유전 알고리즘 기반 타순 추천
+# 적합도 = final_simulation_v6 엔진으로 상대 팀과 경기를 시뮬레이션한 승률
+#  - 세대별 개체군 적합도를 프로세스 풀에서 병렬 평가
+#  - 타순(튜플)별 적합도 캐시 → 엘리트/중복 자식은 재시뮬레이션하지 않음
+#  - 모든 타순이 같은 경기 번호별 용도별 난수 스트림(seed_game_streams)을 사용(common random numbers)해 적합도 잡음 감소
+#    타석마다 스트림을 다시 맞추므로 타순에 따라 난수 사용량이 달라도 이후 타석의 난수가 어긋나지 않음
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "StatizCrawling"))
+
+import final_simulation_v6 as sim  # noqa: E402
+import season_simulation  # noqa: E402
+
+# ========== 설정 파라미터 ==========
+POPULATION_SIZE = 30
+MAX_GENERATIONS = 20
+ELITISM_SIZE = 4
+TOURNAMENT_SIZE = 3
+CROSSOVER_RATE = 0.9
+MUTATION_RATE = 0.3
+GAMES_PER_EVALUATION = 300
+MIN_PA = 100  # 후보 타자 최소 타석 수
+FITNESS_SEED = 2025  # 모든 타순이 공유하는 경기별 난수 스트림의 마스터 시드
+
+
+# ========== 후보 타자 ==========
+def get_team_hitters(team_name, year=season_simulation.SEASON_YEAR, min_pa=MIN_PA):
+    """팀 타자 후보 (해당 시즌 min_pa 타석 이상, 타석 수 순)"""
+    hitters = sim.hitters_df[(sim.hitters_df["Year"] == year) & (sim.hitters_df["Team"] == team_name)]
+    hitters = hitters[(hitters["PA"] >= min_pa) & hitters["Player"].isin(sim.hitter_ids)]
+    return hitters.sort_values("PA", ascending=False)["Player"].drop_duplicates().tolist()
+
+
+# ========== 적합도 평가 (워커) ==========
+_fitness_context = {}
+
+
+def _init_fitness_worker(our_roster, opponent_team, games, seed):
+    _fitness_context.update(our_roster=our_roster, opponent_team=opponent_team, games=games, seed=seed)
+
+
+def evaluate_lineup(lineup):
+    """
+    타순 하나의 적합도 (상대 팀 선발 상대로 원정/홈 번갈아 games 경기)
+    returns: (승률, 경기당 득점)
+    """
+    ctx = _fitness_context
+    roster = ctx["our_roster"]
+    our_team = sim.create_team(roster["name"], list(lineup), roster["rotation"][0], roster["bullpen"])
+    opponent = ctx["opponent_team"]
+
+    wins = runs = 0
+    for game_index in range(ctx["games"]):
+        sim.seed_game_streams(ctx["seed"], game_index)
+        if game_index % 2 == 0:
+            ours, theirs = sim.play_game(our_team, opponent)
+        else:
+            theirs, ours = sim.play_game(opponent, our_team)
+        wins += ours > theirs
+        runs += ours
+    sim.share_random_streams()
+
+    return wins / ctx["games"], runs / ctx["games"]
+
+
+# ========== 유전 연산 ==========
+def create_individual(hitter_pool):
+    """무작위로 타자 9명 선택 및 타순 랜덤 배열"""
+    return tuple(random.sample(hitter_pool, 9))
+
+
+def tournament_select(population, fitness):
+    """토너먼트 선택 (개체 수가 TOURNAMENT_SIZE보다 적으면 전체에서 선택)"""
+    contenders = random.sample(population, min(TOURNAMENT_SIZE, len(population)))
+    return max(contenders, key=fitness.get)
+
+
+def crossover(parent1, parent2, hitter_pool):
+    """
+    순서 교차(OX): parent1의 구간을 그대로 두고 나머지 자리를 parent2 순서대로 채움
+    (같은 선수가 두 번 들어가지 않도록 하고, 모자라면 후보군에서 보충)
+    """
+    i, j = sorted(random.sample(range(10), 2))
+    child = [None] * 9
+    child[i:j] = parent1[i:j]
+    used = set(parent1[i:j])
+    fill = [h for h in parent2 + parent1 + tuple(hitter_pool) if h not in used]
+    fill = list(dict.fromkeys(fill))
+    for k in range(9):
+        if child[k] is None:
+            child[k] = fill.pop(0)
+    return tuple(child)
+
+
+def mutate(lineup, hitter_pool):
+    """돌연변이: 타순 두 자리 교환 또는 벤치 타자와 교체"""
+    lineup = list(lineup)
+    bench = [h for h in hitter_pool if h not in lineup]
+    if bench and random.random() < 0.5:
+        lineup[random.randrange(9)] = random.choice(bench)
+    else:
+        a, b = random.sample(range(9), 2)
+        lineup[a], lineup[b] = lineup[b], lineup[a]
+    return tuple(lineup)
+
+
+# ========== 최적화 ==========
+def optimize_lineup(team_name, opponent_name, opponent_starter=None, population_size=POPULATION_SIZE,
+                    generations=MAX_GENERATIONS, games=GAMES_PER_EVALUATION, processes=None, seed=None,
+                    verbose=True):
+    """
+    유전 알고리즘으로 team_name의 최적 타순 탐색
+
+    returns: (최적 타순, (승률, 경기당 득점), 세대별 기록)
+    """
+    if population_size < 1:
+        raise ValueError(f"개체 수는 1 이상이어야 합니다: {population_size}")
+    if generations < 1:
+        raise ValueError(f"세대 수는 1 이상이어야 합니다: {generations}")
+
+    rng_state = random.getstate()
+    random.seed(seed)
+
+    our_roster = season_simulation.build_team_roster(team_name)
+    opponent_roster = season_simulation.build_team_roster(opponent_name)
+    starter = opponent_starter or opponent_roster["rotation"][0]
+    opponent_team = sim.create_team(opponent_name, opponent_roster["lineup"], starter, opponent_roster["bullpen"])
+
+    hitter_pool = get_team_hitters(team_name)
+    if len(hitter_pool) < 9:
+        raise ValueError(f"{team_name}: 후보 타자가 9명 미만입니다 ({len(hitter_pool)}명)")
+
+    # 적합도 캐시: 타순 → (승률, 득점). 튜플 비교이므로 승률 우선, 동률이면 득점
+    scores = {}
+    history = []
+    fitness_seed = FITNESS_SEED if seed is None else seed
+
+    population = [tuple(our_roster["lineup"])]
+    population += [create_individual(hitter_pool) for _ in range(population_size - 1)]
+
+    init_args = (our_roster, opponent_team, games, fitness_seed)
+    with mp.Pool(processes, initializer=_init_fitness_worker, initargs=init_args) as pool:
+        for generation in range(generations):
+            pending = [lineup for lineup in dict.fromkeys(population) if lineup not in scores]
+            scores.update(zip(pending, pool.map(evaluate_lineup, pending)))
+
+            ranked = sorted(dict.fromkeys(population), key=scores.get, reverse=True)
+            best = ranked[0]
+            history.append({"generation": generation, "best": best, "score": scores[best],
+                            "evaluated": len(scores)})
+            if verbose:
+                win_rate, runs = scores[best]
+                print(f"{generation + 1:>3}세대 | 최고 승률 {win_rate:.3f} | 득점 {runs:.2f} | 평가 타순 {len(scores)}개")
+
+            new_population = ranked[:ELITISM_SIZE]
+            while len(new_population) < population_size:
+                parent1 = tournament_select(population, scores)
+                parent2 = tournament_select(population, scores)
+                if random.random() < CROSSOVER_RATE:
+                    child1 = crossover(parent1, parent2, hitter_pool)
+                    child2 = crossover(parent2, parent1, hitter_pool)
+                else:
+                    child1, child2 = parent1, parent2
+                if random.random() < MUTATION_RATE:
+                    child1 = mutate(child1, hitter_pool)
+                if random.random() < MUTATION_RATE:
+                    child2 = mutate(child2, hitter_pool)
+                new_population.extend([child1, child2])
+
+            population = new_population[:population_size]
+
+    random.setstate(rng_state)
+    best = max(scores, key=scores.get)
+    return list(best), scores[best], history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="유전 알고리즘 타순 추천")
+    parser.add_argument("--team", default="KIA")
+    parser.add_argument("--opponent", default="KT")
+    parser.add_argument("--starter", default=None, help="상대 선발 (기본: 로테이션 1선발)")
+    parser.add_argument("--population", type=int, default=POPULATION_SIZE)
+    parser.add_argument("--generations", type=int, default=MAX_GENERATIONS)
+    parser.add_argument("--games", type=int, default=GAMES_PER_EVALUATION, help="타순당 평가 경기 수")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"=== {args.team} 타순 최적화 (상대: {args.opponent}) ===")
+    start = time.perf_counter()
+    lineup, (win_rate, runs), history = optimize_lineup(
+        args.team, args.opponent, args.starter, args.population, args.generations, args.games,
+        processes=args.workers, seed=args.seed,
+    )
+
+    print(f"\n최적 타순 ({time.perf_counter() - start:.1f}초, 평가 타순 {history[-1]['evaluated']}개)")
+    for order, hitter in enumerate(lineup, 1):
+        print(f" {order}번 {hitter}")
+    print(f"예상 승률: {win_rate:.3f} | 경기당 득점: {runs:.2f}")
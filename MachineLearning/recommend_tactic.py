@@ -1,39 +1,174 @@
-상대_타자_리스트 = get_상대_타자_정보()  # ex. ['홍길동', '이대호', '강백호']
-
-def 상대타자_특징_벡터(타자들):
-    벡터들 = []
-    for 타자 in 타자들:
-        특징 = [
-            타자.vs_우투_AVG,
-            타자.vs_좌투_OBP,
-            타자.SLG,
-            타자.wRC_plus
-        ]
-        벡터들.append(특징)
-    return 평균벡터(벡터들)
-
-def 불펜_투수_특징_벡터(투수):
-    return [
-        투수.vs_우타_피안타율,
-        투수.vs_좌타_피출루율,
-        투수.피장타율,
-        투수.wOBA_허용
-    ]
-
-def 유클리드거리(v1, v2):
-    return sqrt(sum((a - b)**2 for a, b in zip(v1, v2)))
-
-# 상대 타자진의 특징 벡터
-타자_벡터 = 상대타자_특징_벡터(상대_타자_리스트)
-
-# 각 불펜 투수와 거리 계산
-불펜_목록 = get_우리팀_불펜()
-거리_목록 = []
-for 투수 in 불펜_목록:
-    투수_벡터 = 불펜_투수_특징_벡터(투수)
-    거리 = 유클리드거리(타자_벡터, 투수_벡터)
-    거리_목록.append((투수.이름, 거리))
-
-# 거리 기준으로 정렬 후 top-K 선택
-추천_불펜 = 정렬(거리_목록)[:K]
-출력(추천_불펜)
+# 상대 타자 기반 불펜 투수 추천
+# 리그 전체 투수/타자 특징 행렬을 한 번만 만들어 두고, 다음 타자 3~5명이 정해지면
+# 모든 불펜 투수 × 타자 조합의 거리를 한 번에 계산해 top-K 투수를 고름
+#
+# 특징 공간(표준화, 값이 작을수록 투수에게 유리):
+#   - 투수 피안타율/피출루율: 타자 타석 방향 기준 (V_R_* / V_L_*, 양타는 투수 반대 방향)
+#   - 타자 타율/출루율: 투수 투구 손 기준 (RAVG/ROBP / LAVG/LOBP)
+#   - 투수 WHIP, BB%, -K%
+# 점수 = 리그 최고 값(이상점)까지의 가중 유클리드 거리를 다음 타자 순서 가중 평균 → 작을수록 추천
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "StatizCrawling"))
+
+import final_simulation_v6 as sim  # noqa: E402
+import statiz_snapshot  # noqa: E402
+
+# ========== 설정 파라미터 ==========
+TOP_K = 3
+UPCOMING_HITTERS = 3
+# 다음 타자 순서별 가중치 (바로 다음 타자가 가장 중요)
+ORDER_WEIGHTS = np.array([1.0, 0.8, 0.65, 0.5, 0.4])
+# [피안타율, 피출루율, 타자 타율, 타자 출루율, WHIP, BB%, -K%]
+FEATURE_WEIGHTS = np.array([1.0, 1.5, 0.5, 0.75, 1.0, 0.5, 0.75])
+
+RIGHT, LEFT, SWITCH = 0, 1, 2
+
+
+# ========== 특징 행렬 (리그 전체, 모듈 로딩 시 1회) ==========
+def _standardize(values):
+    std = values.std(axis=0)
+    return (values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def load_pitcher_hands():
+    """투수 이름 → 투구 손 (0: 우투/우언, 1: 좌투/좌언)"""
+    types_df = pd.read_csv(os.path.join(sim.DATA_DIR, statiz_snapshot.SOURCE_FILES["pitcher_types"]))
+    return {name: LEFT if str(p_type).startswith("좌") else RIGHT
+            for name, p_type in zip(types_df["Name"], types_df["Pitching_Type"])}
+
+
+def build_feature_tables():
+    """
+    시뮬레이터 능력치 테이블(연도 가중 평균) → 표준화 특징 배열
+
+    returns: {
+        "pitcher_split": [투수, 타자 방향, (피안타율, 피출루율)],
+        "pitcher_common": [투수, (WHIP, BB%, -K%)],
+        "hitter_split": [타자, 투수 손, (타율, 출루율)],
+        "pitcher_hand": [투수], "hitter_side": [타자],
+    }
+    """
+    p = np.asarray(sim.pitcher_ratings)
+    h = np.asarray(sim.hitter_ratings)
+
+    # 좌/우 기록을 한 분포로 표준화해야 방향 간 비교가 가능
+    allowed = _standardize(np.concatenate([p[:, [sim.P_R_AVG, sim.P_R_OBP]], p[:, [sim.P_L_AVG, sim.P_L_OBP]]]))
+    split = _standardize(np.concatenate([h[:, [sim.H_RAVG, sim.H_ROBP]], h[:, [sim.H_LAVG, sim.H_LOBP]]]))
+    n_p, n_h = len(p), len(h)
+
+    pitcher_common = _standardize(p[:, [sim.P_WHIP, sim.P_BB, sim.P_K]])
+    pitcher_common[:, 2] *= -1
+
+    hands = load_pitcher_hands()
+    pitcher_names = sorted(sim.pitcher_ids, key=sim.pitcher_ids.get)
+    hitter_names = sorted(sim.hitter_ids, key=sim.hitter_ids.get)
+    side_codes = {"우타": RIGHT, "좌타": LEFT, "양타": SWITCH}
+
+    return {
+        "pitcher_split": np.stack([allowed[:n_p], allowed[n_p:]], axis=1),
+        "pitcher_common": pitcher_common,
+        "hitter_split": np.stack([split[:n_h], split[n_h:]], axis=1),
+        "pitcher_hand": np.array([hands.get(name, RIGHT) for name in pitcher_names]),
+        "hitter_side": np.array([side_codes.get(sim.hitter_hand_dict.get(name), RIGHT) for name in hitter_names]),
+    }
+
+
+_features = build_feature_tables()
+# 리그 최고 값 (투수에게 가장 유리한 이상점)
+IDEAL_POINT = np.concatenate([
+    _features["pitcher_split"].min(axis=(0, 1)),
+    _features["hitter_split"].min(axis=(0, 1)),
+    _features["pitcher_common"].min(axis=0),
+])
+
+
+# ========== 추천 ==========
+def compile_bullpen(bullpen):
+    """불펜 명단 → (투수 이름 배열, 특징 행 인덱스). 기록 없는 투수는 제외"""
+    names = [p for p in bullpen if p in sim.pitcher_ids]
+    return np.array(names), np.array([sim.pitcher_ids[p] for p in names], dtype=np.int64)
+
+
+def matchup_scores(pitcher_idx, hitters):
+    """
+    투수별 다음 타자 상대 점수 (작을수록 유리)
+    pitcher_idx: 특징 행 인덱스 배열, hitters: 다음 타자 이름 목록 (순서대로)
+    """
+    hitter_idx = np.array([sim.hitter_ids[h] for h in hitters if h in sim.hitter_ids], dtype=np.int64)
+    if len(hitter_idx) == 0:
+        return np.zeros(len(pitcher_idx))
+
+    f = _features
+    hand = f["pitcher_hand"][pitcher_idx]                      # [P]
+    side = f["hitter_side"][hitter_idx][:, None]               # [H, 1]
+    side = np.where(side == SWITCH, 1 - hand, side)            # 양타는 투수 반대 방향 타석
+
+    diff = np.empty((len(hitter_idx), len(pitcher_idx), len(IDEAL_POINT)))
+    diff[..., 0:2] = f["pitcher_split"][pitcher_idx, side]
+    diff[..., 2:4] = f["hitter_split"][hitter_idx[:, None], hand]
+    diff[..., 4:7] = f["pitcher_common"][pitcher_idx]
+    diff -= IDEAL_POINT
+
+    distance = np.sqrt((diff * diff) @ FEATURE_WEIGHTS)       # [H, P]
+    weights = ORDER_WEIGHTS[:len(hitter_idx)] if len(hitter_idx) <= len(ORDER_WEIGHTS) \
+        else np.resize(ORDER_WEIGHTS, len(hitter_idx))
+    return weights @ distance / weights.sum()
+
+
+def recommend_relievers(bullpen, upcoming_hitters, k=TOP_K):
+    """
+    다음 타자들을 상대할 불펜 투수 top-K
+    bullpen: 투수 이름 목록 또는 compile_bullpen 결과
+
+    returns: [(투수, 점수), ...] 점수 오름차순
+    """
+    names, pitcher_idx = bullpen if isinstance(bullpen, tuple) else compile_bullpen(bullpen)
+    if len(names) == 0:
+        return []
+
+    scores = matchup_scores(pitcher_idx, upcoming_hitters)
+    k = min(k, len(names))
+    top = np.argpartition(scores, k - 1)[:k]
+    top = top[np.argsort(scores[top], kind="stable")]
+    return [(names[i], float(scores[i])) for i in top]
+
+
+def choose_best_matchup(pitchers, next_hitters):
+    """final_simulation_v6.choose_best_matchup 대체용 (같은 시그니처)"""
+    best = recommend_relievers(pitchers, next_hitters, k=1)
+    return best[0][0] if best else pitchers[0]
+
+
+def use_in_simulator():
+    """시뮬레이터의 중간계투 매치업 선택을 이 추천기로 교체 (워커 생성 전에 호출)"""
+    sim.choose_best_matchup = choose_best_matchup
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="상대 타자 기반 불펜 추천")
+    parser.add_argument("--top", type=int, default=TOP_K)
+    parser.add_argument("--hitters", type=int, default=UPCOMING_HITTERS, help="고려할 다음 타자 수")
+    parser.add_argument("--start", type=int, default=0, help="다음 타자의 타순 (0부터)")
+    args = parser.parse_args()
+
+    team_A, team_B = sim.default_teams()
+    upcoming = [team_A["lineup"][(args.start + i) % 9] for i in range(args.hitters)]
+    bullpen = compile_bullpen(team_B["bullpen"])
+
+    print(f"=== {team_B['name']} 불펜 추천 (다음 타자: {', '.join(upcoming)}) ===")
+    for rank, (pitcher, score) in enumerate(recommend_relievers(bullpen, upcoming, args.top), 1):
+        print(f" {rank}. {pitcher} (거리 {score:.3f})")
+
+    repeats = 10000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        recommend_relievers(bullpen, upcoming, args.top)
+    print(f"추천 1회: {(time.perf_counter() - start) / repeats * 1e6:.0f}µs")
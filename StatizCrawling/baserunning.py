@@ -0,0 +1,264 @@
+# 주자 진루 전이표 - 스칼라/배치/마르코프 엔진 공용
+# (타석 결과, 아웃, 주자 상황)마다 (새 주자 상황, 득점, 추가 아웃) 분포를 미리 전개해 두고
+# 엔진은 타석당 한 번의 추첨(분기가 하나면 추첨 없음)으로 진루/병살을 결정
+#  - 도루는 타석 뒤 별도 판정이라 표에 넣지 않음
+#  - 희생플라이는 타자 장타력에 따라 확률이 달라 엔진이 먼저 판정하고, 성공하면 EV_SAC_FLY 행을 조회
+#  - 2루타 때 1루 주자가 있으면 3루 표시를 60% 확률로 남기는 스칼라 엔진의 기존 동작을 그대로 유지
+#
+#   python baserunning.py --selftest          # 확률 합/주자 보존/추첨 빈도 검사
+#   python baserunning.py double 5 0          # 2루타, 1·3루(5), 무사 분포
+
+import argparse
+import bisect
+import random
+
+import numpy as np
+
+# ========== 타석 결과 코드 ==========
+EV_STRIKEOUT, EV_WALK, EV_SINGLE, EV_DOUBLE, EV_TRIPLE, EV_HOMERUN, EV_OUT, EV_SAC_FLY = range(8)
+EVENT_NAMES = ["strikeout", "walk", "single", "double", "triple", "homerun", "out", "sac_fly"]
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}
+HIT_EVENTS = [EV_SINGLE, EV_DOUBLE, EV_TRIPLE, EV_HOMERUN]
+
+# 주자 상황: 3비트 정수 (1루=1, 2루=2, 3루=4)
+FIRST, SECOND, THIRD = 1, 2, 4
+BASE_RUNNERS = (0, 1, 1, 2, 1, 2, 2, 3)  # 주자 상황별 주자 수
+# 주자 상황별 병살 상황 키 (1루 주자가 없으면 None)
+BASE_SITUATION_KEYS = (None, "runner_on_first", None, "first_and_second",
+                       None, "first_and_third", None, "bases_loaded")
+
+# 병살 확률 (주자 상황별)
+DOUBLE_PLAY_PROB = {
+    "runner_on_first": 0.12,  # 1루 주자만 있을 때
+    "bases_loaded": 0.10,  # 만루
+    "first_and_second": 0.11,  # 1,2루
+    "first_and_third": 0.09  # 1,3루
+}
+
+# 진루 확률
+OUT_THIRD_SCORES = 0.15  # 일반 아웃 때 3루 주자 득점 (3아웃이 아닐 때)
+OUT_SECOND_ADVANCES = 0.25  # 일반 아웃 때 2루 주자 3루 진루 (3루가 비어 있을 때)
+SINGLE_SECOND_SCORES = 0.30  # 단타 때 2루 주자 홈인
+DOUBLE_FIRST_SCORES = 0.40  # 2루타 때 1루 주자 홈인
+DOUBLE_THIRD_STAYS = 0.60  # 2루타 때(1루 주자 있을 때) 3루 표시 유지
+
+
+def encode_bases(first, second, third):
+    """[1루, 2루, 3루] → 3비트 주자 상황"""
+    return (FIRST if first else 0) | (SECOND if second else 0) | (THIRD if third else 0)
+
+
+def decode_bases(state):
+    """3비트 주자 상황 → [1루, 2루, 3루]"""
+    return [bool(state & FIRST), bool(state & SECOND), bool(state & THIRD)]
+
+
+# ========== 분포 전개 ==========
+def baserunning_outcomes(event, state, outs):
+    """
+    타석 결과별 주자 진루를 확률 분포로 전개 (도루 제외)
+    EV_OUT은 희생플라이가 아닌 아웃(병살 포함), EV_SAC_FLY는 희생플라이 성공
+
+    returns: [(확률, 새 주자 상황, 득점, 추가 아웃), ...]
+    """
+    first, second, third = decode_bases(state)
+    branches = []
+
+    if event == EV_STRIKEOUT:
+        branches.append((1.0, state, 0, 1))
+
+    elif event == EV_WALK:
+        runs = 1 if first and second and third else 0
+        branches.append((1.0, encode_bases(True, second or first, third or (first and second)), runs, 0))
+
+    elif event == EV_SINGLE:
+        runs = 1 if third else 0
+        if second:
+            branches.append((SINGLE_SECOND_SCORES, encode_bases(True, first, False), runs + 1, 0))
+            branches.append((1 - SINGLE_SECOND_SCORES, encode_bases(True, first, True), runs, 0))
+        else:
+            branches.append((1.0, encode_bases(True, first, False), runs, 0))
+
+    elif event == EV_DOUBLE:
+        runs = int(third) + int(second)
+        if first:
+            # 1루 주자 홈인 여부와 별개로 3루 표시를 추첨 (홈인했으면 원래 3루 주자 표시가 남고,
+            # 홈인하지 못했는데 표시가 지워지면 1루 주자가 사라짐 - 스칼라 엔진의 기존 동작)
+            for scores, p_score in [(True, DOUBLE_FIRST_SCORES), (False, 1 - DOUBLE_FIRST_SCORES)]:
+                third_mark = third or not scores
+                branches.append((p_score * DOUBLE_THIRD_STAYS, encode_bases(False, True, third_mark), runs + scores, 0))
+                branches.append((p_score * (1 - DOUBLE_THIRD_STAYS), SECOND, runs + scores, 0))
+        else:
+            branches.append((1.0, SECOND, runs, 0))
+
+    elif event == EV_TRIPLE:
+        branches.append((1.0, THIRD, first + second + third, 0))
+
+    elif event == EV_HOMERUN:
+        branches.append((1.0, 0, 1 + first + second + third, 0))
+
+    elif event == EV_SAC_FLY:
+        branches.append((1.0, state & ~THIRD, 1, 1))
+
+    elif event == EV_OUT:
+        situation_key = BASE_SITUATION_KEYS[state] if outs < 2 else None
+        dp_prob = DOUBLE_PLAY_PROB.get(situation_key, 0) if situation_key else 0
+        if dp_prob:
+            # 1루 주자 제거, 다른 주자는 진루 안함
+            branches.append((dp_prob, state & ~FIRST, 0, 2))
+
+        # 일반 아웃 - 3루 주자 득점 후 2루 주자 진루
+        if third and outs + 1 < 3:
+            third_cases = [(True, OUT_THIRD_SCORES), (False, 1 - OUT_THIRD_SCORES)]
+        else:
+            third_cases = [(False, 1.0)]
+        for third_scores, p_third in third_cases:
+            third_after = third and not third_scores
+            runs = 1 if third_scores else 0
+            p = (1 - dp_prob) * p_third
+            if second and not third_after:
+                branches.append((p * OUT_SECOND_ADVANCES, encode_bases(first, False, True), runs, 1))
+                branches.append((p * (1 - OUT_SECOND_ADVANCES), encode_bases(first, True, False), runs, 1))
+            else:
+                branches.append((p, encode_bases(first, second, third_after), runs, 1))
+
+    # 동일 결과 병합
+    merged = {}
+    for prob, new_state, runs, outs_added in branches:
+        key = (new_state, runs, outs_added)
+        merged[key] = merged.get(key, 0.0) + prob
+    return [(prob, *key) for key, prob in merged.items() if prob > 0]
+
+
+def all_outcomes():
+    """(결과, 아웃, 주자 상황) → baserunning_outcomes"""
+    return {
+        (event, outs, state): baserunning_outcomes(event, state, outs)
+        for event in range(len(EVENT_NAMES)) for outs in range(3) for state in range(8)
+    }
+
+
+# ========== 전이표 ==========
+def build_baserunning_table():
+    """배치/마르코프 엔진용: (결과, 아웃, 주자 상황)별 누적확률/새 상황/득점/추가 아웃 배열"""
+    outcomes = all_outcomes()
+    width = max(len(branches) for branches in outcomes.values())
+    shape = (len(EVENT_NAMES), 3, 8, width)
+
+    table = {
+        "cum_prob": np.ones(shape),
+        "state": np.zeros(shape, dtype=np.int8),
+        "runs": np.zeros(shape, dtype=np.int8),
+        "outs": np.zeros(shape, dtype=np.int8),
+    }
+    for (event, outs, state), branches in outcomes.items():
+        cum = 0.0
+        for j, (prob, new_state, runs, outs_added) in enumerate(branches):
+            cum += prob
+            table["cum_prob"][event, outs, state, j] = cum
+            table["state"][event, outs, state, j] = new_state
+            table["runs"][event, outs, state, j] = runs
+            table["outs"][event, outs, state, j] = outs_added
+        # 부동소수 오차로 마지막 분기가 누락되지 않도록 보정
+        table["cum_prob"][event, outs, state, len(branches) - 1:] = 1.0
+    return table
+
+
+def build_transition_table():
+    """
+    스칼라 엔진용: [결과][아웃][주자 상황] → (누적확률 튜플, ((새 주자 상황, 득점, 추가 아웃), ...))
+    NumPy 배열 대신 튜플로 두어 타석마다 조회하는 비용을 줄임
+    """
+    table = [[[None] * 8 for _ in range(3)] for _ in EVENT_NAMES]
+    for (event, outs, state), branches in all_outcomes().items():
+        cum, cum_probs = 0.0, []
+        for prob, _, _, _ in branches:
+            cum += prob
+            cum_probs.append(cum)
+        cum_probs[-1] = 1.0
+        table[event][outs][state] = (tuple(cum_probs), tuple(branch[1:] for branch in branches))
+    return table
+
+
+BASERUNNING_TABLE = build_baserunning_table()
+TRANSITION_TABLE = build_transition_table()
+
+
+def advance_runners(event, outs, bases, rng=random):
+    """
+    타석 결과 코드에 따른 주자 진루 → (새 주자 상황, 득점, 추가 아웃)
+    분기가 여럿일 때만 rng.random()을 한 번 사용
+    """
+    cum_probs, outcomes = TRANSITION_TABLE[event][outs][bases]
+    if len(outcomes) == 1:
+        return outcomes[0]
+    return outcomes[bisect.bisect(cum_probs, rng.random())]
+
+
+# ========== 검사 ==========
+def selftest(samples=20000, seed=0):
+    """
+    전이표 검사 → 문제 목록 (없으면 빈 목록)
+      - 분기 확률 합 = 1, 배치용 배열과 스칼라용 튜플이 같은 분포
+      - 주자 보존: 기존 주자 + 타자 = 남은 주자 + 득점 + 아웃된 주자 (1루 주자가 있는 2루타는 3루 표시 동작 때문에 제외)
+      - advance_runners 추첨 빈도가 확률과 4σ 이내
+    """
+    problems = []
+    rng = random.Random(seed)
+    batter_reaches = {EV_WALK, EV_SINGLE, EV_DOUBLE, EV_TRIPLE, EV_HOMERUN}
+
+    for (event, outs, state), branches in all_outcomes().items():
+        cell = f"{EVENT_NAMES[event]} outs={outs} bases={state}"
+        total = sum(prob for prob, _, _, _ in branches)
+        if abs(total - 1) > 1e-12:
+            problems.append(f"{cell}: 확률 합 {total}")
+
+        cum_probs, outcomes = TRANSITION_TABLE[event][outs][state]
+        width = len(outcomes)
+        if (list(BASERUNNING_TABLE["cum_prob"][event, outs, state, :width]) != list(cum_probs)
+                or [tuple(int(BASERUNNING_TABLE[k][event, outs, state, j]) for k in ("state", "runs", "outs"))
+                    for j in range(width)] != list(outcomes)):
+            problems.append(f"{cell}: 배치용 배열과 스칼라용 튜플이 다름")
+
+        if event == EV_SAC_FLY and (outs == 2 or not state & THIRD):
+            continue  # 엔진이 조회하지 않는 칸
+        for prob, new_state, runs, outs_added in branches:
+            before = BASE_RUNNERS[state] + (event in batter_reaches)
+            # 아웃 수 중 타자 몫 1개를 뺀 나머지가 아웃된 주자 (볼넷/안타는 타자 아웃 없음)
+            runners_out = outs_added - (event not in batter_reaches)
+            after = BASE_RUNNERS[new_state] + runs + runners_out
+            if before != after and not (event == EV_DOUBLE and state & FIRST):
+                problems.append(f"{cell}: 주자 수 {before} → {after} ({new_state}, {runs}, {outs_added})")
+
+        if width > 1:
+            counts = [0] * width
+            for _ in range(samples):
+                counts[outcomes.index(advance_runners(event, outs, state, rng))] += 1
+            for count, (prob, *_) in zip(counts, branches):
+                sigma = (samples * prob * (1 - prob)) ** 0.5
+                if abs(count - samples * prob) > 4 * sigma + 1:
+                    problems.append(f"{cell}: 추첨 빈도 {count / samples:.4f} (확률 {prob:.4f})")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주자 진루 전이표")
+    parser.add_argument("event", nargs="?", choices=EVENT_NAMES, help="타석 결과")
+    parser.add_argument("bases", nargs="?", type=int, default=0, help="주자 상황 (1루=1, 2루=2, 3루=4 합)")
+    parser.add_argument("outs", nargs="?", type=int, default=0)
+    parser.add_argument("--selftest", action="store_true")
+    parser.add_argument("--samples", type=int, default=20000, help="selftest 셀당 추첨 횟수")
+    args = parser.parse_args()
+
+    if args.selftest:
+        problems = selftest(args.samples)
+        for problem in problems:
+            print(problem)
+        print(f"=== 전이표 검사: {'통과' if not problems else f'문제 {len(problems)}건'} ===")
+        raise SystemExit(1 if problems else 0)
+
+    events = [EVENT_CODES[args.event]] if args.event else range(len(EVENT_NAMES))
+    for event in events:
+        print(f"=== {EVENT_NAMES[event]}, 주자 {decode_bases(args.bases)}, {args.outs}아웃 ===")
+        for prob, new_state, runs, outs_added in baserunning_outcomes(event, args.bases, args.outs):
+            print(f"  {prob:6.2%}  → 주자 {decode_bases(new_state)}, 득점 {runs}, 아웃 +{outs_added}")
@@ -0,0 +1,401 @@
+# KBO 배치 시뮬레이션 엔진 - N개의 독립 경기를 NumPy 배열로 동시에 진행
+# final_simulation_v6의 스칼라 엔진과 같은 확률 모델을 사용하며,
+# 타석 결과는 경기별 1회의 범주형 추출, 주자 진루는 baserunning 전이표(8개 주자 상황) 조회로 처리
+
+import argparse
+import time
+
+import numpy as np
+
+import final_simulation_v6 as sim
+
+# 타석 결과 코드/주자 상황 비트/주자 진루 전이표는 스칼라 엔진과 같은 baserunning 모듈을 사용
+from baserunning import (BASERUNNING_TABLE, EV_HOMERUN, EV_OUT, EV_SAC_FLY, EV_SINGLE, EV_WALK, EVENT_NAMES,
+                         FIRST, SECOND, THIRD)
+
+# 안타 종류 가중치 (ISO 구간 × [단타, 2루타, 3루타, 홈런])
+HIT_ISO_THRESHOLDS = np.array([t for t, _, _ in sim.HIT_TYPE_WEIGHTS[:-1]])
+HIT_TYPE_PROBS = np.array([
+    [dict(zip(types, weights)).get(name, 0) / sum(weights) for name in EVENT_NAMES[EV_SINGLE:EV_HOMERUN + 1]]
+    for _, types, weights in sim.HIT_TYPE_WEIGHTS
+])
+
+
+# ========== 팀 컴파일 ==========
+def compile_team_arrays(team):
+    """create_team 결과를 배치 엔진용 배열로 변환"""
+    pitchers = [team["starter"]] + list(team["bullpen"])
+    slots = {p: i for i, p in enumerate(pitchers)}
+    roles = team["roles"]
+    lineup = team["lineup"]
+
+    fatigue_thresholds = np.array([sim.get_fatigue_thresholds(p) for p in pitchers], dtype=np.float64)
+
+    return {
+        "name": team["name"],
+        "lineup": lineup,
+        "pitchers": pitchers,
+        "closer": slots.get(roles.get("closer"), -1),
+        "setup": slots.get(roles.get("setup"), -1),
+        "long_relief": np.array([slots[p] for p in roles.get("long_relief", []) if p in slots], dtype=np.intp),
+        "middle_relief": np.array([slots[p] for p in roles.get("middle_relief", []) if p in slots], dtype=np.intp),
+        "bullpen": np.arange(1, len(pitchers)),
+        "quality": np.array([sim.pitcher_quality.get(p, 5.0) for p in pitchers]),
+        "collapse_prob": np.array([sim.get_collapse_probability(p) for p in pitchers]),
+        "fatigue_start": fatigue_thresholds[:, 0],
+        "fatigue_severe": fatigue_thresholds[:, 1],
+        "pitcher_type": [sim.pitcher_types.get(p, "우투") for p in pitchers],
+        "steal_attempt": np.array([sim.steal_attempt_prob.get(h, 0) for h in lineup]),
+        "steal_success": np.array([sim.steal_success_prob.get(h, 0.7) for h in lineup]),
+        "power": np.array([sim.hitter_power.get(h, 0.4) for h in lineup]),
+    }
+
+
+def compile_matchup_arrays(offense, defense):
+    """공격팀 타순 × 수비팀 투수 슬롯별 기본 능력치 [9, 투수 수]"""
+    stats = np.array([
+        [sim.get_matchup_base_stats(h, p_type) for p_type in defense["pitcher_type"]]
+        for h in offense["lineup"]
+    ])
+    return {
+        "avg": stats[:, :, 0],
+        "obp": stats[:, :, 1],
+        "slg": stats[:, :, 2],
+        "k_rate": stats[:, :, 3],
+        "bb_rate": stats[:, :, 4],
+    }
+
+
+def new_team_state(team, n_games):
+    """경기별 팀 상태 배열"""
+    return {
+        "batter_index": np.zeros(n_games, dtype=np.int64),
+        "pitcher_fatigue": np.zeros((n_games, len(team["pitchers"]))),
+        "current_pitcher": np.zeros(n_games, dtype=np.intp),
+        "starter_runs_allowed": np.zeros(n_games, dtype=np.int64),
+    }
+
+
+# ========== 투수 교체 (choose_relief_pitcher 배치 버전) ==========
+def _first_available(slots, fatigue, limit):
+    """slots 순서상 피로도 limit 미만인 첫 투수 (없으면 -1)"""
+    if len(slots) == 0:
+        return np.full(len(fatigue), -1)
+    available = fatigue[:, slots] < limit
+    return np.where(available.any(axis=1), slots[available.argmax(axis=1)], -1)
+
+
+def _leverage_codes(inning, score_diff):
+    """get_leverage_situation 배치 버전 (0=low, 1=medium, 2=high, 3=save, 4=garbage)"""
+    leverage = np.zeros(len(score_diff), dtype=np.int8)
+    leverage[np.abs(score_diff) >= 5] = 4
+    if inning >= 7:
+        leverage[np.abs(score_diff) <= 2] = 1
+    if inning >= 9:
+        leverage[(score_diff >= -3) & (score_diff <= 0)] = 2
+        leverage[(score_diff > 0) & (score_diff <= 3)] = 3
+    return leverage
+
+
+def choose_relief_pitchers(rng, defense, d_state, offense, o_state, matchup, games, inning, score_diff):
+    """이닝 시작 시 수비팀 투수 선택"""
+    fatigue = d_state["pitcher_fatigue"][games]
+    current = d_state["current_pitcher"][games]
+    choice = current.copy()
+    rows = np.arange(len(games))
+    current_fatigue = fatigue[rows, current]
+    runs_allowed = d_state["starter_runs_allowed"][games]
+
+    is_starter = current == 0
+    decided = is_starter & (current_fatigue < 90) & (runs_allowed <= 3)
+
+    long_relief = _first_available(defense["long_relief"], fatigue, 40)
+    pick = is_starter & ~decided & (runs_allowed >= 5) & (current_fatigue >= 60) & (long_relief >= 0)
+    choice[pick] = long_relief[pick]
+    decided |= pick
+    decided |= is_starter & (current_fatigue < 90)
+
+    leverage = _leverage_codes(inning, score_diff)
+
+    for role, limit, condition in (
+        ("closer", 20, leverage == 3),
+        ("setup", 20, (score_diff > 0) & (score_diff <= 3) if inning == 8 else np.zeros(len(games), bool)),
+    ):
+        slot = defense[role]
+        if slot < 0:
+            continue
+        pick = ~decided & condition & (fatigue[:, slot] < limit)
+        choice[pick] = slot
+        decided |= pick
+
+    bullpen = defense["bullpen"]
+    if len(bullpen):
+        quality = defense["quality"][bullpen]
+
+        available = fatigue[:, bullpen] < 35
+        worst = bullpen[np.where(available, quality, -np.inf).argmax(axis=1)]
+        pick = ~decided & (leverage == 4) & available.any(axis=1)
+        choice[pick] = worst[pick]
+        decided |= pick
+
+        available = fatigue[:, bullpen] < 20
+        best = bullpen[np.where(available, quality, np.inf).argmin(axis=1)]
+        pick = ~decided & (leverage == 2) & available.any(axis=1)
+        choice[pick] = best[pick]
+        decided |= pick
+
+    middle = defense["middle_relief"]
+    if len(middle) and not decided.all():
+        available = fatigue[:, middle] < 25
+        pick = ~decided & available.any(axis=1)
+        if pick.any():
+            # choose_best_matchup: 다음 3타자 상대 hybrid AVG 합이 가장 낮은 투수
+            next_positions = (o_state["batter_index"][games][:, None] + np.arange(3)) % 9
+            base_avg = matchup["avg"][next_positions[:, :, None], middle[None, None, :]]
+            condition = rng.uniform(0.95, 1.05, size=base_avg.shape)
+            total_avg = np.where(available, (base_avg * condition).sum(axis=1), np.inf)
+            best = middle[total_avg.argmin(axis=1)]
+            choice[pick] = best[pick]
+            decided |= pick
+
+    any_available = _first_available(bullpen, fatigue, 30)
+    pick = ~decided & (any_available >= 0)
+    choice[pick] = any_available[pick]
+
+    return choice
+
+
+# ========== 이닝 진행 ==========
+def _steal_weights(inning, score_diff):
+    """calculate_steal_probability의 상황별 가중치 (2아웃은 시도 자체가 없음)"""
+    weights = sim.STEAL_SITUATION_WEIGHTS
+    weight = np.ones(len(score_diff))
+    weight[score_diff > 3] *= weights["score_ahead"]
+    weight[np.abs(score_diff) <= 2] *= weights["score_close"]
+    weight[score_diff < -2] *= weights["score_behind"]
+    if inning >= 7:
+        weight *= weights["late_inning"]
+    return weight
+
+
+def simulate_half_inning(rng, offense, o_state, defense, d_state, matchup, games, inning, score_diff):
+    """games에 해당하는 경기들의 반 이닝을 동시에 진행하고 이닝 득점 배열 반환"""
+    n = len(games)
+    current = choose_relief_pitchers(rng, defense, d_state, offense, o_state, matchup, games, inning, score_diff)
+    d_state["current_pitcher"][games] = current
+    collapsed = rng.random(n) < defense["collapse_prob"][current]
+    steal_weight = _steal_weights(inning, score_diff)
+
+    outs = np.zeros(n, dtype=np.int64)
+    bases = np.zeros(n, dtype=np.int64)
+    runs = np.zeros(n, dtype=np.int64)
+
+    live = np.arange(n)
+    while len(live):
+        g = games[live]
+        pitcher = current[live]
+        batter_index = o_state["batter_index"][g]
+        pos = batter_index % 9
+        next_pos = (batter_index + 1) % 9
+        o_state["batter_index"][g] = batter_index + 1
+        m = len(live)
+
+        # 타자 능력치 (precompute_hitter_stats 배치 버전)
+        condition = rng.uniform(0.95, 1.05, size=m)
+        avg = matchup["avg"][pos, pitcher] * condition
+        obp = matchup["obp"][pos, pitcher] * condition
+        slg = matchup["slg"][pos, pitcher] * condition
+        k_rate = matchup["k_rate"][pos, pitcher].copy()
+        bb_rate = matchup["bb_rate"][pos, pitcher].copy()
+
+        fatigue = d_state["pitcher_fatigue"][g, pitcher]
+        start = defense["fatigue_start"][pitcher]
+        severe = defense["fatigue_severe"][pitcher]
+        ratio = np.where(
+            fatigue < severe,
+            (fatigue - start) / (severe - start),
+            np.minimum(1.0 + (fatigue - severe) / 20.0, 2.0),
+        )
+        tired = fatigue >= start
+        k_rate *= np.where(tired, np.maximum(0.7, 1.0 - 0.3 * ratio), 1.0)
+        bb_rate *= np.where(tired, np.minimum(1.5, 1.0 + 0.5 * ratio), 1.0)
+        control = np.where(tired, np.minimum(1.15, 1.0 + 0.15 * ratio), 1.0)
+        avg *= control
+        obp *= control
+
+        c = collapsed[live]
+        avg = np.where(c, avg * 1.25, avg)
+        obp = np.where(c, obp * 1.25, obp)
+        slg = np.where(c, slg * 1.2, slg)
+        bb_rate = np.where(c, bb_rate * 1.3, bb_rate)
+        k_rate = np.where(c, k_rate * 0.6, k_rate)
+
+        # 타석 결과: 삼진/볼넷/단타/2루타/3루타/홈런/아웃 범주형 1회 추출
+        tier = (slg - avg <= HIT_ISO_THRESHOLDS[:, None]).sum(axis=0)
+        hit_probs = obp[:, None] * HIT_TYPE_PROBS[tier]
+        cum = np.cumsum(np.column_stack([k_rate, bb_rate, hit_probs]), axis=1)
+        event = (rng.random(m)[:, None] >= cum).sum(axis=1)
+
+        state = bases[live]
+        out_now = outs[live]
+
+        # 희생플라이 (3루 주자, 2아웃 미만)
+        sac_chance = (event == EV_OUT) & (out_now < 2) & ((state & THIRD) != 0)
+        sac_prob = sim.SAC_FLY_PROB * (1 + (slg - 0.4) * 0.5)
+        event[sac_chance & (rng.random(m) < sac_prob)] = EV_SAC_FLY
+
+        # 주자 진루 조회표
+        cum_prob = BASERUNNING_TABLE["cum_prob"][event, out_now, state]
+        branch = (rng.random(m)[:, None] >= cum_prob).sum(axis=1)
+        new_state = BASERUNNING_TABLE["state"][event, out_now, state, branch].astype(np.int64)
+        scored = BASERUNNING_TABLE["runs"][event, out_now, state, branch].astype(np.int64)
+        out_now = out_now + BASERUNNING_TABLE["outs"][event, out_now, state, branch]
+
+        # 투수 피로도
+        params = sim.PITCHER_FATIGUE_PARAMS
+        fatigue_add = (
+            params["per_batter"]
+            + np.where((event >= EV_SINGLE) & (event <= EV_HOMERUN), params["per_hit"], 0.0)
+            + np.where(event == EV_WALK, params["per_walk"], 0.0)
+            + np.where((state & (SECOND | THIRD)) != 0, params["high_stress"], 0.0)
+        )
+        d_state["pitcher_fatigue"][g, pitcher] += fatigue_add
+
+        # 도루 (1루 주자만 있고 2아웃 미만)
+        steal_prob = (
+            offense["steal_attempt"][pos]
+            * steal_weight[live]
+            * np.where(offense["power"][next_pos] > 0.5, sim.STEAL_SITUATION_WEIGHTS["power_hitter"], 1.0)
+        )
+        steal = (out_now < 2) & ((new_state & (FIRST | SECOND)) == FIRST) & (rng.random(m) < steal_prob)
+        success = rng.random(m) < offense["steal_success"][pos]
+        new_state = np.where(steal, (new_state & ~FIRST) | np.where(success, SECOND, 0), new_state)
+        out_now = out_now + (steal & ~success)
+
+        starter = pitcher == 0
+        d_state["starter_runs_allowed"][g[starter]] += scored[starter]
+
+        bases[live] = new_state
+        outs[live] = out_now
+        runs[live] += scored
+        live = live[out_now < 3]
+
+    return runs
+
+
+def simulate_games_batch(team_A, team_B, n_games, seed=None, rng=None):
+    """
+    team_A(선공) vs team_B(후공) n_games 경기 동시 시뮬레이션
+
+    returns: (team_A 득점 배열, team_B 득점 배열)
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    away, home = compile_team_arrays(team_A), compile_team_arrays(team_B)
+    away_matchup = compile_matchup_arrays(away, home)
+    home_matchup = compile_matchup_arrays(home, away)
+    away_state, home_state = new_team_state(away, n_games), new_team_state(home, n_games)
+    score1 = np.zeros(n_games, dtype=np.int64)
+    score2 = np.zeros(n_games, dtype=np.int64)
+
+    def play_inning(games, inning):
+        score1[games] += simulate_half_inning(
+            rng, away, away_state, home, home_state, away_matchup, games, inning, score1[games] - score2[games]
+        )
+        score2[games] += simulate_half_inning(
+            rng, home, home_state, away, away_state, home_matchup, games, inning, score2[games] - score1[games]
+        )
+
+    all_games = np.arange(n_games)
+    for inning in range(1, 10):
+        play_inning(all_games, inning)
+
+    for inning in range(10, 13):
+        tied = np.flatnonzero(score1 == score2)
+        if len(tied) == 0:
+            break
+        play_inning(tied, inning)
+
+    return score1, score2
+
+
+def summarize_scores(score1, score2):
+    """득점 배열 요약 (승/무, 평균 득점, 득점 분포)"""
+    total_runs = score1 + score2
+    return {
+        "games": len(score1),
+        "team1_wins": int((score1 > score2).sum()),
+        "team2_wins": int((score2 > score1).sum()),
+        "draws": int((score1 == score2).sum()),
+        "team1_avg": float(score1.mean()),
+        "team2_avg": float(score2.mean()),
+        "team1_std": float(score1.std(ddof=1)),
+        "team2_std": float(score2.std(ddof=1)),
+        "low": int((total_runs < 6).sum()),
+        "mid": int(((total_runs >= 6) & (total_runs < 12)).sum()),
+        "high": int((total_runs >= 12).sum()),
+    }
+
+
+def compare_with_scalar(team_A, team_B, scalar_games, batch_games, seed=None, z_limit=4.0):
+    """
+    스칼라 엔진과 배치 엔진의 득점 분포 비교 (평균 득점/승률 z-검정)
+    양쪽 모두 같은 team_A/team_B로 진행, seed 지정 시 스칼라 쪽도 경기별 (seed, i) 스트림 사용
+
+    returns: (통과 여부, {지표: (스칼라, 배치, z)})
+    """
+    scalar = []
+    for i in range(scalar_games):
+        if seed is not None:
+            sim.seed_game(seed, i)
+        scalar.append(sim.play_game(team_A, team_B))
+    scalar = np.array(scalar)
+    batch = simulate_games_batch(team_A, team_B, batch_games, seed=seed)
+
+    report = {}
+    for label, s_values, b_values in (
+        ("team1_runs", scalar[:, 0], batch[0]),
+        ("team2_runs", scalar[:, 1], batch[1]),
+        ("total_runs", scalar.sum(axis=1), batch[0] + batch[1]),
+        ("team1_win", (scalar[:, 0] > scalar[:, 1]).astype(float), (batch[0] > batch[1]).astype(float)),
+    ):
+        se = np.sqrt(s_values.var(ddof=1) / len(s_values) + b_values.var(ddof=1) / len(b_values))
+        z = (b_values.mean() - s_values.mean()) / se if se > 0 else 0.0
+        report[label] = (float(s_values.mean()), float(b_values.mean()), float(z))
+
+    return all(abs(z) <= z_limit for _, _, z in report.values()), report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 배치 시뮬레이션 (NumPy)")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--validate", type=int, default=0, metavar="N", help="스칼라 엔진 N경기와 분포 비교")
+    args = parser.parse_args()
+
+    team_A, team_B = sim.default_teams()
+
+    print("=== KBO 배치 시뮬레이션 시작 ===")
+    start = time.perf_counter()
+    s1, s2 = simulate_games_batch(team_A, team_B, args.games, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    summary = summarize_scores(s1, s2)
+
+    print(f"총 {args.games}경기 / {elapsed:.2f}초 ({args.games / elapsed:,.0f} 경기/초)\n")
+    print(f"{team_A['name']:<10} 평균 득점: {summary['team1_avg']:.2f} | 승: {summary['team1_wins']}")
+    print(f"{team_B['name']:<10} 평균 득점: {summary['team2_avg']:.2f} | 승: {summary['team2_wins']}")
+    print(f"무승부: {summary['draws']}")
+    print("\n득점 분포:")
+    print(f" - 저득점 경기(<6): {summary['low']}회")
+    print(f" - 중간득점 경기(6~11): {summary['mid']}회")
+    print(f" - 다득점 경기(12+): {summary['high']}회")
+
+    if args.validate:
+        print(f"\n=== 스칼라 엔진 {args.validate}경기와 비교 ===")
+        passed, report = compare_with_scalar(team_A, team_B, args.validate, args.games, seed=args.seed)
+        for label, (scalar_mean, batch_mean, z) in report.items():
+            print(f" - {label:<11} 스칼라 {scalar_mean:.3f} | 배치 {batch_mean:.3f} | z={z:+.2f}")
+        print("분포 일치" if passed else "분포 불일치 (허용 범위 초과)")
+        if not passed:
+            raise SystemExit(1)
@@ -0,0 +1,368 @@
+# KBO 시뮬레이션 성능 벤치마크
+#  - 핫패스(get_weighted_stat, precompute_hitter_stats, update_game_state, choose_relief_pitcher,
+#    simulate_inning, simulate_game) 호출당 시간
+#  - run_simulation(pool.map) 경기 수 × 워커 수별 경기/초, 타석/초, 확장 효율, 최대 RSS
+#  - 단일 프로세스 연속 경기의 메모리/GC: 세대별 GC 수집 횟수, GC 정지 시간, tracemalloc 최대 사용량
+#  - 기존 방식(타석마다 get_weighted_stat / iterrows) 대비 속도 향상
+#  - 결과 JSON 저장 및 기준선 JSON과 비교 (허용치 이상 느려지면 실패 종료)
+#
+#   python benchmark_simulation.py --output bench.json
+#   python benchmark_simulation.py --baseline bench.json
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+import final_simulation_v6 as sim
+
+TARGET_SPEEDUP = 50.0
+REGRESSION_TOLERANCE = 0.15  # 기준선 대비 허용 성능 저하 비율
+DEFAULT_GAME_COUNTS = [200, 1000]
+MEMORY_GAMES = 2000  # 메모리/GC 측정 경기 수
+MIN_CASE_TIME = 0.3  # 핫패스별 최소 측정 시간(초)
+
+_hitters_by_player = {}
+
+
+def legacy_hitter_frame(hitter):
+    """기존 방식의 선수별 DataFrame (groupby 결과)"""
+    if not _hitters_by_player:
+        _hitters_by_player.update(dict(iter(sim.hitters_df.groupby("Player"))))
+    return _hitters_by_player[hitter]
+
+
+def legacy_precompute_hitter_stats(hitter, pitcher_type, pitcher_name, pitcher_fatigue, collapse=False):
+    """능력치 테이블 도입 이전 방식: 타석마다 DataFrame을 iterrows로 9번 순회"""
+    hitter_df = legacy_hitter_frame(hitter)
+    matchup_avg_key = "RAVG" if pitcher_type in ["우투", "우언"] else "LAVG"
+    matchup_obp_key = "ROBP" if pitcher_type in ["우투", "우언"] else "LOBP"
+
+    avg = sim.get_weighted_stat(hitter_df, "AVG")
+    obp = sim.get_weighted_stat(hitter_df, "OBP")
+    slg = sim.get_weighted_stat(hitter_df, "SLG")
+    wrc_plus = sim.get_weighted_stat(hitter_df, "wRC+")
+
+    matchup_avg = sim.get_weighted_stat(hitter_df, matchup_avg_key)
+    matchup_obp = sim.get_weighted_stat(hitter_df, matchup_obp_key)
+
+    babip = sim.get_weighted_stat(hitter_df, "BABIP")
+    k_rate = sim.get_weighted_stat(hitter_df, "K%")
+    bb_rate = sim.get_weighted_stat(hitter_df, "BB%")
+
+    condition = random.uniform(0.95, 1.05)
+    wrc_factor = max(0.75, min(1.25, wrc_plus / 100.0)) if wrc_plus > 0 else 1.0
+
+    hybrid_avg = (0.5 * avg + 0.35 * matchup_avg + 0.15 * babip) * condition * wrc_factor
+    hybrid_obp = (0.5 * obp + 0.5 * matchup_obp) * condition * wrc_factor
+    hybrid_slg = slg * condition * wrc_factor
+
+    k_mult, bb_mult, control_factor = sim.calculate_pitcher_fatigue_penalty(pitcher_name, pitcher_fatigue)
+
+    k_rate *= k_mult
+    bb_rate *= bb_mult
+    hybrid_avg *= control_factor
+    hybrid_obp *= control_factor
+
+    if collapse:
+        hybrid_avg *= 1.25
+        hybrid_obp *= 1.25
+        hybrid_slg *= 1.2
+        bb_rate *= 1.3
+        k_rate *= 0.6
+
+    return hybrid_avg, hybrid_obp, hybrid_slg, k_rate, bb_rate
+
+
+def time_games(game_count, seed):
+    """simulate_game 반복 실행 후 초당 경기 수"""
+    random.seed(seed)
+    start = time.perf_counter()
+    for _ in range(game_count):
+        sim.simulate_game()
+    return game_count / (time.perf_counter() - start)
+
+
+def time_legacy_games(game_count, seed):
+    """기존 방식의 타자 능력치 계산으로 교체하여 초당 경기 수 측정"""
+    compiled = sim.precompute_hitter_stats
+    sim.precompute_hitter_stats = legacy_precompute_hitter_stats
+    try:
+        return time_games(game_count, seed)
+    finally:
+        sim.precompute_hitter_stats = compiled
+
+
+# ========== 핫패스 마이크로 벤치마크 ==========
+def hot_path_cases():
+    """이름 → 인자 없이 한 번 호출하는 함수 (상태 준비는 여기서 끝냄)"""
+    team_A, team_B = sim.default_teams()
+    hitter, next_hitter = team_A["lineup"][2], team_A["lineup"][3]
+    pitcher = team_B["starter"]
+    results = ["single", "out", "strikeout", "walk", "double", "out", "homerun", "out"]
+    situations = [(r, b) for r in results for b in (0, sim.FIRST, sim.FIRST | sim.SECOND, sim.THIRD)]
+    counter = iter(range(1 << 62))
+
+    defense = sim.new_game_state(team_B)
+    offense = sim.new_game_state(team_A)
+
+    def update_game_state():
+        result, bases = situations[next(counter) % len(situations)]
+        defense["pitcher_fatigue"][pitcher] = 0
+        sim.update_game_state(result, 0, 1, bases, hitter, 0.45, defense, 5, 0, next_hitter)
+
+    # 선발이 지친 상황 → 레버리지 판단/불펜 탐색까지 거침
+    tired = sim.new_game_state(team_B)
+    tired["pitcher_fatigue"][pitcher] = 95
+
+    def choose_relief_pitcher():
+        sim.choose_relief_pitcher(tired, offense, 7, 1, 0, sim.FIRST)
+
+    def simulate_inning():
+        sim.simulate_inning(sim.new_game_state(team_A), sim.new_game_state(team_B), 1, 0)
+
+    return {
+        "get_weighted_stat": lambda: sim.get_weighted_stat(legacy_hitter_frame(hitter), "AVG"),
+        "precompute_hitter_stats": lambda: sim.precompute_hitter_stats(hitter, "우투", pitcher, 0),
+        "update_game_state": update_game_state,
+        "choose_relief_pitcher": choose_relief_pitcher,
+        "simulate_inning": simulate_inning,
+        "simulate_game": sim.simulate_game,
+    }
+
+
+def time_call(func, min_time=MIN_CASE_TIME):
+    """min_time초 이상 반복 호출 → 호출당 마이크로초"""
+    calls, elapsed = 0, 0.0
+    batch = 1
+    start = time.perf_counter()
+    while elapsed < min_time:
+        for _ in range(batch):
+            func()
+        calls += batch
+        batch *= 2
+        elapsed = time.perf_counter() - start
+    return elapsed / calls * 1e6
+
+
+def count_plate_appearances(game_count, seed):
+    """경기당 평균 타석 수 (at_bat_result 호출 횟수)"""
+    original = sim.at_bat_result
+    calls = [0]
+
+    def counted(*args):
+        calls[0] += 1
+        return original(*args)
+
+    sim.at_bat_result = counted
+    try:
+        for game_index in range(game_count):
+            sim.simulate_game(game_index, seed=seed)
+    finally:
+        sim.at_bat_result = original
+    return calls[0] / game_count
+
+
+def peak_rss_mb():
+    """부모/자식 프로세스 최대 RSS (MB, 자식은 종료된 워커 중 최대)"""
+    kb_per_unit = 1 if sys.platform != "darwin" else 1 / 1024
+    return {
+        "parent": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * kb_per_unit / 1024,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * kb_per_unit / 1024,
+    }
+
+
+def memory_profile(game_count, seed):
+    """
+    한 프로세스에서 game_count 경기 연속 실행 시 GC/메모리
+    returns: {"games_per_sec", "gc_collections": [세대 0, 1, 2], "gc_pause_ms", "tracemalloc_peak_kb"}
+    (tracemalloc은 실행을 느리게 하므로 따로 측정)
+    """
+    pauses = []
+
+    def on_gc(phase, info):
+        if phase == "start":
+            pauses.append(time.perf_counter())
+        else:
+            pauses[-1] = time.perf_counter() - pauses[-1]
+
+    gc.collect()
+    before = [stats["collections"] for stats in gc.get_stats()]
+    gc.callbacks.append(on_gc)
+    try:
+        start = time.perf_counter()
+        for game_index in range(game_count):
+            sim.simulate_game(game_index, seed=seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.callbacks.remove(on_gc)
+    after = [stats["collections"] for stats in gc.get_stats()]
+
+    tracemalloc.start()
+    for game_index in range(min(game_count, 200)):
+        sim.simulate_game(game_index, seed=seed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "games": game_count,
+        "games_per_sec": game_count / elapsed,
+        "gc_collections": [b - a for a, b in zip(before, after)],
+        "gc_pause_ms": sum(pauses) * 1000,
+        "tracemalloc_peak_kb": peak / 1024,
+    }
+
+
+# ========== 전체 실행 (pool.map) ==========
+def time_pool_runs(game_counts, worker_counts, seed, pa_per_game):
+    """경기 수 × 워커 수 조합별 run_simulation 처리량과 워커당 확장 효율"""
+    runs = []
+    for games in game_counts:
+        reference = None  # 가장 적은 워커 수의 워커당 처리량
+        for workers in worker_counts:
+            start = time.perf_counter()
+            sim.run_simulation(games, seed=seed, processes=workers)
+            rate = games / (time.perf_counter() - start)
+            if reference is None:
+                reference = rate / workers
+            runs.append({
+                "games": games,
+                "workers": workers,
+                "games_per_sec": rate,
+                "pa_per_sec": rate * pa_per_game,
+                "scaling_efficiency": rate / (reference * workers),
+            })
+    return runs
+
+
+def run_benchmarks(game_counts, worker_counts, seed=2025, legacy_games=0, min_time=MIN_CASE_TIME,
+                   memory_games=MEMORY_GAMES):
+    """전체 벤치마크 → JSON으로 저장 가능한 결과 dict"""
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "hot_paths_us": {},
+    }
+
+    random.seed(seed)
+    for name, func in hot_path_cases().items():
+        results["hot_paths_us"][name] = time_call(func, min_time)
+
+    pa_per_game = count_plate_appearances(200, seed)
+    results["pa_per_game"] = pa_per_game
+    results["single_core_games_per_sec"] = 1e6 / results["hot_paths_us"]["simulate_game"]
+    if memory_games:
+        results["memory"] = memory_profile(memory_games, seed)
+    results["pool"] = time_pool_runs(game_counts, worker_counts, seed, pa_per_game)
+
+    if legacy_games:
+        legacy_rate = time_legacy_games(legacy_games, seed)
+        results["legacy_speedup"] = results["single_core_games_per_sec"] / legacy_rate
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# ========== 기준선 비교 ==========
+def comparable_metrics(results):
+    """비교 지표 → (값, 클수록 좋은지)"""
+    metrics = {f"hot_paths_us.{name}": (value, False) for name, value in results["hot_paths_us"].items()}
+    for run in results["pool"]:
+        metrics[f"pool.games={run['games']}.workers={run['workers']}"] = (run["games_per_sec"], True)
+    if "memory" in results:
+        metrics["memory.games_per_sec"] = (results["memory"]["games_per_sec"], True)
+    return metrics
+
+
+def compare_with_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    기준선 대비 tolerance 이상 느려진 지표 목록
+    returns: [(지표, 기준값, 현재값, 변화율), ...]
+    """
+    current = comparable_metrics(results)
+    regressions = []
+    for name, (base_value, higher_is_better) in comparable_metrics(baseline).items():
+        if name not in current or base_value <= 0:
+            continue
+        value = current[name][0]
+        change = value / base_value - 1
+        slower = -change if higher_is_better else change
+        if slower > tolerance:
+            regressions.append((name, base_value, value, change))
+    return regressions
+
+
+def print_report(results):
+    print("=== 핫패스 (호출당) ===")
+    for name, us in results["hot_paths_us"].items():
+        print(f" {name:<24} {us:12.2f}µs")
+
+    print(f"\n=== 전체 실행 (pool.map, 경기당 {results['pa_per_game']:.1f}타석) ===")
+    print(f" {'경기':>8} {'워커':>4} {'경기/초':>10} {'타석/초':>12} {'효율':>6}")
+    for run in results["pool"]:
+        print(f" {run['games']:>8} {run['workers']:>4} {run['games_per_sec']:>10.1f} "
+              f"{run['pa_per_sec']:>12.0f} {run['scaling_efficiency']:>6.2f}")
+
+    if "memory" in results:
+        memory = results["memory"]
+        gen0, gen1, gen2 = memory["gc_collections"]
+        print(f"\n=== 메모리/GC (단일 프로세스 {memory['games']}경기) ===")
+        print(f" {memory['games_per_sec']:.1f}경기/초, GC 수집 {gen0}/{gen1}/{gen2}회(세대 0/1/2), "
+              f"GC 정지 {memory['gc_pause_ms']:.1f}ms, tracemalloc 최대 {memory['tracemalloc_peak_kb']:.0f}KB")
+
+    rss = results["peak_rss_mb"]
+    print(f"\n최대 RSS: 부모 {rss['parent']:.1f}MB / 워커 {rss['children']:.1f}MB")
+    if "legacy_speedup" in results:
+        print(f"기존 방식 대비 속도 향상: {results['legacy_speedup']:.1f}배 (목표 {TARGET_SPEEDUP:.0f}배 이상)")
+
+
+def parse_counts(text):
+    return [int(v) for v in text.split(",") if v]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 시뮬레이터 처리량 벤치마크")
+    parser.add_argument("--games", type=parse_counts, default=DEFAULT_GAME_COUNTS, help="경기 수 목록 (쉼표 구분)")
+    parser.add_argument("--workers", type=parse_counts, default=None, help="워커 수 목록 (기본: 1, 2, 4.. 코어 수까지)")
+    parser.add_argument("--legacy-games", type=int, default=10, help="기존 방식 측정 경기 수 (0: 생략)")
+    parser.add_argument("--min-time", type=float, default=MIN_CASE_TIME, help="핫패스별 최소 측정 시간(초)")
+    parser.add_argument("--memory-games", type=int, default=MEMORY_GAMES, help="메모리/GC 측정 경기 수 (0: 생략)")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 기준선 JSON")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="허용 성능 저하 비율")
+    args = parser.parse_args()
+
+    worker_counts = args.workers or [w for w in (1, 2, 4, 8, 16, 32) if w <= (os.cpu_count() or 1)]
+    results = run_benchmarks(args.games, worker_counts, args.seed, args.legacy_games, args.min_time, args.memory_games)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+    failures = []
+    if "legacy_speedup" in results and results["legacy_speedup"] < TARGET_SPEEDUP:
+        failures.append(f"기존 방식 대비 {results['legacy_speedup']:.1f}배 < {TARGET_SPEEDUP:.0f}배")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        print(f"\n=== 기준선 비교 ({args.baseline}, 허용 {args.tolerance:.0%}) ===")
+        for name, base_value, value, change in regressions:
+            print(f" 저하: {name} {base_value:.2f} → {value:.2f} ({change:+.1%})")
+        if not regressions:
+            print(" 성능 저하 없음")
+        failures += [name for name, *_ in regressions]
+
+    if failures:
+        raise SystemExit(f"벤치마크 실패: {', '.join(failures)}")
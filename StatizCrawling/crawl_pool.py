@@ -0,0 +1,312 @@
+# Statiz 크롤러 공용 실행기 (브라우저 풀 + 작업 큐)
+# 크롤러는 (page, year, team, split) 작업 목록과 fetch(driver, task) → HTML 함수만 정의하고,
+# 실행기가 N개의 장수 드라이버로 큐를 나눠 처리
+#  - 호스트별 요청 간격 제한 (드라이버가 여러 개여도 같은 사이트에는 min_interval 간격)
+#  - 403 차단/오류 시 지수 백오프 재시도, 차단이면 드라이버를 새로 띄우고 호스트 전체를 쉬게 함
+#  - 체크포인트: 끝난 작업의 HTML은 바로 캐시(statiz_cache)에 원자적으로 저장되므로
+#    중단 후 다시 실행하면 캐시에 있는 작업은 건너뛰고 남은 작업만 수행
+#
+# 드라이버는 get(url), page_source, quit()만 쓰므로 서버 렌더링 페이지는 HttpDriver(Chrome 없이 HTTP)로
+# 받을 수 있고, 같은 방식으로 로컬 스텁 서버에 대해 시험 가능
+#
+#   python crawl_pool.py --selftest
+
+import argparse
+import gzip
+import http.client
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+DEFAULT_DRIVERS = 3
+MIN_INTERVAL = 5.0     # 같은 호스트 요청 간 최소 간격(초)
+INTERVAL_JITTER = 3.0  # 간격에 더하는 무작위 시간(초)
+MAX_RETRIES = 3
+BACKOFF_BASE = 30.0    # 재시도 대기 = BACKOFF_BASE × 2^시도 (+ 무작위)
+BLOCK_MARKER = "403 Forbidden"
+HTTP_TIMEOUT = 15
+
+# params: 캐시 키에 들어가는 페이지 조작 값 (팀, 탭 등)
+Task = namedtuple("Task", ["page", "year", "team", "split", "url", "params"])
+
+
+class Blocked(Exception):
+    """403 차단 페이지"""
+
+
+def is_blocked(html):
+    return BLOCK_MARKER in html
+
+
+def task_host(task):
+    return urlsplit(task.url).netloc
+
+
+# ========== 요청 간격 제한 ==========
+class RateLimiter:
+    """호스트별 요청 간격 제한 (스레드 공유)"""
+
+    def __init__(self, min_interval=MIN_INTERVAL, jitter=INTERVAL_JITTER, clock=time.monotonic, sleep=time.sleep):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.clock = clock
+        self.sleep = sleep
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        """host에 보낼 차례가 될 때까지 대기"""
+        with self.lock:
+            now = self.clock()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.min_interval + random.uniform(0, self.jitter)
+        if slot > now:
+            self.sleep(slot - now)
+
+    def penalize(self, host, delay):
+        """차단 시 host 전체 요청을 delay초 뒤로 미룸"""
+        with self.lock:
+            self.next_slot[host] = max(self.next_slot.get(host, 0.0), self.clock() + delay)
+
+
+# ========== 실행기 ==========
+class CrawlPool:
+    """
+    driver_factory: () → 드라이버 (워커 스레드마다 1개, 차단/오류 시 재생성)
+    fetch: (driver, task) → 페이지 HTML
+    cache: statiz_cache.PageCache (결과 저장 + 체크포인트)
+    """
+
+    def __init__(self, driver_factory, fetch, cache, drivers=DEFAULT_DRIVERS, limiter=None,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_BASE, sleep=time.sleep):
+        self.driver_factory = driver_factory
+        self.fetch = fetch
+        self.cache = cache
+        self.drivers = drivers
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.lock = threading.Lock()
+
+    def pending(self, tasks):
+        """캐시에 없거나 오래된 작업만"""
+        return [t for t in tasks if not self.cache.is_fresh(t.year, t.url, **t.params)]
+
+    def run(self, tasks):
+        """
+        작업 실행 (캐시에 있는 작업은 건너뜀)
+        returns: {"fetched", "skipped", "retries", "blocked", "failed": [(task, 오류), ...]}
+        """
+        todo = self.pending(tasks)
+        self.stats = {"fetched": 0, "skipped": len(tasks) - len(todo), "retries": 0, "blocked": 0, "failed": []}
+        if not todo:
+            return self.stats
+
+        self.queue = queue.Queue()
+        for task in todo:
+            self.queue.put((task, 0))
+        workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(min(self.drivers, len(todo)))]
+        for worker in workers:
+            worker.start()
+        self.queue.join()
+        for _ in workers:
+            self.queue.put(None)
+        for worker in workers:
+            worker.join()
+        return self.stats
+
+    def _worker(self):
+        driver = None
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    self.queue.task_done()
+                    break
+                task, attempt = item
+                try:
+                    if driver is None:
+                        driver = self.driver_factory()
+                    self.limiter.wait(task_host(task))
+                    html = self.fetch(driver, task)
+                    if is_blocked(html):
+                        raise Blocked(task.url)
+                    self.cache.write(html, task.url, **task.params)
+                    with self.lock:
+                        self.stats["fetched"] += 1
+                    print(f"{task.year}년 {task.page} {task.team} {task.split} 수집 성공")
+
+                except Exception as e:
+                    _quit(driver)
+                    driver = None
+                    self._retry(task, attempt, e)
+                finally:
+                    self.queue.task_done()
+        finally:
+            _quit(driver)
+
+    def _retry(self, task, attempt, error):
+        delay = self.backoff * 2 ** attempt * random.uniform(1.0, 1.5)
+        with self.lock:
+            if isinstance(error, Blocked):
+                self.stats["blocked"] += 1
+            if attempt >= self.max_retries:
+                self.stats["failed"].append((task, f"{type(error).__name__}: {error}"))
+                print(f"{task.year}년 {task.page} {task.team} {task.split} 수집 실패: {type(error).__name__} - {error}")
+                return
+            self.stats["retries"] += 1
+
+        if isinstance(error, Blocked):
+            # 차단은 사이트 단위라 다른 드라이버도 함께 쉬게 함
+            self.limiter.penalize(task_host(task), delay)
+        else:
+            self.sleep(delay)
+        self.queue.put((task, attempt + 1))
+
+
+def _quit(driver):
+    try: driver.quit()
+    except: pass
+
+
+# ========== HTTP 드라이버 ==========
+class HttpDriver:
+    """
+    JS가 필요 없는 서버 렌더링 페이지용 드라이버 (Selenium 드라이버와 같은 get/page_source/quit)
+    호스트별 keep-alive 연결을 재사용하고, 403은 바로 Blocked로 올림
+    """
+
+    def __init__(self, user_agent=None, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        if user_agent:
+            self.headers["User-Agent"] = user_agent
+        self.connections = {}
+        self.page_source = ""
+
+    def _connection(self, scheme, host):
+        conn = self.connections.get((scheme, host))
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = self.connections[(scheme, host)] = conn_class(host, timeout=self.timeout)
+        return conn
+
+    def get(self, url):
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=self.headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # 서버가 닫은 keep-alive 연결이면 새 연결로 한 번 더
+                conn.close()
+                del self.connections[(parts.scheme, parts.netloc)]
+                if attempt:
+                    raise
+
+        if response.status == 403:
+            raise Blocked(url)
+        if response.status >= 400:
+            raise IOError(f"HTTP {response.status}: {url}")
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.page_source = body.decode(response.headers.get_content_charset() or "utf-8", "replace")
+
+    def quit(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections.clear()
+
+
+def selftest(pages=12, drivers=3):
+    """로컬 스텁 서버로 재시도/간격 제한/체크포인트 재개 확인"""
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from statiz_cache import PageCache
+
+    requests_seen = []
+    clients = set()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests_seen.append((self.path, time.monotonic()))
+            clients.add(self.client_address)
+            page = int(self.path.rsplit("=", 1)[1])
+            # 3의 배수 페이지는 첫 요청을 차단
+            if page % 3 == 0 and sum(p == self.path for p, _ in requests_seen) == 1:
+                status, body = 403, "<html><h1>403 Forbidden</h1></html>"
+            else:
+                status, body = 200, f"<html><div class='table_type01'><table><tr><td>{page}</td></tr></table></div></html>"
+            self.send_response(status)
+            data = gzip.compress(body.encode("utf-8"))
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/stats?page="
+
+    def fetch(driver, task):
+        driver.get(task.url)
+        return driver.page_source
+
+    tasks = [Task("stub", 2024, "0", str(i), base + str(i), {}) for i in range(pages)]
+    interval = 0.02
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PageCache(directory)
+            # 중단 흉내: 앞 절반만 실행한 뒤 전체 재실행
+            first = CrawlPool(HttpDriver, fetch, cache, drivers, RateLimiter(interval, 0.0), backoff=0.01).run(tasks[:pages // 2])
+            start = len(requests_seen)
+            second = CrawlPool(HttpDriver, fetch, cache, drivers, RateLimiter(interval, 0.0), backoff=0.01).run(tasks)
+
+            times = sorted(t for _, t in requests_seen[start:])
+            min_gap = min((b - a for a, b in zip(times, times[1:])), default=interval)
+            stored = sum(cache.is_fresh(t.year, t.url) for t in tasks)
+            parsed = [cache.read(t.url).count("<td>") for t in tasks]
+    finally:
+        server.shutdown()
+
+    blocked_pages = sum(int(t.split) % 3 == 0 for t in tasks)
+    checks = {
+        "1차 실행 수집": first["fetched"] == pages // 2,
+        "재실행 시 완료 작업 건너뜀": second["skipped"] == pages // 2,
+        "차단 페이지 재시도": first["retries"] + second["retries"] == blocked_pages,
+        "실패 없음": not first["failed"] and not second["failed"],
+        "전체 캐시 저장": stored == pages,
+        "차단 페이지 대신 본문 저장": parsed == [1] * pages,
+        "연결 재사용": len(clients) < len(requests_seen),
+        "요청 간격 유지": min_gap >= interval * 0.9,
+    }
+    for name, ok in checks.items():
+        print(f"{'OK ' if ok else 'FAIL'} {name}")
+    print(f"요청 {len(requests_seen)}회, 연결 {len(clients)}개, 최소 간격 {min_gap * 1000:.1f}ms")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="크롤러 실행기")
+    parser.add_argument("--selftest", action="store_true", help="로컬 스텁 서버로 스케줄링/재시도 확인")
+    parser.add_argument("--drivers", type=int, default=DEFAULT_DRIVERS)
+    args = parser.parse_args()
+
+    if args.selftest:
+        raise SystemExit(0 if selftest(drivers=args.drivers) else 1)
+    parser.print_help()
@@ -0,0 +1,224 @@
+# 경기 이벤트 스트리밍 기록 (타석, 투수 교체, 도루 시도)
+# 워커마다 행을 버퍼에 모으다가 chunk_rows 행마다 압축 컬럼 파일로 내보내므로 메모리는 일정
+#  - pyarrow가 있으면 Parquet(zstd), 없으면 NumPy 압축 npz
+#  - 파일 이름에 작업(경기 묶음) 시작 번호가 들어가므로 워커 수와 무관하게 같은 파일 구성
+#  - 실행 전 기록 디렉터리의 기존 테이블 파일을 지우므로 한 디렉터리에는 항상 마지막 실행 기록만 남음
+#
+#   python event_log.py --games 10000 --output events --seed 1
+#
+# 주자 상황(bases)은 3비트 정수 (1루=1, 2루=2, 3루=4)
+# 도루의 pa 컬럼은 같은 경기에서 직전에 끝난 타석 번호 (타석 기록의 pa와 연결)
+
+import argparse
+import glob
+import math
+import multiprocessing as mp
+import os
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import final_simulation_v6 as sim
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 없으면 npz로 기록
+    pa = pq = None
+
+DEFAULT_CHUNK_ROWS = 200000
+CATEGORY_SUFFIX = "__categories"
+NPZ_COMPRESS_LEVEL = 1
+
+# 테이블 → [(컬럼, dtype)], dtype None은 문자열 (npz에서는 코드 + 어휘 목록)
+TABLES = {
+    "plate_appearances": [
+        ("game", np.int64), ("pa", np.int16), ("inning", np.int8), ("offense", None), ("batter", None),
+        ("pitcher", None), ("fatigue", np.float32), ("outs", np.int8), ("bases", np.int8), ("result", None),
+        ("runs", np.int8), ("outs_after", np.int8), ("bases_after", np.int8),
+    ],
+    "pitching_changes": [
+        ("game", np.int64), ("pa", np.int16), ("inning", np.int8), ("team", None), ("old_pitcher", None),
+        ("new_pitcher", None), ("old_fatigue", np.float32), ("starter_runs_allowed", np.int16),
+    ],
+    "steals": [
+        ("game", np.int64), ("pa", np.int16), ("inning", np.int8), ("runner", None), ("outs", np.int8),
+        ("success", np.bool_),
+    ],
+}
+
+
+# ========== 기록기 ==========
+class EventLogWriter:
+    """sim.event_sink로 설정해 쓰는 이벤트 기록기"""
+
+    def __init__(self, directory, prefix="part", chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.directory = directory
+        self.prefix = prefix
+        self.chunk_rows = chunk_rows
+        self.rows = {table: [] for table in TABLES}
+        self.parts = {table: 0 for table in TABLES}
+        self.files = []
+        self.game = 0
+        self.pa = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def begin_game(self, game_index):
+        self.game = game_index
+        self.pa = 0
+
+    def plate_appearance(self, inning, offense, batter, pitcher, outs, bases, fatigue, result, runs,
+                         outs_after, bases_after):
+        # 타석마다 호출되는 경로라 _append를 거치지 않고 직접 추가
+        rows = self.rows["plate_appearances"]
+        rows.append((
+            self.game, self.pa, inning, offense, batter, pitcher, fatigue, outs, bases, result, runs, outs_after,
+            bases_after,
+        ))
+        self.pa += 1
+        if len(rows) >= self.chunk_rows:
+            self.flush("plate_appearances")
+
+    def pitching_change(self, inning, defense_team, new_pitcher):
+        old_pitcher = defense_team["current_pitcher"]
+        self._append("pitching_changes", (
+            self.game, self.pa, inning, defense_team["name"], old_pitcher, new_pitcher,
+            defense_team["pitcher_fatigue"].get(old_pitcher, 0), defense_team.get("starter_runs_allowed", 0),
+        ))
+
+    def steal(self, inning, runner, outs, success):
+        # 도루는 타석 기록 직전(update_game_state 안)에 일어나므로 진행 중인 타석 번호가 곧 직전 타석
+        self._append("steals", (self.game, self.pa, inning, runner, outs, success))
+
+    def _append(self, table, row):
+        rows = self.rows[table]
+        rows.append(row)
+        if len(rows) >= self.chunk_rows:
+            self.flush(table)
+
+    def flush(self, table=None):
+        """버퍼를 파일로 내보냄 (table 생략 시 전체)"""
+        for name in [table] if table else list(TABLES):
+            rows = self.rows[name]
+            if not rows:
+                continue
+            columns = {
+                column: np.array(values, dtype=dtype or object)
+                for (column, dtype), values in zip(TABLES[name], zip(*rows))
+            }
+            path = os.path.join(self.directory, f"{name}-{self.prefix}-{self.parts[name]:04d}")
+            self.files.append(write_columns(path, columns))
+            self.parts[name] += 1
+            rows.clear()
+
+    def close(self):
+        self.flush()
+        return self.files
+
+
+def write_columns(path, columns):
+    """컬럼 dict → 압축 컬럼 파일 (확장자 포함 경로 반환)"""
+    if pa is not None:
+        path += ".parquet"
+        pq.write_table(pa.table(columns), path, compression="zstd")
+    else:
+        # 문자열 컬럼은 코드 + 어휘 목록으로 저장 (압축 시간/용량 절감)
+        arrays = {}
+        for column, values in columns.items():
+            if values.dtype == object:
+                codes, uniques = pd.factorize(values)
+                arrays[column] = codes.astype(np.int32)
+                arrays[column + CATEGORY_SUFFIX] = uniques.astype(str)
+            else:
+                arrays[column] = values
+        path += ".npz"
+        # np.savez_compressed와 같은 형식, 압축 수준만 낮춰 기록 속도 우선
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=NPZ_COMPRESS_LEVEL) as zf:
+            for name, values in arrays.items():
+                with zf.open(name + ".npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, values, allow_pickle=False)
+    return path
+
+
+def read_event_log(directory, table="plate_appearances"):
+    """기록 디렉터리의 한 테이블 전체 → DataFrame (경기/타석 순)"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, f"{table}-*"))):
+        if path.endswith(".parquet"):
+            frames.append(pd.read_parquet(path))
+        else:
+            with np.load(path) as data:
+                frames.append(pd.DataFrame({
+                    column: data[column + CATEGORY_SUFFIX][data[column]]
+                    if column + CATEGORY_SUFFIX in data.files else data[column]
+                    for column, _ in TABLES[table]
+                }))
+    if not frames:
+        return pd.DataFrame(columns=[column for column, _ in TABLES[table]])
+    return pd.concat(frames, ignore_index=True).sort_values(["game", "pa"], kind="stable", ignore_index=True)
+
+
+def clear_event_log(directory):
+    """기록 디렉터리의 기존 테이블 파일 삭제 → 삭제한 파일 수 (다른 파일은 그대로)"""
+    stale = [path for table in TABLES for path in glob.glob(os.path.join(directory, f"{table}-*"))]
+    for path in stale:
+        os.remove(path)
+    return len(stale)
+
+
+# ========== 병렬 실행 ==========
+def _simulate_logged_chunk(task):
+    """워커: 경기 묶음을 기록하며 실행 → 경기 결과 목록"""
+    directory, seed, first, count, chunk_rows = task
+    writer = EventLogWriter(directory, prefix=f"{first:010d}", chunk_rows=chunk_rows)
+    sim.event_sink = writer
+    try:
+        results = []
+        for game_index in range(first, first + count):
+            writer.begin_game(game_index)
+            results.append(sim.simulate_game(game_index, seed=seed))
+    finally:
+        sim.event_sink = None
+    writer.close()
+    return results
+
+
+def run_logged_simulation(match_count, directory, seed=None, processes=None, games_per_task=None,
+                          chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    run_simulation과 같은 경기를 이벤트 기록과 함께 실행 → [(KIA 득점, KT 득점), ...]
+    이전 실행의 파일이 섞이지 않도록 directory의 기존 테이블 파일은 먼저 삭제
+    """
+    clear_event_log(directory)
+    processes = processes or mp.cpu_count()
+    games_per_task = games_per_task or max(1, min(5000, math.ceil(match_count / (processes * 4))))
+    tasks = [
+        (directory, seed, first, min(games_per_task, match_count - first), chunk_rows)
+        for first in range(0, match_count, games_per_task)
+    ]
+    with mp.Pool(processes, initializer=sim.init_worker) as pool:
+        results = []
+        for chunk in pool.imap(_simulate_logged_chunk, tasks):
+            results.extend(chunk)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="경기 이벤트 기록 시뮬레이션")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--output", default="events", help="기록 디렉터리")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="파일당 최대 행 수")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_logged_simulation(args.games, args.output, args.seed, args.workers, chunk_rows=args.chunk_rows)
+    elapsed = time.perf_counter() - start
+
+    files = glob.glob(os.path.join(args.output, "*"))
+    size_mb = sum(os.path.getsize(f) for f in files) / 1e6
+    print(f"=== 이벤트 기록 ({args.games}경기, {elapsed:.1f}초, {args.games / elapsed:.0f}경기/초) ===")
+    print(f"형식: {'Parquet' if pa is not None else 'npz'} | 파일 {len(files)}개 | {size_mb:.1f}MB")
@@ -1,9 +1,22 @@
 # 개선된 KBO 시뮬레이션 - 현실성 강화 v3
 # 추가: 병살/희생타, 도루 고도화, 투수 피로도 능력 저하
 
+import argparse
+import math
+import os
+import time
+import numpy as np
 import pandas as pd
 import random
+import bisect
+import itertools
 import multiprocessing as mp
+from collections import OrderedDict
+from functools import partial
+
+import statiz_snapshot
+# 주자 상황은 3비트 정수 (1루=1, 2루=2, 3루=4), 진루/병살은 baserunning 전이표
+from baserunning import EV_OUT, EV_SAC_FLY, EVENT_CODES, FIRST, SECOND, THIRD, advance_runners
 
 # ========== 설정 파라미터 ==========
 year_weights = {2025: 0.5, 2024: 0.35, 2023: 0.15}
@@ -17,17 +30,35 @@ PITCHER_FATIGUE_PARAMS = {
     "high_stress": 0.8,
 }
 
-# 병살 확률 (주자 상황별)
-DOUBLE_PLAY_PROB = {
-    "runner_on_first": 0.12,  # 1루 주자만 있을 때
-    "bases_loaded": 0.10,  # 만루
-    "first_and_second": 0.11,  # 1,2루
-    "first_and_third": 0.09  # 1,3루
-}
-
 # 희생플라이 확률 (3루 주자 있고 아웃카운트 < 2)
 SAC_FLY_PROB = 0.035  # 타석당 약 3.5%
 
+# 안타 종류 비율 (ISO 하한, 결과, 가중치) - 위에서부터 순서대로 판정
+HIT_TYPE_WEIGHTS = [
+    (0.25, ["single", "double", "triple", "homerun"], [55, 25, 5, 15]),
+    (0.18, ["single", "double", "triple", "homerun"], [60, 25, 5, 10]),
+    (0.12, ["single", "double", "homerun"], [70, 23, 7]),
+    (float("-inf"), ["single", "double", "homerun"], [80, 17, 3]),
+]
+
+# 적응형 몬테카를로 (승률 신뢰구간이 목표 폭 이내가 될 때까지 배치 단위로 시뮬레이션)
+ADAPTIVE_BATCH_SIZE = 500
+ADAPTIVE_MIN_GAMES = 1000
+CONFIDENCE_Z = 1.96  # 95% 신뢰구간
+
+# 대결별 타자 능력치 캐시 최대 항목 수
+OUTCOME_CACHE_SIZE = 65536
+
+# 결과 집계 히스토그램 크기 (넘는 값은 마지막 칸에 합산)
+SUMMARY_MAX_SCORE = 30
+SUMMARY_MAX_INNINGS = 12
+SUMMARY_MAX_INNING_RUNS = 15
+SUMMARY_CHUNK_SIZE = 250  # 워커 작업 단위(경기 수)
+
+# paired 비교용 타석 정렬 스트림: 팀당 미리 만드는 타석 수, 용도별 타석당 난수 개수 (넘치면 순차 스트림으로 보충)
+PA_STREAM_ROWS = 80
+PA_STREAM_BLOCKS = {"pa": 12, "steal": 2, "dp": 1}
+
 # 도루 상황별 가중치
 STEAL_SITUATION_WEIGHTS = {
     "score_ahead": 0.3,  # 이기고 있을 때 (보수적)
@@ -39,32 +70,8 @@ STEAL_SITUATION_WEIGHTS = {
 }
 
 # ========== 데이터 로딩 ==========
-hitters_df = pd.read_csv("statiz_hitters.csv")
-pitchers_df = pd.read_csv("statiz_pitchers.csv")
-hitter_types_df = pd.read_csv("statiz_hitters_type.csv")
-pitcher_types_df = pd.read_csv("statiz_pitchers_type.csv")
-
-hitters_df[["K%", "BB%"]] /= 100.0
-pitchers_df[["K%", "BB%"]] /= 100.0
-
-hitter_hand_dict = dict(zip(hitter_types_df["Name"], hitter_types_df["Handedness"]))
-pitcher_types = dict(zip(pitcher_types_df.index, pitcher_types_df["Pitching_Type"]))
-hitters_by_player = {p: df for p, df in hitters_df.groupby("Player")}
-pitchers_by_player = {p: df for p, df in pitchers_df.groupby("Player")}
-
-# 도루 능력 매핑
-steal_attempt_prob = {}
-steal_success_prob = {}
-for player, df in hitters_by_player.items():
-    sb = df["SB"].mean()
-    pa = df["PA"].mean()
-    sb_pct = df["SB%"].mean() / 100.0 if "SB%" in df.columns else 0.7
-    if pa and pa > 0 and not pd.isna(sb):
-        steal_attempt_prob[player] = min(sb / pa, 0.15)
-        steal_success_prob[player] = sb_pct if not pd.isna(sb_pct) else 0.7
-    else:
-        steal_attempt_prob[player] = 0.0
-        steal_success_prob[player] = 0.0
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 def get_weighted_stat(player_data, column):
     """연도별 가중 평균"""
@@ -76,19 +83,184 @@ def get_weighted_stat(player_data, column):
             weight_sum += year_weights[year]
     return total / weight_sum if weight_sum else 0.0
 
-# 타자 장타력 매핑 (강타자 판별용)
-hitter_power = {}
-for player, df in hitters_by_player.items():
-    slg = get_weighted_stat(df, "SLG") if "SLG" in df.columns else 0.4
-    hitter_power[player] = slg
 
-# 투수 능력치 사전 계산
-pitcher_quality = {}
-for player, df in pitchers_by_player.items():
-    era = get_weighted_stat(df, "ERA") if "ERA" in df.columns else 4.5
-    fip = get_weighted_stat(df, "FIP") if "FIP" in df.columns else 4.5
-    quality = (era + fip) / 2
-    pitcher_quality[player] = quality
+# ========== 능력치 테이블 컴파일 ==========
+# 타석마다 get_weighted_stat(iterrows)을 반복하지 않도록
+# 로딩 시점에 선수별 연도 가중 평균을 정수 ID 기반 배열로 한 번만 계산
+HITTER_RATING_COLUMNS = ["AVG", "OBP", "SLG", "wRC+", "BABIP", "K%", "BB%", "RAVG", "ROBP", "LAVG", "LOBP"]
+PITCHER_RATING_COLUMNS = ["ERA", "FIP", "WHIP", "K%", "BB%", "BABIP", "V_R_AVG", "V_R_OBP", "V_L_AVG", "V_L_OBP"]
+
+# 타자 능력치 컬럼 인덱스
+H_AVG, H_OBP, H_SLG, H_WRC, H_BABIP, H_K, H_BB, H_RAVG, H_ROBP, H_LAVG, H_LOBP = range(len(HITTER_RATING_COLUMNS))
+# 투수 능력치 컬럼 인덱스
+P_ERA, P_FIP, P_WHIP, P_K, P_BB, P_BABIP, P_R_AVG, P_R_OBP, P_L_AVG, P_L_OBP = range(len(PITCHER_RATING_COLUMNS))
+
+
+def compile_rating_table(stats_df, columns):
+    """
+    선수별 연도 가중 평균 능력치 테이블 생성 (get_weighted_stat과 동일한 결과)
+
+    returns: ({선수명: 정수 ID}, float64 배열[선수 수, 컬럼 수])
+    """
+    weights = stats_df["Year"].map(year_weights)
+    players = stats_df["Player"]
+    player_ids = {p: i for i, p in enumerate(sorted(players.unique()))}
+    table = np.zeros((len(player_ids), len(columns)), dtype=np.float64)
+
+    for j, column in enumerate(columns):
+        if column not in stats_df.columns:
+            continue
+        values = pd.to_numeric(stats_df[column], errors="coerce")
+        valid = weights.notna() & values.notna()
+        w = weights.where(valid, 0.0)
+        total = (w * values.where(valid, 0.0)).groupby(players).sum()
+        weight_sum = w.groupby(players).sum()
+        weighted = (total / weight_sum.where(weight_sum > 0)).fillna(0.0)
+        table[weighted.index.map(player_ids), j] = weighted.to_numpy()
+
+    return player_ids, table
+
+
+def compile_steal_table(hitters_df, player_ids):
+    """
+    도루 능력 배열 (선수 ID 순)
+    시도 확률 = 평균 도루 / 평균 타석 (최대 15%), 성공 확률 = 평균 SB% (없으면 70%)
+
+    returns: (steal_attempt 배열, steal_success 배열)
+    """
+    grouped = hitters_df.groupby("Player")
+    sb = grouped["SB"].mean()
+    pa = grouped["PA"].mean()
+    sb_pct = grouped["SB%"].mean() / 100.0 if "SB%" in hitters_df.columns else pd.Series(0.7, index=sb.index)
+
+    valid = (pa > 0) & sb.notna()
+    attempt = (sb / pa).clip(upper=0.15).where(valid, 0.0)
+    success = sb_pct.fillna(0.7).where(valid, 0.0)
+
+    order = sorted(player_ids, key=player_ids.get)
+    return attempt.reindex(order).to_numpy(dtype=np.float64), success.reindex(order).to_numpy(dtype=np.float64)
+
+
+def read_stats_frames():
+    """타자/투수 기록 CSV → DataFrame (K%, BB%는 비율로 변환)"""
+    hitters_df = pd.read_csv(os.path.join(DATA_DIR, statiz_snapshot.SOURCE_FILES["hitters"]))
+    pitchers_df = pd.read_csv(os.path.join(DATA_DIR, statiz_snapshot.SOURCE_FILES["pitchers"]))
+    hitters_df[["K%", "BB%"]] /= 100.0
+    pitchers_df[["K%", "BB%"]] /= 100.0
+    return hitters_df, pitchers_df
+
+
+def load_stats_tables():
+    """Statiz CSV → 시뮬레이터 테이블 dict (스냅샷 생성에도 사용)"""
+    hitters_df, pitchers_df = read_stats_frames()
+    hitter_types_df = pd.read_csv(os.path.join(DATA_DIR, statiz_snapshot.SOURCE_FILES["hitter_types"]))
+    pitcher_types_df = pd.read_csv(os.path.join(DATA_DIR, statiz_snapshot.SOURCE_FILES["pitcher_types"]))
+
+    hitter_ids, hitter_ratings = compile_rating_table(hitters_df, HITTER_RATING_COLUMNS)
+    pitcher_ids, pitcher_ratings = compile_rating_table(pitchers_df, PITCHER_RATING_COLUMNS)
+    steal_attempt, steal_success = compile_steal_table(hitters_df, hitter_ids)
+
+    return {
+        "hitters_df": hitters_df,
+        "pitchers_df": pitchers_df,
+        "hitter_ids": hitter_ids,
+        "pitcher_ids": pitcher_ids,
+        "hitter_ratings": hitter_ratings,
+        "pitcher_ratings": pitcher_ratings,
+        "steal_attempt": steal_attempt,
+        "steal_success": steal_success,
+        "hitter_power": hitter_ratings[:, H_SLG].copy(),
+        "pitcher_quality": (pitcher_ratings[:, P_ERA] + pitcher_ratings[:, P_FIP]) / 2,
+        "hitter_type_names": hitter_types_df["Name"].tolist(),
+        "hitter_handedness": hitter_types_df["Handedness"].tolist(),
+        "pitching_types": pitcher_types_df["Pitching_Type"].tolist(),
+    }
+
+
+def stats_fingerprint():
+    """현재 CSV/설정 기준 스냅샷 지문"""
+    return statiz_snapshot.source_fingerprint(
+        DATA_DIR, year_weights, {"hitters": HITTER_RATING_COLUMNS, "pitchers": PITCHER_RATING_COLUMNS}
+    )
+
+
+def update_stats_tables(tables, hitters_df, pitchers_df, hitters=(), pitchers=()):
+    """
+    기존 테이블에서 기록이 바뀐 선수의 능력치만 다시 컴파일 (read_stats_frames 형식의 새 DataFrame 기준)
+    선수 구성이 바뀌어 ID가 달라지면 None → load_stats_tables로 전체 컴파일
+    """
+    if set(hitters_df["Player"]) != set(tables["hitter_ids"]) or set(pitchers_df["Player"]) != set(tables["pitcher_ids"]):
+        return None
+
+    updated = {**tables, "hitters_df": hitters_df, "pitchers_df": pitchers_df}
+    for name in statiz_snapshot.ARRAY_TABLES:
+        updated[name] = np.array(tables[name])  # memory-map은 읽기 전용이라 복사
+
+    hitter_df = hitters_df[hitters_df["Player"].isin(hitters)]
+    if len(hitter_df):
+        sub_ids, ratings = compile_rating_table(hitter_df, HITTER_RATING_COLUMNS)
+        attempt, success = compile_steal_table(hitter_df, sub_ids)
+        rows = [tables["hitter_ids"][p] for p in sorted(sub_ids, key=sub_ids.get)]
+        updated["hitter_ratings"][rows] = ratings
+        updated["steal_attempt"][rows] = attempt
+        updated["steal_success"][rows] = success
+        updated["hitter_power"][rows] = ratings[:, H_SLG]
+
+    pitcher_df = pitchers_df[pitchers_df["Player"].isin(pitchers)]
+    if len(pitcher_df):
+        sub_ids, ratings = compile_rating_table(pitcher_df, PITCHER_RATING_COLUMNS)
+        rows = [tables["pitcher_ids"][p] for p in sorted(sub_ids, key=sub_ids.get)]
+        updated["pitcher_ratings"][rows] = ratings
+        updated["pitcher_quality"][rows] = (ratings[:, P_ERA] + ratings[:, P_FIP]) / 2
+
+    return updated
+
+
+def _bind_tables(tables):
+    """테이블 dict → 모듈 전역 조회 구조 (시작 시와 데이터 갱신 시)"""
+    global hitter_ids, hitter_ratings, pitcher_ids, pitcher_ratings
+    global hitter_hand_dict, pitcher_types, steal_attempt_prob, steal_success_prob, hitter_power, pitcher_quality
+
+    for name in statiz_snapshot.FRAME_TABLES:
+        if name in tables:
+            globals()[name] = tables[name]
+        else:
+            globals().pop(name, None)  # 스냅샷에서 읽은 경우 처음 접근할 때 복원
+
+    # 능력치 행렬은 memory-map 그대로 인덱싱 (워커끼리 같은 페이지 공유)
+    # 프로세스별 사본은 ID/유형 dict와 아래 타석마다 조회하는 선수당 값 1개짜리 dict뿐
+    hitter_ids, hitter_ratings = tables["hitter_ids"], tables["hitter_ratings"]
+    pitcher_ids, pitcher_ratings = tables["pitcher_ids"], tables["pitcher_ratings"]
+
+    hitter_hand_dict = dict(zip(tables["hitter_type_names"], tables["hitter_handedness"]))
+    pitcher_types = dict(enumerate(tables["pitching_types"]))
+
+    # 도루 능력 매핑
+    steal_attempt_prob = dict(zip(hitter_ids, tables["steal_attempt"].tolist()))
+    steal_success_prob = dict(zip(hitter_ids, tables["steal_success"].tolist()))
+
+    # 타자 장타력 매핑 (강타자 판별용)
+    hitter_power = dict(zip(hitter_ids, tables["hitter_power"].tolist()))
+
+    # 투수 능력치 사전 계산
+    pitcher_quality = dict(zip(pitcher_ids, tables["pitcher_quality"].tolist()))
+
+
+def __getattr__(name):
+    """스냅샷에서 로딩한 경우 행 단위 DataFrame(hitters_df/pitchers_df)은 처음 접근할 때 복원"""
+    if name in statiz_snapshot.FRAME_TABLES:
+        frame = statiz_snapshot.load_frame(DATA_DIR, name)
+        globals()[name] = frame
+        return frame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# 유효한 바이너리 스냅샷이 있으면 memory-map으로 읽고, 없으면 CSV에서 컴파일
+_fingerprint = stats_fingerprint()
+_tables = statiz_snapshot.load_snapshot(DATA_DIR, _fingerprint)
+if _tables is None:
+    _tables = load_stats_tables()
+_bind_tables(_tables)
 
 
 def create_team(name, lineup, starter, bullpen, roles=None):
@@ -110,46 +282,55 @@ def create_team(name, lineup, starter, bullpen, roles=None):
     }
 
 
-def calculate_pitcher_collapse(pitcher_name):
-    """투수 컨디션 기반 붕괴"""
+def get_collapse_probability(pitcher_name):
+    """투수 등급별 이닝 붕괴 확률"""
     if pitcher_name not in pitcher_quality:
-        base_collapse_prob = 0.05
+        return 0.05
+
+    quality = pitcher_quality[pitcher_name]
+    if quality < 3.0:
+        return 0.01
+    elif quality < 3.5:
+        return 0.02
+    elif quality < 4.0:
+        return 0.03
+    elif quality < 5.0:
+        return 0.05
     else:
-        quality = pitcher_quality[pitcher_name]
-        if quality < 3.0:
-            base_collapse_prob = 0.01
-        elif quality < 3.5:
-            base_collapse_prob = 0.02
-        elif quality < 4.0:
-            base_collapse_prob = 0.03
-        elif quality < 5.0:
-            base_collapse_prob = 0.05
-        else:
-            base_collapse_prob = 0.08
-    return random.random() < base_collapse_prob
+        return 0.08
 
 
-def calculate_pitcher_fatigue_penalty(pitcher_name, pitcher_fatigue):
+def calculate_pitcher_collapse(pitcher_name):
+    """투수 컨디션 기반 붕괴"""
+    return collapse_random.random() < get_collapse_probability(pitcher_name)
+
+
+def get_fatigue_thresholds(pitcher_name):
     """
-    투수 피로도에 따른 능력 저하
+    투수 등급별 피로 시작점
     에이스급: 100구까지 유지, 그 이후 저하
     평균급: 80구부터 저하
     약한 투수: 60구부터 저하
 
-    returns: (k_rate_multiplier, bb_rate_multiplier, control_factor)
+    returns: (fatigue_start, fatigue_severe)
     """
     quality = pitcher_quality.get(pitcher_name, 4.5)
 
-    # 투수 등급별 피로 시작점
     if quality < 3.0:  # 에이스
-        fatigue_start = 100
-        fatigue_severe = 120
+        return 100, 120
     elif quality < 4.0:  # 평균 이상
-        fatigue_start = 80
-        fatigue_severe = 100
+        return 80, 100
     else:  # 평균 이하
-        fatigue_start = 60
-        fatigue_severe = 80
+        return 60, 80
+
+
+def calculate_pitcher_fatigue_penalty(pitcher_name, pitcher_fatigue):
+    """
+    투수 피로도에 따른 능력 저하
+
+    returns: (k_rate_multiplier, bb_rate_multiplier, control_factor)
+    """
+    fatigue_start, fatigue_severe = get_fatigue_thresholds(pitcher_name)
 
     if pitcher_fatigue < fatigue_start:
         return 1.0, 1.0, 1.0  # 정상
@@ -173,31 +354,88 @@ def calculate_pitcher_fatigue_penalty(pitcher_name, pitcher_fatigue):
     return max(0.7, k_rate_mult), min(1.5, bb_rate_mult), min(1.15, control_factor)
 
 
-def precompute_hitter_stats(hitter_df, pitcher_type, pitcher_name, pitcher_fatigue, collapse=False):
-    """타자 능력치 계산"""
-    matchup_avg_key = "RAVG" if pitcher_type in ["우투", "우언"] else "LAVG"
-    matchup_obp_key = "ROBP" if pitcher_type in ["우투", "우언"] else "LOBP"
+def get_matchup_base_stats(hitter, pitcher_type):
+    """
+    투수 유형별 타자 기본 능력치 (컨디션/피로도/붕괴 적용 전)
 
-    avg = get_weighted_stat(hitter_df, "AVG")
-    obp = get_weighted_stat(hitter_df, "OBP")
-    slg = get_weighted_stat(hitter_df, "SLG")
-    wrc_plus = get_weighted_stat(hitter_df, "wRC+")
+    returns: (avg, obp, slg, k_rate, bb_rate)
+    """
+    ratings = hitter_ratings[hitter_ids[hitter]].tolist()  # 캐시 미스 때만 호출 (한 행만 변환)
 
-    matchup_avg = get_weighted_stat(hitter_df, matchup_avg_key)
-    matchup_obp = get_weighted_stat(hitter_df, matchup_obp_key)
+    avg, obp, slg, wrc_plus, babip, k_rate, bb_rate = ratings[:H_RAVG]
 
-    babip = get_weighted_stat(hitter_df, "BABIP")
-    k_rate = get_weighted_stat(hitter_df, "K%")
-    bb_rate = get_weighted_stat(hitter_df, "BB%")
+    if pitcher_type in ["우투", "우언"]:
+        matchup_avg, matchup_obp = ratings[H_RAVG], ratings[H_ROBP]
+    else:
+        matchup_avg, matchup_obp = ratings[H_LAVG], ratings[H_LOBP]
 
-    condition = random.uniform(0.95, 1.05)
     wrc_factor = max(0.75, min(1.25, wrc_plus / 100.0)) if wrc_plus > 0 else 1.0
 
-    hybrid_avg = (0.5 * avg + 0.35 * matchup_avg + 0.15 * babip) * condition * wrc_factor
-    hybrid_obp = (0.5 * obp + 0.5 * matchup_obp) * condition * wrc_factor
-    hybrid_slg = slg * condition * wrc_factor
+    base_avg = (0.5 * avg + 0.35 * matchup_avg + 0.15 * babip) * wrc_factor
+    base_obp = (0.5 * obp + 0.5 * matchup_obp) * wrc_factor
+    base_slg = slg * wrc_factor
+
+    return base_avg, base_obp, base_slg, k_rate, bb_rate
+
+
+def get_fatigue_bucket(pitcher_name, pitcher_fatigue):
+    """
+    피로도 페널티가 같은 구간 번호
+    0: 정상(페널티 없음), -1: 한계(페널티 최대), 그 외: 0.1 단위 진행 구간
+    피로도 증가량이 모두 0.1 단위이므로 구간화해도 페널티 값은 변하지 않음
+    """
+    fatigue_start, fatigue_severe = get_fatigue_thresholds(pitcher_name)
+
+    if pitcher_fatigue < fatigue_start:
+        return 0
+    if pitcher_fatigue >= fatigue_severe:
+        return -1
+    return int(round((pitcher_fatigue - fatigue_start) * 10)) + 1
+
+
+def get_bucket_fatigue(pitcher_name, fatigue_bucket):
+    """구간 번호 → 해당 구간의 대표 피로도"""
+    fatigue_start, fatigue_severe = get_fatigue_thresholds(pitcher_name)
+
+    if fatigue_bucket == 0:
+        return 0
+    if fatigue_bucket == -1:
+        return fatigue_severe
+    return fatigue_start + (fatigue_bucket - 1) / 10.0
+
+
+def outcome_probabilities(avg, obp, slg, k_rate, bb_rate):
+    """
+    타석 결과 확률 벡터 (at_bat_result / determine_hit_type과 동일한 모델, 마르코프 엔진이 컨디션별로 사용)
+
+    returns: (strikeout, walk, single, double, triple, homerun, out)
+    """
+    iso = slg - avg
+    for min_iso, hit_types, weights in HIT_TYPE_WEIGHTS:
+        if iso > min_iso:
+            break
+
+    hit_share = dict(zip(hit_types, weights))
+    weight_sum = sum(weights)
+    k_prob = min(k_rate, 1.0)
+    bb_prob = min(bb_rate, 1.0 - k_prob)
+    hit_prob = min(obp, 1.0 - k_prob - bb_prob)
+    hits = [hit_prob * hit_share.get(h, 0) / weight_sum for h in ["single", "double", "triple", "homerun"]]
+
+    return (k_prob, bb_prob, *hits, 1.0 - k_prob - bb_prob - hit_prob)
+
+
+def compute_matchup_stats(hitter, pitcher_type, pitcher_name, fatigue_bucket, collapse):
+    """
+    컨디션 적용 전(condition=1) 타자 능력치 (피로/붕괴 반영)
+    타석 결과는 컨디션을 곱한 뒤 at_bat_result가 추첨하므로 결과 확률 벡터는 캐시하지 않음
+
+    returns: (avg, obp, slg, k_rate, bb_rate)
+    """
+    hybrid_avg, hybrid_obp, hybrid_slg, k_rate, bb_rate = get_matchup_base_stats(hitter, pitcher_type)
 
     # 투수 피로도 페널티 적용
+    pitcher_fatigue = get_bucket_fatigue(pitcher_name, fatigue_bucket)
     k_mult, bb_mult, control_factor = calculate_pitcher_fatigue_penalty(pitcher_name, pitcher_fatigue)
 
     k_rate *= k_mult  # 투수 삼진율 감소
@@ -216,47 +454,120 @@ def precompute_hitter_stats(hitter_df, pitcher_type, pitcher_name, pitcher_fatig
     return hybrid_avg, hybrid_obp, hybrid_slg, k_rate, bb_rate
 
 
-def get_base_situation_key(bases):
-    """주자 상황을 키로 변환"""
-    if bases[0] and bases[1] and bases[2]:
-        return "bases_loaded"
-    elif bases[0] and bases[1]:
-        return "first_and_second"
-    elif bases[0] and bases[2]:
-        return "first_and_third"
-    elif bases[0]:
-        return "runner_on_first"
-    else:
+class OutcomeCache:
+    """
+    (타자, 투수, 투수 유형, 피로 구간, 붕괴 여부) → 컨디션 적용 전 타자 능력치 LRU 캐시
+    같은 타자-투수 대결이 경기 내내 반복되므로 피로/붕괴 반영까지 한 번만 계산
+    """
+
+    def __init__(self, maxsize=OUTCOME_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, hitter, pitcher_type, pitcher_name, fatigue_bucket, collapse):
+        key = (hitter, pitcher_name, pitcher_type, fatigue_bucket, collapse)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = compute_matchup_stats(hitter, pitcher_type, pitcher_name, fatigue_bucket, collapse)
+        self.entries[key] = entry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def invalidate(self, hitters=(), pitchers=()):
+        """해당 타자/투수가 들어간 항목만 삭제 → 삭제 수"""
+        hitters, pitchers = set(hitters), set(pitchers)
+        stale = [key for key in self.entries if key[0] in hitters or key[1] in pitchers]
+        for key in stale:
+            del self.entries[key]
+        return len(stale)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+outcome_cache = OutcomeCache()
+
+
+def refresh_stats():
+    """
+    장기 실행 프로세스(서비스, 워커)용 데이터 갱신 확인
+    CSV가 바뀌었으면 새 스냅샷(없으면 CSV)을 다시 읽고, statiz_refresh가 기록한 변경 선수의
+    캐시 항목만 무효화 (변경 내역을 이어 받을 수 없으면 캐시 전체 삭제)
+
+    returns: 갱신된 경우 {"hitters": [...], "pitchers": [...]} (전체 무효화면 None 값), 아니면 None
+    """
+    global _fingerprint
+    fingerprint = stats_fingerprint()
+    if fingerprint == _fingerprint:
         return None
 
+    tables = statiz_snapshot.load_snapshot(DATA_DIR, fingerprint)
+    changes = statiz_snapshot.snapshot_changes(DATA_DIR) if tables is not None else None
+    if tables is None:
+        tables = load_stats_tables()
+    _bind_tables(tables)
+
+    if changes is not None and changes.get("previous") == _fingerprint:
+        outcome_cache.invalidate(changes["hitters"], changes["pitchers"])
+        changed = {"hitters": changes["hitters"], "pitchers": changes["pitchers"]}
+    else:
+        outcome_cache.clear()
+        changed = {"hitters": None, "pitchers": None}
+    _fingerprint = fingerprint
+    return changed
+
+
+# 이벤트 기록기 (event_log.EventLogWriter). None이면 기록하지 않음
+event_sink = None
+
 
-def attempt_double_play(bases, outs):
-    """병살 시도"""
-    if outs >= 2:  # 2아웃에는 병살 불가
-        return False, 0
+def precompute_hitter_stats(hitter, pitcher_type, pitcher_name, pitcher_fatigue, collapse=False):
+    """타자 능력치 계산 (캐시된 결과에 그날 컨디션만 곱함)"""
+    fatigue_bucket = get_fatigue_bucket(pitcher_name, pitcher_fatigue)
+    avg, obp, slg, k_rate, bb_rate = outcome_cache.get(
+        hitter, pitcher_type, pitcher_name, fatigue_bucket, collapse
+    )
 
-    situation_key = get_base_situation_key(bases)
-    if situation_key is None:
-        return False, 0
+    condition = pa_random.uniform(0.95, 1.05)
 
-    dp_prob = DOUBLE_PLAY_PROB.get(situation_key, 0)
+    return avg * condition, obp * condition, slg * condition, k_rate, bb_rate
 
-    if random.random() < dp_prob:
-        # 병살 성공
-        return True, 2
 
-    return False, 0
+def bases_mask(bases):
+    """[1루, 2루, 3루] → 3비트 주자 상황 (이미 정수면 그대로)"""
+    if isinstance(bases, int):
+        return bases
+    return (FIRST if bases[0] else 0) | (SECOND if bases[1] else 0) | (THIRD if bases[2] else 0)
 
 
 def attempt_sacrifice_fly(bases, outs, hitter_slg):
     """희생플라이 시도 (3루 주자 있고 아웃카운트 < 2)"""
-    if outs >= 2 or not bases[2]:
+    if outs >= 2 or not bases & THIRD:
         return False
 
     # 장타력 있는 타자일수록 확률 증가
     adjusted_prob = SAC_FLY_PROB * (1 + (hitter_slg - 0.4) * 0.5)
 
-    if random.random() < adjusted_prob:
+    if pa_random.random() < adjusted_prob:
         return True
 
     return False
@@ -297,18 +608,22 @@ def calculate_steal_probability(hitter, bases, outs, inning, score_diff, next_hi
 
 def attempt_steal(hitter, bases, outs, inning, score_diff, next_hitter):
     """고도화된 도루 시도"""
-    if not bases[0] or bases[1]:
+    if not bases & FIRST or bases & SECOND:
         return bases, False
 
     next_hitter_power = hitter_power.get(next_hitter, 0.4)
     steal_prob = calculate_steal_probability(hitter, bases, outs, inning, score_diff, next_hitter_power)
 
-    if random.random() < steal_prob:
+    if steal_random.random() < steal_prob:
         success_prob = steal_success_prob.get(hitter, 0.7)
-        if random.random() < success_prob:
-            bases[0], bases[1] = False, True
+        if steal_random.random() < success_prob:
+            bases ^= FIRST | SECOND
+            if event_sink is not None:
+                event_sink.steal(inning, hitter, outs, True)
         else:
-            bases[0] = False
+            bases &= ~FIRST
+            if event_sink is not None:
+                event_sink.steal(inning, hitter, outs, False)
             return bases, True  # 도루 실패
 
     return bases, False
@@ -326,77 +641,27 @@ def update_pitcher_fatigue(defense_team, result, bases_before):
     elif result == "walk":
         defense_team["pitcher_fatigue"][current_pitcher] += fatigue["per_walk"]
 
-    if bases_before[1] or bases_before[2]:
+    if bases_before & (SECOND | THIRD):
         defense_team["pitcher_fatigue"][current_pitcher] += fatigue["high_stress"]
 
 
 def update_game_state(result, score, outs, bases, hitter, hitter_slg, defense_team, inning, score_diff, next_hitter):
-    """게임 상태 업데이트 (병살, 희생플라이 포함)"""
-    bases_before = bases.copy()
-
-    if result == "strikeout":
-        outs += 1
+    """
+    게임 상태 업데이트 (bases는 3비트 주자 상황)
+    주자 진루/병살은 baserunning 전이표에서 한 번 추첨, 희생플라이는 타자 장타력에 따라 먼저 판정
+    """
+    bases_before = bases
 
-    elif result == "out":
-        # 희생플라이 시도
+    if result == "out":
         if attempt_sacrifice_fly(bases, outs, hitter_slg):
-            score += 1
-            bases[2] = False
-            outs += 1
-        else:
-            # 일반 아웃 - 병살 시도
-            is_dp, dp_outs = attempt_double_play(bases, outs)
-
-            if is_dp:
-                outs += dp_outs
-                # 1루 주자 제거, 다른 주자는 진루 안함
-                bases[0] = False
-            else:
-                outs += 1
-                # 주자 진루 (확률적)
-                if bases[2] and outs < 3 and random.random() < 0.15:
-                    score += 1
-                    bases[2] = False
-                if bases[1] and not bases[2] and random.random() < 0.25:
-                    bases[2], bases[1] = True, False
-
-    elif result == "walk":
-        if all(bases):
-            score += 1
-        if bases[0] and bases[1]:
-            bases[2] = True
-        if bases[0]:
-            bases[1] = True
-        bases[0] = True
-
-    elif result == "single":
-        runs = 0
-        if bases[2]:
-            runs += 1
-        if bases[1] and random.random() < 0.30:
-            runs += 1
-            bases[1] = False
-        score += runs
-        bases = [True] + bases[:2]
-
-    elif result == "double":
-        runs = 0
-        if bases[2]: runs += 1
-        if bases[1]: runs += 1
-        if bases[0] and random.random() < 0.40:
-            runs += 1
+            bases, runs, outs_added = advance_runners(EV_SAC_FLY, outs, bases)
         else:
-            bases[2] = bases[0]
-        score += runs
-        bases = [False, True, bases[2] if bases[0] and random.random() >= 0.40 else False]
-
-    elif result == "triple":
-        score += sum(bases)
-        bases = [False, False, True]
-
-    elif result == "homerun":
-        score += 1 + sum(bases)
-        bases = [False, False, False]
+            # 병살/일반 아웃 진루
+            bases, runs, outs_added = advance_runners(EV_OUT, outs, bases, dp_random)
+    else:
+        bases, runs, outs_added = advance_runners(EVENT_CODES[result], outs, bases, pa_random)
+    score += runs
+    outs += outs_added
 
     update_pitcher_fatigue(defense_team, result, bases_before)
 
@@ -411,7 +676,7 @@ def update_game_state(result, score, outs, bases, hitter, hitter_slg, defense_te
 
 def at_bat_result(avg, obp, slg, k_rate, bb_rate):
     """타석 결과"""
-    r = random.random()
+    r = pa_random.random()
 
     if r < k_rate:
         return "strikeout"
@@ -427,26 +692,10 @@ def determine_hit_type(avg, slg):
     """안타 종류 - ISO 기반"""
     iso = slg - avg
 
-    if iso > 0.25:
-        return random.choices(
-            ["single", "double", "triple", "homerun"],
-            weights=[55, 25, 5, 15]
-        )[0]
-    elif iso > 0.18:
-        return random.choices(
-            ["single", "double", "triple", "homerun"],
-            weights=[60, 25, 5, 10]
-        )[0]
-    elif iso > 0.12:
-        return random.choices(
-            ["single", "double", "homerun"],
-            weights=[70, 23, 7]
-        )[0]
-    else:
-        return random.choices(
-            ["single", "double", "homerun"],
-            weights=[80, 17, 3]
-        )[0]
+    for min_iso, hit_types, weights in HIT_TYPE_WEIGHTS:
+        if iso > min_iso:
+            break
+    return pa_random.choices(hit_types, weights=weights)[0]
 
 
 def get_leverage_situation(inning, score_diff, outs, bases):
@@ -546,8 +795,8 @@ def choose_best_matchup(pitchers, next_hitters):
         total_avg = 0
 
         for h in next_hitters:
-            if h in hitters_by_player:
-                stats = precompute_hitter_stats(hitters_by_player[h], p_type, p, 0)
+            if h in hitter_ids:
+                stats = precompute_hitter_stats(h, p_type, p, 0)
                 total_avg += stats[0]
 
         if total_avg < best_score:
@@ -557,15 +806,26 @@ def choose_best_matchup(pitchers, next_hitters):
     return best_pitcher if best_pitcher else pitchers[0]
 
 
-def simulate_inning(offense_team, defense_team, inning, score_diff):
-    """이닝 시뮬레이션"""
-    score, outs = 0, 0
-    bases = [False, False, False]
+def simulate_inning(offense_team, defense_team, inning, score_diff, half_state=None):
+    """
+    이닝 시뮬레이션
+    half_state=(아웃, 주자) 지정 시 진행 중인 반 이닝을 이어서 진행 (투수 교체 판단 없음)
+    주자는 [1루, 2루, 3루] 또는 3비트 정수
+    """
+    score = 0
+    if half_state is None:
+        outs = 0
+        bases = 0
 
-    current_pitcher = choose_relief_pitcher(
-        defense_team, offense_team, inning, score_diff, outs, bases
-    )
-    defense_team["current_pitcher"] = current_pitcher
+        current_pitcher = choose_relief_pitcher(
+            defense_team, offense_team, inning, score_diff, outs, bases
+        )
+        if event_sink is not None and current_pitcher != defense_team["current_pitcher"]:
+            event_sink.pitching_change(inning, defense_team, current_pitcher)
+        defense_team["current_pitcher"] = current_pitcher
+    else:
+        outs, bases = half_state[0], bases_mask(half_state[1])
+        current_pitcher = defense_team["current_pitcher"]
 
     pitcher_collapsed = calculate_pitcher_collapse(current_pitcher)
     p_type = pitcher_types.get(current_pitcher, "우투")
@@ -573,12 +833,14 @@ def simulate_inning(offense_team, defense_team, inning, score_diff):
     while outs < 3:
         hitter = offense_team["lineup"][offense_team["batter_index"] % 9]
         next_hitter = offense_team["lineup"][(offense_team["batter_index"] + 1) % 9]
+        for stream in aligned_streams:
+            stream.start(offense_team)
         offense_team["batter_index"] += 1
 
         pitcher_fatigue = defense_team["pitcher_fatigue"].get(current_pitcher, 0)
 
         stats = precompute_hitter_stats(
-            hitters_by_player[hitter],
+            hitter,
             p_type,
             current_pitcher,
             pitcher_fatigue,
@@ -588,9 +850,16 @@ def simulate_inning(offense_team, defense_team, inning, score_diff):
         result = at_bat_result(*stats)
 
         score_before = score
+        if event_sink is not None:
+            state_before = (outs, bases, pitcher_fatigue)
         score, outs, bases = update_game_state(
             result, score, outs, bases, hitter, stats[2], defense_team, inning, score_diff, next_hitter
         )
+        if event_sink is not None:
+            event_sink.plate_appearance(
+                inning, offense_team["name"], hitter, current_pitcher, *state_before, result, score - score_before,
+                outs, bases
+            )
 
         if current_pitcher == defense_team["starter"]:
             runs_this_ab = score - score_before
@@ -599,8 +868,8 @@ def simulate_inning(offense_team, defense_team, inning, score_diff):
     return score
 
 
-def simulate_game(_=None):
-    """경기 시뮬레이션"""
+def default_teams():
+    """기본 매치업 (KIA vs KT)"""
     team_A = create_team(
         "KIA",
         ["박찬호", "오선우", "김도영", "최형우", "김선빈", "이우성", "한준수", "김호령", "최원준"],
@@ -627,78 +896,358 @@ def simulate_game(_=None):
         }
     )
 
-    t1 = {
-        **team_A,
-        "batter_index": 0,
-        "pitcher_fatigue": {p: 0 for p in [team_A["starter"]] + team_A["bullpen"]},
-        "current_pitcher": team_A["starter"],
-        "starter_runs_allowed": 0
-    }
+    return team_A, team_B
+
+
+_default_matchup = None
+
+
+def default_matchup():
+    """기본 매치업을 한 번만 구성해 재사용 (play_game은 팀 dict를 바꾸지 않음)"""
+    global _default_matchup
+    if _default_matchup is None:
+        _default_matchup = default_teams()
+    return _default_matchup
+
 
-    t2 = {
-        **team_B,
+def new_game_state(team):
+    """경기 시작 시점의 팀 상태 (타순 위치, 투수 피로도, 현재 투수)"""
+    return {
+        **team,
         "batter_index": 0,
-        "pitcher_fatigue": {p: 0 for p in [team_B["starter"]] + team_B["bullpen"]},
-        "current_pitcher": team_B["starter"],
+        "pitcher_fatigue": {p: 0 for p in [team["starter"]] + team["bullpen"]},
+        "current_pitcher": team["starter"],
         "starter_runs_allowed": 0
     }
 
-    score1 = score2 = 0
 
-    for inning in range(1, 10):
-        score_diff = score1 - score2
-        score1 += simulate_inning(t1, t2, inning, score_diff)
+def play_game(team_A, team_B, line_score=None):
+    """
+    team_A(선공) vs team_B(후공) 한 경기 진행
+    line_score([[], []]) 지정 시 이닝별 득점을 팀별로 추가
 
-        score_diff = score2 - score1
-        score2 += simulate_inning(t2, t1, inning, score_diff)
+    returns: (team_A 득점, team_B 득점)
+    """
+    return continue_game(new_game_state(team_A), new_game_state(team_B), line_score=line_score)
 
-    if score1 == score2:
-        for inning in range(10, 13):
-            score_diff = score1 - score2
-            score1 += simulate_inning(t1, t2, inning, score_diff)
 
-            score_diff = score2 - score1
-            score2 += simulate_inning(t2, t1, inning, score_diff)
+def continue_game(t1, t2, inning=1, top=True, score1=0, score2=0, half_state=None, line_score=None):
+    """
+    진행 중인 경기를 끝까지 진행 (t1/t2: new_game_state 형식, 호출 중 변경됨)
+    inning/top: 다음에 진행할 반 이닝, half_state: 그 반 이닝이 이미 시작됐으면 (아웃, 주자)
 
-            if score1 != score2:
+    returns: (t1 최종 득점, t2 최종 득점)
+    """
+    for inning in range(inning, 13):
+        if top:
+            if inning >= 10 and score1 != score2 and half_state is None:
                 break
 
+            score_diff = score1 - score2
+            runs1 = simulate_inning(t1, t2, inning, score_diff, half_state)
+            score1 += runs1
+            half_state = None
+            if line_score is not None:
+                line_score[0].append(runs1)
+
+        score_diff = score2 - score1
+        runs2 = simulate_inning(t2, t1, inning, score_diff, half_state)
+        score2 += runs2
+        half_state = None
+        top = True
+        if line_score is not None:
+            line_score[1].append(runs2)
+
     return score1, score2
 
 
-if __name__ == "__main__":
-    match_count = 100
+# ========== 재현 가능한 난수 스트림 ==========
+def derive_seed(master_seed, *stream_key):
+    """마스터 시드와 스트림 키(경기 번호 등)로 독립 난수 시드 파생 (SeedSequence spawn_key)"""
+    state = np.random.SeedSequence(master_seed, spawn_key=stream_key).generate_state(4)
+    return int.from_bytes(state.tobytes(), "little")
 
-    print("=== KBO 시뮬레이션 시작 ===")
-    print(f"총 {match_count}경기 시뮬레이션 중...\n")
 
-    with mp.Pool() as pool:
-        results = pool.map(simulate_game, range(match_count))
+# 용도별 난수 스트림: 타석 결과(안타 때 주자 진루 포함), 도루, 병살(아웃 때 주자 진루 포함), 투수 붕괴
+# 기본은 모두 전역 random을 공유하고, seed_game_streams로 용도별 독립 스트림을 지정하면
+# 라인업/작전이 다른 두 변형에서 한쪽의 추가 도루 시도 등이 다른 용도의 난수 순서를 밀지 않음
+pa_random = steal_random = dp_random = collapse_random = random
+aligned_streams = ()  # 타석마다 다시 맞출 스트림 (seed_game_streams에서 지정)
+STREAM_PURPOSES = ("pa", "steal", "dp", "collapse")
+PURPOSE_STREAM_TAG = 2  # 용도별 스트림 키 (*경기 키, 태그) — 경기 키보다 길어 seed_game 스트림과 겹치지 않음
 
-    t1w = t2w = draw = total1 = total2 = 0
-    score_distribution = {"low": 0, "mid": 0, "high": 0}
 
-    for s1, s2 in results:
-        total1 += s1
-        total2 += s2
-        total_runs = s1 + s2
+class PlateAppearanceStream:
+    """
+    타석 단위로 다시 맞춰지는 난수 스트림 (random.Random의 random/uniform/choices 대체)
+    (공격 팀, 타석 번호)마다 난수 칸을 미리 만들고 타석 시작 시 해당 칸 처음부터 사용
+    → 두 변형에서 한 타석의 난수 사용량이 달라도 다음 타석부터 다시 같은 난수
+    blocks: [공격 팀 0/1][타석 번호] → 난수 행 (용도별 스트림이 한 행을 [start, end) 구간으로 나눠 씀)
+    """
 
-        if total_runs < 6:
-            score_distribution["low"] += 1
-        elif total_runs < 12:
-            score_distribution["mid"] += 1
-        else:
-            score_distribution["high"] += 1
+    def __init__(self, blocks, start, end, overflow_seed):
+        self.blocks = blocks
+        self.start_column, self.end = start, end
+        self.overflow_seed = overflow_seed
+        self.overflow = None
+        self.sides = {}
+        self.block = None
+        self.cursor = end
+
+    def start(self, offense_team):
+        """타석 시작 (공격 팀은 처음 나온 순서로 0/1번, 경기마다 새 스트림)"""
+        side = self.sides.setdefault(id(offense_team), len(self.sides))
+        index = offense_team["batter_index"]
+        self.block = self.blocks[side][index] if side < 2 and index < PA_STREAM_ROWS else None
+        self.cursor = self.start_column
+
+    def random(self):
+        block = self.block
+        if block is None or self.cursor >= self.end:
+            # 칸을 다 쓰면 순차 스트림으로 보충 (정렬은 다음 타석부터 다시 맞춰짐)
+            if self.overflow is None:
+                self.overflow = random.Random(self.overflow_seed)
+            return self.overflow.random()
+        self.cursor += 1
+        return block[self.cursor - 1]
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def choices(self, population, weights):
+        cum_weights = list(itertools.accumulate(weights))
+        return [population[bisect.bisect(cum_weights, self.random() * cum_weights[-1], 0, len(cum_weights) - 1)]]
+
+
+def share_random_streams():
+    """모든 용도가 전역 random을 공유 (기본)"""
+    global pa_random, steal_random, dp_random, collapse_random, aligned_streams
+    pa_random = steal_random = dp_random = collapse_random = random
+    aligned_streams = ()
+
+
+def seed_game(master_seed, *stream_key):
+    """경기 시작 전 전역 난수 상태를 해당 경기 전용 스트림으로 설정"""
+    share_random_streams()
+    random.seed(derive_seed(master_seed, *stream_key))
+
+
+def seed_game_streams(master_seed, *stream_key):
+    """
+    경기 시작 전 용도별로 독립 스트림 설정 (paired 비교용, 같은 키면 변형과 무관하게 같은 난수)
+    타석/도루/병살은 타석마다 다시 맞추고, 붕괴(반 이닝당 1회)는 순차 스트림
+    """
+    global pa_random, steal_random, dp_random, collapse_random, aligned_streams
+    seed = derive_seed(master_seed, *stream_key, PURPOSE_STREAM_TAG)
+    blocks = np.random.default_rng(seed).random((2, PA_STREAM_ROWS, sum(PA_STREAM_BLOCKS.values()))).tolist()
+    streams, start = [], 0
+    for i, width in enumerate(PA_STREAM_BLOCKS.values()):
+        streams.append(PlateAppearanceStream(blocks, start, start + width, seed + i + 1))
+        start += width
+    pa_random, steal_random, dp_random = streams
+    collapse_random = random.Random(seed + len(STREAM_PURPOSES))
+    aligned_streams = tuple(streams)
 
-        if s1 > s2:
-            t1w += 1
-        elif s2 > s1:
-            t2w += 1
-        else:
-            draw += 1
 
-    avg1 = total1 / match_count
-    avg2 = total2 / match_count
+def init_worker():
+    """fork로 물려받은 난수 상태 재설정 (워커 간 동일 스트림 방지)"""
+    share_random_streams()
+    random.seed()
+
+
+def simulate_game(game_index=None, seed=None):
+    """
+    경기 시뮬레이션
+    seed 지정 시 (seed, game_index)로 파생한 스트림을 사용하므로
+    워커 수나 실행 순서와 무관하게 같은 결과
+    """
+    if seed is not None:
+        seed_game(seed, game_index or 0)
+    team_A, team_B = default_matchup()
+    return play_game(team_A, team_B)
+
+
+def run_simulation(match_count, seed=None, processes=None):
+    """match_count 경기 병렬 시뮬레이션 → [(KIA 득점, KT 득점), ...] (경기 번호 순)"""
+    with mp.Pool(processes, initializer=init_worker) as pool:
+        return pool.map(partial(simulate_game, seed=seed), range(match_count))
+
+
+# ========== 결과 집계 ==========
+# 워커가 경기 결과를 고정 크기 히스토그램으로 모아 보내고 부모는 합산만 함
+# → 경기 수와 무관하게 메모리/전송량 일정, 정수 합이라 워커 수·완료 순서와 무관하게 같은 결과
+def new_summary():
+    """빈 집계 (팀 순서: team_A, team_B)"""
+    return {
+        "outcomes": np.zeros(3, dtype=np.int64),  # team_A 승, team_B 승, 무
+        "runs": np.zeros(2, dtype=np.int64),  # 팀별 총득점
+        "score_pairs": np.zeros((SUMMARY_MAX_SCORE + 1, SUMMARY_MAX_SCORE + 1), dtype=np.int64),
+        "inning_runs": np.zeros((2, SUMMARY_MAX_INNINGS, SUMMARY_MAX_INNING_RUNS + 1), dtype=np.int64),
+    }
+
+
+def add_game(summary, s1, s2, line_score):
+    """한 경기 결과를 집계에 추가"""
+    summary["outcomes"][0 if s1 > s2 else 1 if s2 > s1 else 2] += 1
+    summary["runs"] += (s1, s2)
+    summary["score_pairs"][min(s1, SUMMARY_MAX_SCORE), min(s2, SUMMARY_MAX_SCORE)] += 1
+    for team, innings in enumerate(line_score):
+        for inning, runs in enumerate(innings):
+            summary["inning_runs"][team, inning, min(runs, SUMMARY_MAX_INNING_RUNS)] += 1
+
+
+def merge_summaries(total, part):
+    """part를 total에 합산 (total 반환)"""
+    for key, values in part.items():
+        total[key] += values
+    return total
+
+
+def simulate_summary_chunk(task):
+    """워커 작업 단위: (seed, 첫 경기 번호, 경기 수) → 집계"""
+    seed, first_game, count = task
+    summary = new_summary()
+    for game_index in range(first_game, first_game + count):
+        if seed is not None:
+            seed_game(seed, game_index)
+        line_score = [[], []]
+        s1, s2 = play_game(*default_matchup(), line_score)
+        add_game(summary, s1, s2, line_score)
+    return summary
+
+
+def summary_tasks(first_game, match_count, seed, chunk_size=SUMMARY_CHUNK_SIZE):
+    return [
+        (seed, first, min(chunk_size, first_game + match_count - first))
+        for first in range(first_game, first_game + match_count, chunk_size)
+    ]
+
+
+def run_simulation_summary(match_count, seed=None, processes=None, chunk_size=SUMMARY_CHUNK_SIZE):
+    """match_count 경기 병렬 시뮬레이션 → 집계 (run_simulation과 같은 경기)"""
+    summary = new_summary()
+    with mp.Pool(processes, initializer=init_worker) as pool:
+        for part in pool.imap_unordered(simulate_summary_chunk, summary_tasks(0, match_count, seed, chunk_size)):
+            merge_summaries(summary, part)
+    return summary
+
+
+def summary_stats(summary):
+    """집계 → 승패, 평균 득점, 총득점 구간 분포"""
+    games = int(summary["outcomes"].sum())
+    totals = np.add.outer(np.arange(SUMMARY_MAX_SCORE + 1), np.arange(SUMMARY_MAX_SCORE + 1))
+    pairs = summary["score_pairs"]
+    return {
+        "games": games,
+        "wins": (int(summary["outcomes"][0]), int(summary["outcomes"][1])),
+        "draws": int(summary["outcomes"][2]),
+        "avg_runs": tuple(summary["runs"] / games) if games else (0.0, 0.0),
+        "score_distribution": {
+            "low": int(pairs[totals < 6].sum()),
+            "mid": int(pairs[(totals >= 6) & (totals < 12)].sum()),
+            "high": int(pairs[totals >= 12].sum()),
+        },
+    }
+
+
+def win_rate_interval(wins, games, z=CONFIDENCE_Z):
+    """승률 Wilson 신뢰구간 → (하한, 상한)"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    half_width = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return center - half_width, center + half_width
+
+
+def run_adaptive_simulation(target_half_width=0.01, time_budget=None, batch_size=ADAPTIVE_BATCH_SIZE,
+                            min_games=ADAPTIVE_MIN_GAMES, max_games=None, seed=None, processes=None):
+    """
+    KIA 승률 신뢰구간 반폭이 target_half_width 이하가 되거나 시간 예산(초)을 넘을 때까지 배치 단위 시뮬레이션
+    다음 배치를 미리 제출해 판정하는 동안에도 워커가 쉬지 않음 (중단 시 해당 배치는 버림)
+    seed 지정 시 경기 번호별 스트림을 쓰므로 시간 예산으로 멈추지 않는 한 사용 경기 수도 재현됨
+
+    returns: {"summary", "games", "interval", "half_width", "games_per_sec", "elapsed", "stop_reason"}
+    """
+    summary = new_summary()
+    games = 0
+    start = time.perf_counter()
+    chunk_size = max(1, math.ceil(batch_size / (processes or mp.cpu_count())))
+
+    with mp.Pool(processes, initializer=init_worker) as pool:
+        next_index = 0
+
+        def submit():
+            nonlocal next_index
+            size = batch_size if max_games is None else min(batch_size, max_games - next_index)
+            batch = pool.map_async(simulate_summary_chunk, summary_tasks(next_index, size, seed, chunk_size))
+            next_index += size
+            return batch
+
+        pending = submit()
+        while True:
+            batch = pending.get()
+            if max_games is None or next_index < max_games:
+                pending = submit()
+            for part in batch:
+                merge_summaries(summary, part)
+            games = int(summary["outcomes"].sum())
+
+            low, high = win_rate_interval(int(summary["outcomes"][0]), games)
+            half_width = (high - low) / 2
+            elapsed = time.perf_counter() - start
+
+            if games >= min_games and half_width <= target_half_width:
+                stop_reason = "precision"
+            elif time_budget is not None and elapsed >= time_budget:
+                stop_reason = "time_budget"
+            elif max_games is not None and games >= max_games:
+                stop_reason = "max_games"
+            else:
+                continue
+            break
+
+    return {
+        "summary": summary,
+        "games": games,
+        "interval": (low, high),
+        "half_width": half_width,
+        "games_per_sec": games / elapsed if elapsed > 0 else 0.0,
+        "elapsed": elapsed,
+        "stop_reason": stop_reason,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 경기 시뮬레이션")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None, help="마스터 시드 (지정 시 결과 재현 가능)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--target-ci", type=float, default=None,
+                        help="적응형 모드: KIA 승률 95%% 신뢰구간 반폭 목표 (예: 0.01 = ±1%%)")
+    parser.add_argument("--time-budget", type=float, default=None, help="적응형 모드 시간 예산(초)")
+    args = parser.parse_args()
+
+    print("=== KBO 시뮬레이션 시작 ===")
+
+    if args.target_ci is not None:
+        print(f"신뢰구간 ±{args.target_ci:.1%} 도달 시까지 시뮬레이션 중...\n")
+        adaptive = run_adaptive_simulation(
+            args.target_ci, time_budget=args.time_budget, seed=args.seed, processes=args.workers
+        )
+        summary = adaptive["summary"]
+    else:
+        print(f"총 {args.games}경기 시뮬레이션 중...\n")
+        adaptive = None
+        summary = run_simulation_summary(args.games, seed=args.seed, processes=args.workers)
+
+    stats = summary_stats(summary)
+    match_count = stats["games"]
+    t1w, t2w = stats["wins"]
+    draw = stats["draws"]
+    avg1, avg2 = stats["avg_runs"]
+    score_distribution = stats["score_distribution"]
 
     print("=== 시뮬레이션 결과 ===")
     print(f"{'KIA':<10} 평균 득점: {avg1:.2f} | 승: {t1w}")
@@ -712,3 +1261,10 @@ if __name__ == "__main__":
     win_rate = t1w / match_count
     print(f"\nKIA 승률: {win_rate:.3f}")
     print(f"KT 승률: {1 - win_rate:.3f}")
+
+    if adaptive:
+        low, high = adaptive["interval"]
+        stop_reasons = {"precision": "목표 정밀도 도달", "time_budget": "시간 예산 소진", "max_games": "최대 경기 수 도달"}
+        print(f"\n사용 경기 수: {adaptive['games']} ({stop_reasons[adaptive['stop_reason']]})")
+        print(f"KIA 승률 95% 신뢰구간: [{low:.3f}, {high:.3f}] (±{adaptive['half_width']:.2%})")
+        print(f"처리량: {adaptive['games_per_sec']:.0f} 경기/초")
@@ -1,13 +1,20 @@
 import os
 import time
 import random
+import argparse
 import pandas as pd
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:  # HTTP 백엔드/offline 모드는 Selenium 없이 동작 (selenium 백엔드를 쓸 때만 필요)
+    webdriver = None
+
+from crawl_pool import DEFAULT_DRIVERS, Blocked, CrawlPool, Task
+from statiz_cache import CURRENT_SEASON, PageCache, parse_units
 
 # === 설정 ===
 CHROMEDRIVER_PATH = "C:/Users/user/Downloads/chromedriver-win64/chromedriver.exe"
@@ -32,11 +39,16 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15"
 ]
 
+BASE_URL = "https://statiz.co.kr/stats/?m=main&m2=batting&reg=A&year={year}"
+PITCHER_TYPE_URL = "https://statiz.co.kr/stats/?m=main&m2=batting&year={year}&reg=A&pt={pt}"
+
 # === 유틸리티 함수 ===
 def wait(min_sec=3, max_sec=6):
     time.sleep(random.uniform(min_sec, max_sec))
 
 def setup_driver():
+    if webdriver is None:
+        raise ImportError("Selenium으로 수집하려면 selenium 패키지가 필요합니다 (pip install selenium)")
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
     options.add_argument("--disable-gpu")
@@ -57,107 +69,142 @@ def select_team(driver, team_code):
     driver.execute_script("arguments[0].click();", team_option)
     wait(3, 5)
 
-def get_table_soup(driver):
+def wait_for_table(driver):
     WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.table_type01 table")))
-    return BeautifulSoup(driver.page_source, "html.parser").select_one("div.table_type01 table")
+
+def get_table_soup(html):
+    return BeautifulSoup(html, "html.parser").select_one("div.table_type01 table")
 
 def switch_tab(driver, tab_value):
     driver.execute_script(f"$('#m3').val('{tab_value}'); searchStats('so|ob');")
     wait(2, 4)
 
+# === 페이지 목록 ===
+def team_pages(year, team_code):
+    """(연도, 팀)에 필요한 페이지: 이름 → (URL, 캐시 파라미터)"""
+    pages = {
+        tab: (BASE_URL.format(year=year), {"team": team_code, "tab": tab})
+        for tab in ["default", "deepen", "sb"]
+    }
+    for pt_code in PITCHER_TYPES:
+        pages[f"pt_{pt_code}"] = (PITCHER_TYPE_URL.format(year=year, pt=pt_code), {"team": team_code})
+    return pages
+
+# === 가져오기 (Selenium) ===
+def fetch_page(driver, task):
+    driver.get(task.url)
+    wait()
+    if is_blocked(driver): raise Blocked(task.url)
+
+    select_team(driver, task.team)
+    if is_blocked(driver): raise Blocked(task.url)
+
+    if task.split != "default" and "tab" in task.params:
+        switch_tab(driver, task.split)
+    wait_for_table(driver)
+    return driver.page_source
+
+def crawl_tasks():
+    """수집 작업 목록 (연도 × 팀 × 페이지)"""
+    return [
+        Task("hitter", year, team_code, name, url, params)
+        for year in YEARS for team_code in TEAMS
+        for name, (url, params) in team_pages(year, team_code).items()
+    ]
+
+# === 파싱 (캐시 HTML → 행) ===
+def parse_team(unit):
+    """(캐시 디렉터리, 연도, 팀 코드) → 해당 팀 선수 행 목록 (캐시에 없는 페이지가 있으면 빈 목록)"""
+    cache_dir, year, team_code = unit
+    cache = PageCache(cache_dir, offline=True)
+    team_name = TEAMS[team_code]
+    pages = team_pages(year, team_code)
+    try:
+        html = {name: cache.read(url, **params) for name, (url, params) in pages.items()}
+    except KeyError as e:
+        print(f"{year}년 {team_name} 파싱 생략: {e}")
+        return []
+
+    base_stats, pitcher_stats = {}, {}
+
+    # 기본 성적
+    for row in get_table_soup(html["default"]).select("tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) < 32: continue
+        name = cols[1].text.strip()
+        base_stats[name] = [cols[7].text.strip(), cols[26].text.strip(), cols[27].text.strip(),
+                            cols[28].text.strip(), cols[31].text.strip()]
+
+    # 심화 성적
+    for row in get_table_soup(html["deepen"]).select("tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) < 8: continue
+        name = cols[1].text.strip()
+        if name in base_stats:
+            base_stats[name] += [cols[4].text.strip(), cols[5].text.strip(), cols[7].text.strip()]
+
+    # 주루 성적
+    for row in get_table_soup(html["sb"]).select("tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) < 9: continue
+        name = cols[1].text.strip()
+        if name in base_stats:
+            base_stats[name] += [cols[5].text.strip(), cols[6].text.strip(), cols[8].text.strip()]
+
+    # 투수 유형별 성적
+    for pt_code, labels in PITCHER_TYPES.items():
+        for row in get_table_soup(html[f"pt_{pt_code}"]).select("tbody tr"):
+            cols = row.find_all("td")
+            if len(cols) < 25: continue
+            name = cols[1].text.strip()
+            if name not in pitcher_stats:
+                pitcher_stats[name] = {}
+            pitcher_stats[name][labels[0]] = cols[22].text.strip()
+            pitcher_stats[name][labels[1]] = cols[23].text.strip()
+            pitcher_stats[name][labels[2]] = cols[24].text.strip()
+
+    # 데이터 병합
+    rows = []
+    for name, values in base_stats.items():
+        row = [year, team_name, name] + values
+        for pt in PITCHER_TYPES:
+            for label in PITCHER_TYPES[pt]:
+                row.append(pitcher_stats.get(name, {}).get(label, ""))
+        if len(row) == len(COLUMNS):
+            rows.append(row)
+    return rows
+
 # === 크롤링 함수 ===
-def collect_stats():
-    all_data = []
-
-    for year in YEARS:
-        for team_code, team_name in TEAMS.items():
-            try:
-                driver = setup_driver()
-                base_stats, pitcher_stats = {}, {}
-
-                # 기본 성적
-                driver.get(f"https://statiz.co.kr/stats/?m=main&m2=batting&reg=A&year={year}")
-
-                wait()
-                if is_blocked(driver): raise Exception("403 BLOCKED")
-
-                select_team(driver, team_code)
-                if is_blocked(driver): raise Exception("403 BLOCKED")
-
-                for row in get_table_soup(driver).select("tbody tr"):
-                    cols = row.find_all("td")
-                    if len(cols) < 32: continue
-                    name = cols[1].text.strip()
-                    base_stats[name] = [cols[7].text.strip(), cols[26].text.strip(), cols[27].text.strip(),
-                                        cols[28].text.strip(), cols[31].text.strip()]
-
-                # 심화 성적
-                switch_tab(driver, 'deepen')
-                for row in get_table_soup(driver).select("tbody tr"):
-                    cols = row.find_all("td")
-                    if len(cols) < 8: continue
-                    name = cols[1].text.strip()
-                    if name in base_stats:
-                        base_stats[name] += [cols[4].text.strip(), cols[5].text.strip(), cols[7].text.strip()]
-
-                # 주루 성적
-                switch_tab(driver, 'sb')
-                for row in get_table_soup(driver).select("tbody tr"):
-                    cols = row.find_all("td")
-                    if len(cols) < 9: continue
-                    name = cols[1].text.strip()
-                    if name in base_stats:
-                        base_stats[name] += [cols[5].text.strip(), cols[6].text.strip(), cols[8].text.strip()]
-
-                # 투수 유형별 성적
-                for pt_code, labels in PITCHER_TYPES.items():
-                    driver.get(f"https://statiz.co.kr/stats/?m=main&m2=batting&year={year}&reg=A&pt={pt_code}")
-                    wait(3, 6)
-                    if is_blocked(driver): continue 
-
-                    select_team(driver, team_code)
-
-                    for row in get_table_soup(driver).select("tbody tr"):
-                        cols = row.find_all("td")
-                        if len(cols) < 25: continue
-                        name = cols[1].text.strip()
-                        if name not in pitcher_stats:
-                            pitcher_stats[name] = {}
-                        pitcher_stats[name][labels[0]] = cols[22].text.strip()
-                        pitcher_stats[name][labels[1]] = cols[23].text.strip()
-                        pitcher_stats[name][labels[2]] = cols[24].text.strip()
-
-                # 데이터 병합
-                for name, values in base_stats.items():
-                    row = [year, team_name, name] + values
-                    for pt in PITCHER_TYPES:
-                        for label in PITCHER_TYPES[pt]:
-                            row.append(pitcher_stats.get(name, {}).get(label, ""))
-                    if len(row) == len(COLUMNS):
-                        all_data.append(row)
-
-                print(f"{year}년 {team_name} 성공")
-                driver.quit()
-                wait(20, 40)
-
-            except Exception as e:
-                print(f"{year}년 {team_name} 실패: {e}")
-                try: driver.quit()
-                except: pass
-                wait(40, 60)
-    
-    return all_data
+def collect_stats(cache, workers=None, drivers=DEFAULT_DRIVERS):
+    if not cache.offline:
+        stats = CrawlPool(setup_driver, fetch_page, cache, drivers).run(crawl_tasks())
+        print(f"페이지 수집: 새로 받음 {stats['fetched']}, 캐시 {stats['skipped']}, 재시도 {stats['retries']}, "
+              f"실패 {len(stats['failed'])}")
+
+    units = [(cache.directory, year, team_code) for year in YEARS for team_code in TEAMS]
+    return [row for rows in parse_units(parse_team, units, workers) for row in rows]
 
 # === 실행 ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 타자 세부 성적 수집")
+    parser.add_argument("--offline", action="store_true", help="네트워크 없이 캐시된 HTML만으로 CSV 재생성")
+    parser.add_argument("--cache-dir", default=None, help="HTML 캐시(또는 픽스처) 디렉터리")
+    parser.add_argument("--current-season", type=int, default=CURRENT_SEASON, help="이 연도 이후는 진행 중 시즌으로 재수집")
+    parser.add_argument("--drivers", type=int, default=DEFAULT_DRIVERS, help="동시에 띄울 브라우저 수")
+    parser.add_argument("--workers", type=int, default=None, help="파싱 프로세스 수")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
     print("KBO 타자 세부 성적 수집 시작")
+    start = time.perf_counter()
 
-    result = collect_stats()
+    cache = PageCache(args.cache_dir, offline=args.offline, current_season=args.current_season)
+    result = collect_stats(cache, args.workers, args.drivers)
 
     valid_data = [row for row in result if len(row) == len(COLUMNS)]
     if len(valid_data) < len(result):
         print(f"유효하지 않은 행 {len(result) - len(valid_data)}개 제외")
 
-    pd.DataFrame(valid_data, columns=COLUMNS).to_csv(OUTPUT_PATH, index=False, encoding="utf-8-sig")
+    pd.DataFrame(valid_data, columns=COLUMNS).to_csv(args.output, index=False, encoding="utf-8-sig")
 
-    print("KBO 타자 세부 성적 수집 완료")
\ No newline at end of file
+    print(f"KBO 타자 세부 성적 수집 완료 ({time.perf_counter() - start:.1f}초, 새로 받은 페이지 {cache.fetches}개)")
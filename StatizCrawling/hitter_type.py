@@ -1,13 +1,19 @@
 import os
 import time
 import random
+import argparse
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:  # HTTP 백엔드/offline 모드는 Selenium 없이 동작 (selenium 백엔드를 쓸 때만 필요)
+    webdriver = None
+
+from crawl_pool import DEFAULT_DRIVERS, CrawlPool, HttpDriver, RateLimiter, Task
+from statiz_cache import CURRENT_SEASON, PageCache, parse_units, table_rows
 
 # === 설정 ===
 CHROMEDRIVER_PATH = "C:/Users/user/Downloads/chromedriver-win64/chromedriver.exe"
@@ -18,6 +24,13 @@ TEAMS = {
     "6002": "두산", "7002": "한화", "10001": "키움", "2002": "KIA", "11001": "NC"
 }
 HAND_MAP = {"1": "우타", "2": "좌타", "3": "양타"}
+URL_TEMPLATE = (
+    "https://statiz.co.kr/stats/?m=total&m2=batting&m3=default"
+    "&sy={sy}&ey={ey}&te={team}&reg=A&pl={pl}"
+)
+DEFAULT_BACKEND = "http"
+HTTP_MIN_INTERVAL = 1.0
+HTTP_INTERVAL_JITTER = 0.5
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15"
@@ -28,6 +41,8 @@ def wait(min_sec=2, max_sec=4):
     time.sleep(random.uniform(min_sec, max_sec))
 
 def setup_driver():
+    if webdriver is None:
+        raise ImportError("Selenium으로 수집하려면 selenium 패키지가 필요합니다 (pip install selenium)")
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
     options.add_argument("--disable-gpu")
@@ -36,56 +51,90 @@ def setup_driver():
     options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
     return webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options)
 
-def get_table(driver):
+def wait_for_table(driver):
     WebDriverWait(driver, 10).until(
         EC.presence_of_element_located((By.CSS_SELECTOR, "div.table_type01 table"))
     )
-    html = driver.find_element(By.CSS_SELECTOR, "div.table_type01 table").get_attribute("outerHTML")
-    return BeautifulSoup(html, "html.parser")
+
+def setup_http_driver():
+    return HttpDriver(user_agent=random.choice(USER_AGENTS))
+
+# === 가져오기 ===
+def fetch_page(driver, task):
+    driver.get(task.url)
+    wait()
+    wait_for_table(driver)
+    return driver.page_source
+
+def fetch_http(driver, task):
+    # 서버 렌더링 표라 JS 없이 HTML만 받으면 됨 (요청 간격은 실행기가 조절)
+    driver.get(task.url)
+    return driver.page_source
+
+# 백엔드 → (드라이버 생성, 가져오기 함수, 요청 간격 제한)
+BACKENDS = {
+    "http": (setup_http_driver, fetch_http, lambda: RateLimiter(HTTP_MIN_INTERVAL, HTTP_INTERVAL_JITTER)),
+    "selenium": (setup_driver, fetch_page, RateLimiter),
+}
+
+def crawl_tasks():
+    """수집 작업 목록 (팀 × 유형)"""
+    return [
+        Task("hitter_type", YEARS[1], team_code, pl_code,
+             URL_TEMPLATE.format(sy=YEARS[0], ey=YEARS[1], team=team_code, pl=pl_code), {})
+        for team_code in TEAMS for pl_code in HAND_MAP
+    ]
+
+# === 파싱 (캐시 HTML → 행) ===
+def parse_team(unit):
+    """(캐시 디렉터리, 팀 코드) → 해당 팀 행 목록 (캐시에 없는 페이지가 있으면 빈 목록)"""
+    cache_dir, team_code = unit
+    cache = PageCache(cache_dir, offline=True)
+    team_name = TEAMS[team_code]
+    try:
+        html = {task.split: cache.read(task.url) for task in crawl_tasks() if task.team == team_code}
+    except KeyError as e:
+        print(f"{team_name} 파싱 생략: {e}")
+        return []
+
+    rows = []
+    for pl_code, handedness in HAND_MAP.items():
+        for cols in table_rows(html[pl_code]):
+            if len(cols) < 3:
+                continue
+            name = cols[1]
+            team_info = cols[2]
+            if "P" in team_info:  # 투수 제외
+                continue
+            rows.append([name, team_name, team_info, handedness])
+    return rows
 
 # === 크롤링 함수 ===
-def crawl_hitter_types():
-    data = []
-    url_template = (
-        "https://statiz.co.kr/stats/?m=total&m2=batting&m3=default"
-        "&sy={sy}&ey={ey}&te={team}&reg=A&pl={pl}"
-    )
+def crawl_hitter_types(cache, workers=None, drivers=DEFAULT_DRIVERS, backend=DEFAULT_BACKEND):
+    if not cache.offline:
+        driver_factory, fetch, limiter = BACKENDS[backend]
+        stats = CrawlPool(driver_factory, fetch, cache, drivers, limiter()).run(crawl_tasks())
+        print(f"페이지 수집: 새로 받음 {stats['fetched']}, 캐시 {stats['skipped']}, 재시도 {stats['retries']}, "
+              f"실패 {len(stats['failed'])}")
 
-    for team_code, team_name in TEAMS.items():
-        for pl_code, handedness in HAND_MAP.items():
-            try:
-                url = url_template.format(sy=YEARS[0], ey=YEARS[1], team=team_code, pl=pl_code)
-                driver = setup_driver()
-                driver.get(url)
-                wait()
-
-                soup = get_table(driver)
-                for row in soup.select("tbody tr"):
-                    cols = row.find_all("td")
-                    if len(cols) < 3:
-                        continue
-                    name = cols[1].text.strip()
-                    team_info = cols[2].text.strip()
-                    if "P" in team_info:  # 투수 제외
-                        continue
-                    data.append([name, team_name, team_info, handedness])
-
-                print(f"{team_name} {handedness} 크롤링 성공")
-                driver.quit()
-                wait(2, 4)
-
-            except Exception as e:
-                print(f"{team_name} {handedness} 크롤링 실패: {e}")
-                try: driver.quit()
-                except: pass
-                wait(5, 8)
-
-    return data
+    units = [(cache.directory, team_code) for team_code in TEAMS]
+    return [row for rows in parse_units(parse_team, units, workers) for row in rows]
 
 # === 실행 ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 타자 유형 수집")
+    parser.add_argument("--offline", action="store_true", help="네트워크 없이 캐시된 HTML만으로 CSV 재생성")
+    parser.add_argument("--cache-dir", default=None, help="HTML 캐시(또는 픽스처) 디렉터리")
+    parser.add_argument("--current-season", type=int, default=CURRENT_SEASON, help="이 연도 이후는 진행 중 시즌으로 재수집")
+    parser.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND, help="페이지 가져오기 방식")
+    parser.add_argument("--drivers", type=int, default=DEFAULT_DRIVERS, help="동시 연결(브라우저) 수")
+    parser.add_argument("--workers", type=int, default=None, help="파싱 프로세스 수")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
     print("KBO 타자 유형(우/좌/양타) 크롤링 시작")
-    result = crawl_hitter_types()
+    cache = PageCache(args.cache_dir, offline=args.offline, current_season=args.current_season)
+    result = crawl_hitter_types(cache, args.workers, args.drivers, args.backend)
     df = pd.DataFrame(result, columns=["Name", "Team", "Team_Info", "Handedness"])
-    df.to_csv(OUTPUT_PATH, index=False, encoding="utf-8-sig")
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
     print("KBO 타자 유형 크롤링 완료")
\ No newline at end of file
@@ -0,0 +1,189 @@
+# 시뮬레이션 단계별 계측 (opt-in)
+# enable() 시 final_simulation_v6의 단계 함수들을 카운터/누적 타이머 래퍼로 교체하고,
+# disable() 시 원래 함수로 되돌림 → 꺼져 있을 때 추가 비용 없음
+# 시간은 포함 시간(inclusive): base_update에는 그 안에서 호출되는 steal 시간이 포함됨
+#
+#   python instrumentation.py --games 2000 --workers 4
+
+import argparse
+import math
+import multiprocessing as mp
+import time
+from collections import Counter
+
+import final_simulation_v6 as sim
+
+# 단계 이름 → 계측할 함수
+PHASES = {
+    "pa_resolution": "at_bat_result",
+    "hitter_stats": "precompute_hitter_stats",
+    "base_update": "update_game_state",
+    "steal": "attempt_steal",
+    "pitcher_selection": "choose_relief_pitcher",
+    "matchup": "choose_best_matchup",
+    "collapse_check": "calculate_pitcher_collapse",
+    "game": "play_game",
+}
+
+_originals = {}
+counters = Counter()  # 단계별 호출 횟수 + 이벤트 횟수
+timers = Counter()    # 단계별 누적 시간(초)
+_cache_start = (0, 0)
+
+
+def enabled():
+    return bool(_originals)
+
+
+def _timed(phase, func):
+    perf_counter = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        result = func(*args, **kwargs)
+        timers[phase] += perf_counter() - start
+        counters[phase] += 1
+        return result
+
+    return wrapper
+
+
+def _events(phase, func):
+    """단계별 이벤트 카운트 (투수 교체, 붕괴, 도루 실패)"""
+    if phase == "pitcher_selection":
+        def wrapper(defense_team, *args):
+            pitcher = func(defense_team, *args)
+            if pitcher != defense_team.get("current_pitcher"):
+                counters["pitching_changes"] += 1
+            return pitcher
+    elif phase == "collapse_check":
+        def wrapper(*args):
+            collapsed = func(*args)
+            counters["collapses"] += collapsed
+            return collapsed
+    elif phase == "steal":
+        def wrapper(*args):
+            bases, steal_out = func(*args)
+            counters["caught_stealing"] += steal_out
+            return bases, steal_out
+    else:
+        return func
+    return wrapper
+
+
+def enable():
+    """계측 시작 (이미 켜져 있으면 무시)"""
+    global _cache_start
+    if enabled():
+        return
+    for phase, name in PHASES.items():
+        original = getattr(sim, name)
+        _originals[name] = original
+        setattr(sim, name, _timed(phase, _events(phase, original)))
+    _cache_start = (sim.outcome_cache.hits, sim.outcome_cache.misses)
+
+
+def disable():
+    """원래 함수로 복원"""
+    for name, original in _originals.items():
+        setattr(sim, name, original)
+    _originals.clear()
+
+
+def reset():
+    global _cache_start
+    counters.clear()
+    timers.clear()
+    _cache_start = (sim.outcome_cache.hits, sim.outcome_cache.misses)
+
+
+def snapshot():
+    """현재까지의 계측값 (프로세스 간 전달/합산 가능한 dict)"""
+    hits, misses = sim.outcome_cache.hits, sim.outcome_cache.misses
+    return {
+        "counters": {**counters, "cache_hits": hits - _cache_start[0], "cache_misses": misses - _cache_start[1]},
+        "timers": dict(timers),
+    }
+
+
+def merge(snapshots):
+    """여러 워커의 snapshot 합산"""
+    total = {"counters": Counter(), "timers": Counter()}
+    for snap in snapshots:
+        total["counters"].update(snap["counters"])
+        total["timers"].update(snap["timers"])
+    return {"counters": dict(total["counters"]), "timers": dict(total["timers"])}
+
+
+# ========== 병렬 실행 ==========
+def _init_instrumented_worker():
+    sim.init_worker()
+    enable()
+
+
+def _simulate_chunk(task):
+    """워커: 경기 묶음 실행 → (결과, 계측값)"""
+    seed, first, count = task
+    reset()
+    start = time.perf_counter()
+    results = [sim.simulate_game(i, seed=seed) for i in range(first, first + count)]
+    timers["worker_busy"] += time.perf_counter() - start
+    return results, snapshot()
+
+
+def run_instrumented_simulation(match_count, seed=None, processes=None, chunk_size=None):
+    """
+    run_simulation과 같은 경기를 계측하며 실행
+    returns: (경기 결과 목록, 합산 계측값) - 계측값에 부모 기준 wall_time 포함
+    """
+    processes = processes or mp.cpu_count()
+    chunk_size = chunk_size or max(1, math.ceil(match_count / (processes * 4)))
+    tasks = [(seed, first, min(chunk_size, match_count - first)) for first in range(0, match_count, chunk_size)]
+
+    start = time.perf_counter()
+    with mp.Pool(processes, initializer=_init_instrumented_worker) as pool:
+        chunks = pool.map(_simulate_chunk, tasks)
+    wall_time = time.perf_counter() - start
+
+    results = [game for chunk_results, _ in chunks for game in chunk_results]
+    stats = merge(snap for _, snap in chunks)
+    stats["timers"]["wall_time"] = wall_time
+    # 워커가 경기를 돌리지 않은 시간 = 프로세스 생성, 작업 전달/결과 수신(IPC), 대기
+    stats["timers"]["pool_overhead"] = max(0.0, wall_time * processes - stats["timers"].get("worker_busy", 0.0))
+    stats["workers"] = processes
+    return results, stats
+
+
+def print_report(stats):
+    counters, timers = stats["counters"], stats["timers"]
+    games = counters.get("game", 0) or 1
+    busy = timers.get("worker_busy") or timers.get("game") or 1.0
+
+    print(f"{'단계':<20} {'호출':>10} {'누적(초)':>10} {'비율':>7} {'호출당(µs)':>11}")
+    for phase in PHASES:
+        calls = counters.get(phase, 0)
+        seconds = timers.get(phase, 0.0)
+        per_call = seconds / calls * 1e6 if calls else 0.0
+        print(f"{phase:<20} {calls:>10} {seconds:>10.3f} {seconds / busy:>7.1%} {per_call:>11.2f}")
+
+    hits, misses = counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+    print(f"\n경기당 투수 교체: {counters.get('pitching_changes', 0) / games:.2f}")
+    print(f"경기당 투수 붕괴: {counters.get('collapses', 0) / games:.3f}")
+    print(f"경기당 도루 실패: {counters.get('caught_stealing', 0) / games:.3f}")
+    print(f"경기당 타석: {counters.get('pa_resolution', 0) / games:.1f}")
+    print(f"능력치 캐시 적중률: {hits / max(1, hits + misses):.2%} ({hits} / {hits + misses})")
+    if "wall_time" in timers:
+        print(f"\n경과 {timers['wall_time']:.2f}초, 워커 {stats['workers']}개, "
+              f"풀 오버헤드(생성/IPC/대기) {timers['pool_overhead']:.2f} 워커·초")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="시뮬레이션 단계별 계측")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    _, stats = run_instrumented_simulation(args.games, seed=args.seed, processes=args.workers)
+    print(f"=== 단계별 계측 ({args.games}경기) ===")
+    print_report(stats)
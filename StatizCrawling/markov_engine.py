@@ -0,0 +1,258 @@
+# KBO 이닝 득점 기대값 - 마르코프 체인 해석 엔진
+# 상태 = (다음 타자 타순, 아웃, 주자 상황) 216개 + 3아웃 흡수 상태 9개(다음 이닝 선두 타자)
+# 전이 확률은 스칼라 엔진과 동일: 타석 결과(at_bat_result/determine_hit_type, 컨디션 균등분포 적분),
+# 주자 진루/병살/희생플라이(baserunning 전이표), 도루(calculate_steal_probability)
+#
+# 가정: 이닝 중 투수 교체 없음, 투수 피로도는 이닝 시작 값으로 고정
+#       붕괴는 이닝당 한 번 추첨되므로 (붕괴/정상) 두 체인의 혼합으로 정확히 반영
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import final_simulation_v6 as sim
+from baserunning import BASERUNNING_TABLE, EV_OUT, EV_SAC_FLY, FIRST, SECOND, THIRD
+
+N_TRANSIENT = 9 * 3 * 8
+N_STATES = N_TRANSIENT + 9
+MAX_RUNS_PER_PA = 4
+MAX_INNING_RUNS = 30  # 득점 분포 상한 (초과분은 마지막 칸에 합산)
+
+CONDITION_RANGE = (0.95, 1.05)
+
+# 주자 진루 전이표 → 분기별 확률
+_BR = BASERUNNING_TABLE
+_BR_PROB = np.diff(np.concatenate([np.zeros(_BR["cum_prob"].shape[:-1] + (1,)), _BR["cum_prob"]], axis=-1), axis=-1)
+
+
+def state_index(pos, outs, bases):
+    return (pos * 3 + outs) * 8 + bases
+
+
+# ========== 타석 결과 확률 ==========
+def _condition_nodes(avg, slg):
+    """컨디션 구간을 안타 종류 경계로 나눈 뒤 구간별 2점 가우스-르장드르 노드/가중치 (구간 내 피적분함수 2차 이하 → 정확)"""
+    low, high = CONDITION_RANGE
+    iso = slg - avg
+    cuts = sorted(
+        t / iso for t, _, _ in sim.HIT_TYPE_WEIGHTS[:-1] if iso > 0 and low < t / iso < high
+    )
+    edges = [low] + cuts + [high]
+    nodes, weights = [], []
+    for a, b in zip(edges[:-1], edges[1:]):
+        mid, half = (a + b) / 2, (b - a) / 2
+        offset = half / np.sqrt(3)
+        nodes += [mid - offset, mid + offset]
+        weights += [half / (high - low)] * 2
+    return nodes, weights
+
+
+def pa_event_probabilities(hitter, pitcher, pitcher_fatigue=0, collapse=False):
+    """
+    타석 결과 확률 (컨디션 적분) - [삼진, 볼넷, 단타, 2루타, 3루타, 홈런, 아웃, 희생플라이]
+
+    returns: (희생플라이 불가 상황 벡터, 3루 주자 & 2아웃 미만 상황 벡터)
+    """
+    p_type = sim.pitcher_types.get(pitcher, "우투")
+    bucket = sim.get_fatigue_bucket(pitcher, pitcher_fatigue)
+    avg, obp, slg, k_rate, bb_rate = sim.outcome_cache.get(hitter, p_type, pitcher, bucket, collapse)
+
+    plain = np.zeros(8)
+    sac_possible = np.zeros(8)
+    for c, w in zip(*_condition_nodes(avg, slg)):
+        probs = np.array(sim.outcome_probabilities(avg * c, obp * c, slg * c, k_rate, bb_rate))
+        sac_prob = sim.SAC_FLY_PROB * (1 + (slg * c - 0.4) * 0.5)
+        plain[:7] += w * probs
+        sac_possible[:7] += w * probs
+        sac_possible[EV_OUT] -= w * probs[EV_OUT] * sac_prob
+        sac_possible[EV_SAC_FLY] += w * probs[EV_OUT] * sac_prob
+
+    return plain, sac_possible
+
+
+# ========== 전이 행렬 ==========
+def build_transition_matrices(lineup, pitcher, inning=1, score_diff=0, pitcher_fatigue=0, collapse=False):
+    """
+    득점별 전이 행렬 T[k][s, s'] (타석 + 도루 한 번에 k점 득점하며 s → s')
+    흡수 상태(3아웃)는 자기 자신으로 유지
+    """
+    # 타자별 결과 확률 [타순, 희생플라이 가능 여부, 결과]
+    event_probs = np.array([pa_event_probabilities(h, pitcher, pitcher_fatigue, collapse) for h in lineup])
+    next_power = [sim.hitter_power.get(lineup[(pos + 1) % 9], 0.4) for pos in range(9)]
+    # 도루 시도 확률 [타순, 타석 후 아웃 카운트 0~3]
+    steal_attempt = np.zeros((9, 4))
+    for pos, hitter in enumerate(lineup):
+        for outs in range(3):
+            steal_attempt[pos, outs] = sim.calculate_steal_probability(
+                hitter, None, outs, inning, score_diff, next_power[pos]
+            )
+    steal_success = np.array([sim.steal_success_prob.get(h, 0.7) for h in lineup])
+
+    # 모든 (타순, 아웃, 주자, 결과, 진루 분기) 조합을 한 번에 전개
+    pos, outs, bases, event, branch = np.ix_(
+        np.arange(9), np.arange(3), np.arange(8), np.arange(8), np.arange(_BR_PROB.shape[-1])
+    )
+    sac_possible = ((outs < 2) & (bases & THIRD != 0)).astype(int)
+    weight = event_probs[pos, sac_possible, event] * _BR_PROB[event, outs, bases, branch]
+    new_outs = outs + _BR["outs"][event, outs, bases, branch].astype(int)
+    new_bases = _BR["state"][event, outs, bases, branch].astype(int)
+    runs = _BR["runs"][event, outs, bases, branch].astype(int)
+    shape = weight.shape
+
+    src = np.broadcast_to(state_index(pos, outs, bases), shape)
+    next_pos = np.broadcast_to((pos + 1) % 9, shape)
+    runs = np.broadcast_to(runs, shape)
+
+    def destination(dst_outs, dst_bases):
+        return np.where(dst_outs >= 3, N_TRANSIENT + next_pos, state_index(next_pos, np.minimum(dst_outs, 2), dst_bases))
+
+    can_steal = (new_bases & (FIRST | SECOND)) == FIRST
+    q = np.where(can_steal, steal_attempt[pos, np.minimum(new_outs, 3)], 0.0)
+    success = steal_success[pos]
+
+    T = np.zeros((MAX_RUNS_PER_PA + 1, N_STATES, N_STATES))
+    flows = [
+        (weight * (1 - q), destination(new_outs, new_bases)),
+        (weight * q * success, destination(new_outs, (new_bases & ~FIRST) | SECOND)),
+        (weight * q * (1 - success), destination(new_outs + 1, new_bases & ~FIRST)),
+    ]
+    for p, dst in flows:
+        p = np.broadcast_to(p, shape)
+        mask = p > 0
+        np.add.at(T, (runs[mask], src[mask], np.broadcast_to(dst, shape)[mask]), p[mask])
+
+    T[0, N_TRANSIENT:, N_TRANSIENT:] = np.eye(9)
+    return T
+
+
+def expected_runs_table(T):
+    """모든 상태의 이닝 종료까지 기대 득점 (선형 방정식 (I - Q) x = r)"""
+    Q = T[:, :N_TRANSIENT, :N_TRANSIENT].sum(axis=0)
+    reward = (np.arange(MAX_RUNS_PER_PA + 1)[:, None, None] * T[:, :N_TRANSIENT, :]).sum(axis=(0, 2))
+    return np.linalg.solve(np.eye(N_TRANSIENT) - Q, reward)
+
+
+def run_distribution_table(T, max_runs=MAX_INNING_RUNS):
+    """
+    모든 상태에서 이닝 종료까지 (추가 득점, 다음 이닝 선두 타자) 결합 분포 F[s, r, next]
+
+    F_r = Q_0 F_r + sum_k Q_k F_{r-k} + A_r  →  F_r = (I - Q_0)^-1 (sum_k Q_k F_{r-k} + A_r)
+    (Q_k: k점 득점 비흡수 전이, A_k: k점 득점 3아웃 전이). max_runs 칸에는 그 이상 득점 확률을 합산
+    """
+    Q = T[:, :N_TRANSIENT, :N_TRANSIENT]
+    A = T[:, :N_TRANSIENT, N_TRANSIENT:]
+    no_run_inverse = np.linalg.inv(np.eye(N_TRANSIENT) - Q[0])
+
+    F = np.zeros((N_TRANSIENT, max_runs + 1, 9))
+    for r in range(max_runs):
+        rhs = A[r].copy() if r <= MAX_RUNS_PER_PA else np.zeros((N_TRANSIENT, 9))
+        for k in range(1, min(r, MAX_RUNS_PER_PA) + 1):
+            rhs += Q[k] @ F[:, r - k]
+        F[:, r] = no_run_inverse @ rhs
+
+    leadoff = np.linalg.solve(np.eye(N_TRANSIENT) - Q.sum(axis=0), A.sum(axis=0))
+    F[:, max_runs] = np.maximum(leadoff - F[:, :max_runs].sum(axis=1), 0)
+    return F
+
+
+# ========== 경기 단위 ==========
+def inning_chains(lineup, pitcher, inning=1, score_diff=0, pitcher_fatigue=0):
+    """이닝 체인 목록 [(가중치, 전이 행렬)] - 정상/붕괴 혼합"""
+    collapse_prob = sim.get_collapse_probability(pitcher)
+    chains = [(1 - collapse_prob, build_transition_matrices(lineup, pitcher, inning, score_diff, pitcher_fatigue))]
+    if collapse_prob > 0:
+        chains.append(
+            (collapse_prob, build_transition_matrices(lineup, pitcher, inning, score_diff, pitcher_fatigue, True))
+        )
+    return chains
+
+
+def inning_run_expectancy(lineup, pitcher, start_pos=0, inning=1, score_diff=0, pitcher_fatigue=0):
+    """이닝 기대 득점과 득점 분포 (start_pos 타자부터, 무사 주자 없음)"""
+    start = state_index(start_pos, 0, 0)
+    expected = 0.0
+    distribution = np.zeros(MAX_INNING_RUNS + 1)
+    for weight, T in inning_chains(lineup, pitcher, inning, score_diff, pitcher_fatigue):
+        expected += weight * expected_runs_table(T)[start]
+        distribution += weight * run_distribution_table(T)[start].sum(axis=1)
+    return float(expected), distribution
+
+
+def game_run_distribution(lineup, pitcher, innings=9, score_diff=0, pitcher_fatigue=0):
+    """
+    같은 투수 상대로 innings 이닝 동안의 총득점 분포 (이닝 간 선두 타자 전이 포함, 타순 비교용)
+
+    returns: (기대 총득점, 총득점 분포)
+    """
+    max_total = MAX_INNING_RUNS * 2
+    total = np.zeros((9, max_total + 1))  # [선두 타자, 누적 득점]
+    total[0, 0] = 1.0
+    leadoff_states = [state_index(pos, 0, 0) for pos in range(9)]
+    previous = None
+
+    for inning in range(1, innings + 1):
+        chains = inning_chains(lineup, pitcher, inning, score_diff, pitcher_fatigue)
+        # 이닝이 바뀌어도 전이 행렬이 같으면(도루 가중치 구간이 같으면) 분포 재사용
+        if previous is None or any(not np.array_equal(T, T_prev) for (_, T), (_, T_prev) in zip(chains, previous[0])):
+            per_start = sum(weight * run_distribution_table(T)[leadoff_states] for weight, T in chains)
+            previous = (chains, per_start)
+        per_start = previous[1]  # [선두 타자, 이닝 득점, 다음 선두 타자]
+
+        new_total = np.zeros_like(total)
+        for pos in range(9):
+            if not total[pos].any():
+                continue
+            for next_pos in range(9):
+                conv = np.convolve(total[pos], per_start[pos, :, next_pos])
+                new_total[next_pos] += conv[:max_total + 1]
+                new_total[next_pos, -1] += conv[max_total + 1:].sum()
+        total = new_total
+
+    distribution = total.sum(axis=0)
+    return float(np.arange(max_total + 1) @ distribution), distribution
+
+
+# ========== 검증 ==========
+def simulate_innings(lineup, pitcher, n_innings, start_pos=0, inning=1, score_diff=0):
+    """스칼라 엔진(simulate_inning)으로 같은 조건의 이닝 n_innings회 → 득점 배열"""
+    offense = sim.create_team("offense", lineup, pitcher, [pitcher])
+    defense = sim.create_team("defense", lineup, pitcher, [pitcher])
+    runs = np.zeros(n_innings, dtype=np.int64)
+    for i in range(n_innings):
+        offense_state = {**offense, "batter_index": start_pos}
+        defense_state = {**defense, "pitcher_fatigue": {pitcher: 0}, "current_pitcher": pitcher,
+                         "starter_runs_allowed": 0}
+        runs[i] = sim.simulate_inning(offense_state, defense_state, inning, score_diff)
+    return runs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="마르코프 체인 이닝 득점 기대값")
+    parser.add_argument("--validate", type=int, default=0, metavar="N", help="스칼라 엔진 N이닝과 비교")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    team_A, team_B = sim.default_teams()
+    lineup, pitcher = team_A["lineup"], team_B["starter"]
+
+    start = time.perf_counter()
+    expected, distribution = inning_run_expectancy(lineup, pitcher)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"=== {team_A['name']} 타선 vs {pitcher} (1회, 1번 타자부터) ===")
+    print(f"기대 득점: {expected:.4f} ({elapsed:.1f}ms)")
+    print("득점 분포: " + " ".join(f"{r}점 {p:.3f}" for r, p in enumerate(distribution[:6])))
+
+    start = time.perf_counter()
+    game_expected, _ = game_run_distribution(lineup, pitcher)
+    print(f"9이닝 기대 득점: {game_expected:.3f} ({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    if args.validate:
+        random.seed(args.seed)
+        runs = simulate_innings(lineup, pitcher, args.validate)
+        se = runs.std(ddof=1) / np.sqrt(len(runs))
+        print(f"\n스칼라 엔진 {args.validate}이닝: 평균 {runs.mean():.4f} ± {se:.4f} "
+              f"(z={(runs.mean() - expected) / se:+.2f})")
+        observed = np.bincount(runs, minlength=6)[:6] / len(runs)
+        print("득점 분포: " + " ".join(f"{r}점 {p:.3f}" for r, p in enumerate(observed)))
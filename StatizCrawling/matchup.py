@@ -0,0 +1,451 @@
+# 매치업 계층
+# 팀 코드/이름 또는 명시적 라인업 → 기록 테이블로 로스터를 구성한 팀(create_team 결과)을 한 번만 만들고,
+# 워커 풀 초기화 때 매치업 목록을 한 번만 전달 → 작업은 (매치업 번호, 첫 경기, 경기 수)만 주고받음
+# 같은 워커 풀에서 여러 매치업을 한 번에 처리 가능
+#
+#   python matchup.py KIA KT --games 2000 --seed 1
+#   python matchup.py 5002 2002 --starter-a 임찬규
+#   python matchup.py --slate --date 2025-03-22 --output matchup_slate.csv   # 전체 45개 대진 + 일정 경기
+#   python matchup.py --paired variants.json --games 2000   # 두 변형 paired 비교
+#     variants.json: {"a": [원정 지정, 홈 지정], "b": [원정 지정, 홈 지정]} (지정 형식은 resolve_team과 같음)
+#
+# paired 비교: 두 변형이 경기마다 같은 용도별 난수 스트림(타석, 도루, 병살, 붕괴)을 쓰므로
+# 차이의 분산이 독립 시뮬레이션보다 작아 같은 정밀도에 필요한 경기 수가 줄어듦
+#
+# 시드 지정 시 경기 번호별 스트림 (seed, 경기 번호)은 매치업과 무관하게 같음 (common random numbers)
+# → 기본 매치업(KIA vs KT) 결과는 run_simulation_summary와 동일
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing as mp
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import final_simulation_v6 as sim
+from season_simulation import SCHEDULE_PATH, SEASON_YEAR, build_team_roster
+
+# Statiz 팀 코드 → 팀 이름 (크롤러와 같은 코드)
+TEAM_CODES = {
+    "5002": "LG", "1001": "삼성", "9002": "SSG", "3001": "롯데", "12001": "KT",
+    "6002": "두산", "7002": "한화", "10001": "키움", "2002": "KIA", "11001": "NC"
+}
+TEAM_NAMES = sorted(TEAM_CODES.values())
+DEFAULT_GAMES = 2000  # 매치업당 경기 수
+RUN_PERCENTILES = (10, 50, 90)  # 결과표의 양 팀 합계 득점 분위수
+# 일괄 평가 결과표 기본 컬럼 (분위수/득점 구간 컬럼은 matchup_row가 추가)
+SLATE_COLUMNS = ["kind", "date", "away", "away_starter", "home", "home_starter", "games", "away_win_pct",
+                 "home_win_pct", "draw_pct", "away_win_ci_low", "away_win_ci_high", "away_runs", "home_runs"]
+PAIRED_METRICS = ("win", "margin")  # paired 비교 지표: team_A 승 여부, 득실차(team_A - team_B)
+# create_team 역할: 투수 한 명 / 투수 목록
+SINGLE_ROLES = ("closer", "setup")
+LIST_ROLES = ("long_relief", "middle_relief")
+
+
+# ========== 팀 구성 ==========
+def team_name(code_or_name):
+    """팀 코드 또는 이름 → 팀 이름"""
+    name = TEAM_CODES.get(str(code_or_name), code_or_name)
+    if name not in TEAM_NAMES:
+        raise ValueError(f"알 수 없는 팀: {code_or_name}")
+    return name
+
+
+def _is_name_list(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def validate_team(name, lineup, starter, bullpen, roles=None):
+    """명시적 라인업 검사 (형식, 기록이 없는 선수, 타순 인원, 역할 투수) → 잘못되면 ValueError"""
+    if not _is_name_list(lineup):
+        raise ValueError(f"{name}: 타순은 선수 이름 목록이어야 합니다")
+    if not _is_name_list(bullpen):
+        raise ValueError(f"{name}: 불펜은 선수 이름 목록이어야 합니다")
+    if not isinstance(starter, str):
+        raise ValueError(f"{name}: 선발은 선수 이름이어야 합니다")
+    if roles is not None and not isinstance(roles, dict):
+        raise ValueError(f"{name}: 역할은 객체여야 합니다")
+
+    if len(lineup) != 9:
+        raise ValueError(f"{name}: 타순은 9명이어야 합니다 ({len(lineup)}명)")
+    unknown = [h for h in lineup if h not in sim.hitter_ids]
+    if unknown:
+        raise ValueError(f"{name}: 기록이 없는 타자 {unknown}")
+    if not bullpen:
+        raise ValueError(f"{name}: 불펜이 비어 있습니다")
+    unknown = [p for p in [starter, *bullpen] if p not in sim.pitcher_ids]
+    if unknown:
+        raise ValueError(f"{name}: 기록이 없는 투수 {unknown}")
+
+    pitchers = {starter, *bullpen}
+    for role, value in (roles or {}).items():
+        if role in LIST_ROLES:
+            if not _is_name_list(value):
+                raise ValueError(f"{name}: {role}은 투수 이름 목록이어야 합니다")
+            members = value
+        elif role in SINGLE_ROLES:
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"{name}: {role}은 투수 이름이어야 합니다")
+            members = [value] if value is not None else []
+        else:
+            raise ValueError(f"{name}: 알 수 없는 역할 {role}")
+        if any(p not in pitchers for p in members):
+            raise ValueError(f"{name}: {role} 투수는 선발/불펜 명단에 있어야 합니다")
+
+
+def resolve_team(spec, year=SEASON_YEAR, starter=None, rosters=None):
+    """
+    팀 지정 → create_team 결과
+    spec: 팀 코드/이름 (해당 연도 기록으로 로스터 구성, 선발은 starter 또는 로테이션 1번)
+          또는 {"name", "lineup", "starter", "bullpen", "roles"(생략 가능)} 명시적 라인업
+    rosters: 팀 이름 → build_team_roster 결과 캐시 (여러 매치업에서 같은 팀을 한 번만 구성)
+    """
+    if isinstance(spec, dict):
+        try:
+            name, lineup, spec_starter, bullpen = spec["name"], spec["lineup"], spec["starter"], spec["bullpen"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"팀 정보 누락: {e}")
+        validate_team(name, lineup, spec_starter, bullpen, spec.get("roles"))
+        return sim.create_team(name, list(lineup), spec_starter, list(bullpen), roles=spec.get("roles"))
+
+    name = team_name(spec)
+    rosters = {} if rosters is None else rosters
+    if name not in rosters:
+        rosters[name] = build_team_roster(name, year)
+    roster = rosters[name]
+
+    starter = starter or roster["rotation"][0]
+    if starter not in sim.pitcher_ids:
+        raise ValueError(f"{name}: 기록이 없는 투수 {starter}")
+    bullpen = [p for p in roster["bullpen"] if p != starter]
+    return sim.create_team(name, roster["lineup"], starter, bullpen)
+
+
+def compile_matchups(pairs, year=SEASON_YEAR):
+    """
+    [(원정 지정, 홈 지정), ...] → [(team_A, team_B), ...] (각 팀 로스터는 한 번만 구성)
+    지정은 resolve_team의 spec 또는 (spec, 선발) 쌍
+    """
+    rosters = {}
+    compiled = []
+    for away, home in pairs:
+        away_spec, away_starter = away if isinstance(away, (tuple, list)) else (away, None)
+        home_spec, home_starter = home if isinstance(home, (tuple, list)) else (home, None)
+        compiled.append((
+            resolve_team(away_spec, year, away_starter, rosters),
+            resolve_team(home_spec, year, home_starter, rosters),
+        ))
+    return compiled
+
+
+# ========== 병렬 실행 ==========
+_worker_matchups = []
+
+
+def _init_matchup_worker(matchups):
+    """워커 초기화: 매치업 목록은 워커당 한 번만 전달"""
+    _worker_matchups[:] = matchups
+    sim.init_worker()
+
+
+def simulate_matchup_chunk(task):
+    """워커 작업 단위: (seed, 매치업 번호, 첫 경기 번호, 경기 수) → (매치업 번호, 집계)"""
+    seed, index, first_game, count = task
+    team_a, team_b = _worker_matchups[index]
+    summary = sim.new_summary()
+    for game_index in range(first_game, first_game + count):
+        if seed is not None:
+            sim.seed_game(seed, game_index)
+        line_score = [[], []]
+        s1, s2 = sim.play_game(team_a, team_b, line_score)
+        sim.add_game(summary, s1, s2, line_score)
+    return index, summary
+
+
+def matchup_tasks(games, seed, chunk_size=sim.SUMMARY_CHUNK_SIZE):
+    """games: 매치업별 경기 수 목록 → 작업 목록 (큰 매치업이 앞에 오도록 정렬해 끝부분 대기 감소)"""
+    tasks = [
+        (seed, index, first, min(chunk_size, count - first))
+        for index, count in enumerate(games)
+        for first in range(0, count, chunk_size)
+    ]
+    return sorted(tasks, key=lambda task: -task[3])
+
+
+def run_matchups(matchups, games, seed=None, processes=None, chunk_size=sim.SUMMARY_CHUNK_SIZE):
+    """
+    여러 매치업을 한 워커 풀에서 실행
+    games: 모든 매치업 공통 경기 수 또는 매치업별 경기 수 목록
+
+    returns: 매치업 순서의 집계 목록 (sim.new_summary 형식)
+    """
+    games = [games] * len(matchups) if isinstance(games, int) else list(games)
+    summaries = [sim.new_summary() for _ in matchups]
+    tasks = matchup_tasks(games, seed, chunk_size)
+    processes = processes or mp.cpu_count()
+
+    if processes == 1:
+        _init_matchup_worker(matchups)
+        results = map(simulate_matchup_chunk, tasks)
+        for index, part in results:
+            sim.merge_summaries(summaries[index], part)
+    else:
+        with mp.Pool(processes, initializer=_init_matchup_worker, initargs=(matchups,)) as pool:
+            for index, part in pool.imap_unordered(simulate_matchup_chunk, tasks):
+                sim.merge_summaries(summaries[index], part)
+    return summaries
+
+
+# ========== 일괄 평가 (전체 대진 + 일정) ==========
+def all_pairings(teams=TEAM_NAMES):
+    """모든 팀 조합 (10팀 → 45개), 앞 팀이 원정, 선발은 양 팀 로테이션 1번"""
+    return list(itertools.combinations(teams, 2))
+
+
+def scheduled_games(schedule_path=SCHEDULE_PATH, date=None, year=SEASON_YEAR, rosters=None):
+    """
+    일정표 경기와 예상 선발 → [(날짜, (원정, 원정 선발), (홈, 홈 선발)), ...]
+    예상 선발: 팀마다 일정 순서대로 로테이션을 돈다고 가정 (season_simulation.simulate_season과 같음)
+    date 지정 시 그 날짜 경기만 (로테이션 순번은 그 전 경기까지 센 값)
+    """
+    rosters = {} if rosters is None else rosters
+    schedule = pd.read_csv(schedule_path, encoding="utf-8-sig").sort_values("date", kind="stable")
+    games_played = {}
+    games = []
+    for day, away, home in zip(schedule["date"], schedule["away_team"], schedule["home_team"]):
+        starters = []
+        for team in (away, home):
+            if team not in rosters:
+                rosters[team] = build_team_roster(team, year)
+            rotation = rosters[team]["rotation"]
+            starters.append(rotation[games_played.get(team, 0) % len(rotation)])
+            games_played[team] = games_played.get(team, 0) + 1
+        if date is None or day == date:
+            games.append((day, (away, starters[0]), (home, starters[1])))
+    return games
+
+
+def total_runs_percentiles(summary, percentiles=RUN_PERCENTILES):
+    """집계의 득점 쌍 히스토그램 → 양 팀 합계 득점 분위수"""
+    pairs = summary["score_pairs"]
+    totals = np.bincount(
+        np.add.outer(np.arange(pairs.shape[0]), np.arange(pairs.shape[1])).ravel(), weights=pairs.ravel()
+    )
+    cumulative = np.cumsum(totals)
+    return [int(np.searchsorted(cumulative, cumulative[-1] * q / 100)) for q in percentiles]
+
+
+def matchup_row(team_a, team_b, summary):
+    """매치업 집계 → 결과표 한 행 (승률·신뢰구간은 원정 팀 기준, % 단위)"""
+    stats = sim.summary_stats(summary)
+    games = stats["games"]
+    wins_a, wins_b = stats["wins"]
+    low, high = sim.win_rate_interval(wins_a, games)
+    row = {
+        "away": team_a["name"], "away_starter": team_a["starter"],
+        "home": team_b["name"], "home_starter": team_b["starter"],
+        "games": games,
+        "away_win_pct": wins_a / games * 100,
+        "home_win_pct": wins_b / games * 100,
+        "draw_pct": stats["draws"] / games * 100,
+        "away_win_ci_low": low * 100,
+        "away_win_ci_high": high * 100,
+        "away_runs": stats["avg_runs"][0],
+        "home_runs": stats["avg_runs"][1],
+    }
+    for q, runs in zip(RUN_PERCENTILES, total_runs_percentiles(summary)):
+        row[f"total_runs_p{q}"] = runs
+    for band, count in stats["score_distribution"].items():
+        row[f"total_{band}_pct"] = count / games * 100
+    return row
+
+
+def run_slate(pairings=True, schedule_path=SCHEDULE_PATH, date=None, games=DEFAULT_GAMES, year=SEASON_YEAR,
+              seed=None, processes=None, chunk_size=sim.SUMMARY_CHUNK_SIZE):
+    """
+    전체 대진(pairings)과 일정표 경기(schedule_path, None이면 생략)를 한 워커 풀에서 일괄 평가
+    팀/선발이 같은 매치업은 한 번만 시뮬레이션
+
+    returns: DataFrame (kind, date + matchup_row 컬럼), 평가할 경기가 없으면 기본 컬럼만 있는 빈 DataFrame
+    """
+    rosters = {}
+    entries = []
+    if pairings:
+        entries += [("pairing", "", (away, None), (home, None)) for away, home in all_pairings()]
+    if schedule_path:
+        entries += [("schedule", day, away, home) for day, away, home in scheduled_games(schedule_path, date, year, rosters)]
+
+    matchups, matchup_index, entry_index = [], {}, []
+    for _, _, (away, away_starter), (home, home_starter) in entries:
+        team_a = resolve_team(away, year, away_starter, rosters)
+        team_b = resolve_team(home, year, home_starter, rosters)
+        key = (team_a["name"], team_a["starter"], team_b["name"], team_b["starter"])
+        if key not in matchup_index:
+            matchup_index[key] = len(matchups)
+            matchups.append((team_a, team_b))
+        entry_index.append(matchup_index[key])
+    if not entries:
+        return pd.DataFrame(columns=SLATE_COLUMNS)
+
+    summaries = run_matchups(matchups, games, seed=seed, processes=processes, chunk_size=chunk_size)
+    return pd.DataFrame([
+        {"kind": kind, "date": day, **matchup_row(*matchups[i], summaries[i])}
+        for (kind, day, _, _), i in zip(entries, entry_index)
+    ])
+
+
+def print_slate(table):
+    print(f"{'구분':<6}{'날짜':<12}{'원정(선발)':<18}{'홈(선발)':<18}{'원정 승%':>9}{'95% CI':>15}{'득점':>11}")
+    for row in table.itertuples():
+        kind = "대진" if row.kind == "pairing" else "일정"
+        print(
+            f"{kind:<6}{row.date:<12}{f'{row.away}({row.away_starter})':<18}{f'{row.home}({row.home_starter})':<18}"
+            f"{row.away_win_pct:>9.1f}{f'{row.away_win_ci_low:.1f}~{row.away_win_ci_high:.1f}':>15}"
+            f"{f'{row.away_runs:.1f}:{row.home_runs:.1f}':>11}"
+        )
+
+
+# ========== 변형 비교 (common random numbers) ==========
+def simulate_paired_chunk(task):
+    """
+    워커 작업 단위: (seed, 첫 경기 번호, 경기 수) → 지표별 [Σa, Σb, Σa², Σb², Σab]
+    두 변형(_worker_matchups[0], [1])은 경기마다 같은 용도별 스트림으로 진행
+    """
+    seed, first_game, count = task
+    sums = np.zeros((len(PAIRED_METRICS), 5))
+    for game_index in range(first_game, first_game + count):
+        values = []
+        for team_a, team_b in _worker_matchups:
+            sim.seed_game_streams(seed, game_index)
+            s1, s2 = sim.play_game(team_a, team_b)
+            values.append((float(s1 > s2), float(s1 - s2)))
+        a, b = np.array(values)
+        sums += np.column_stack([a, b, a * a, b * b, a * b])
+    sim.share_random_streams()
+    return sums
+
+
+def paired_stats(sums, games):
+    """
+    지표별 합계 → {지표: {"a", "b", "diff"(b - a), "se", "se_independent", "variance_ratio"}}
+    se_independent: 같은 경기 수를 독립 스트림으로 돌렸을 때의 차이 표준오차
+    variance_ratio: 독립 대비 분산 비 (같은 정밀도에 필요한 경기 수 배율)
+    """
+    result = {}
+    for metric, (sum_a, sum_b, sum_aa, sum_bb, sum_ab) in zip(PAIRED_METRICS, sums):
+        mean_a, mean_b = sum_a / games, sum_b / games
+        var_a = sum_aa / games - mean_a ** 2
+        var_b = sum_bb / games - mean_b ** 2
+        covariance = sum_ab / games - mean_a * mean_b
+        dof = max(games - 1, 1)
+        var_diff = max(var_a + var_b - 2 * covariance, 0.0)
+        se = math.sqrt(var_diff / dof)
+        se_independent = math.sqrt((var_a + var_b) / dof)
+        result[metric] = {
+            "a": mean_a, "b": mean_b, "diff": mean_b - mean_a,
+            "se": se, "se_independent": se_independent,
+            "variance_ratio": (se_independent / se) ** 2 if se > 0 else math.inf,
+        }
+    return result
+
+
+def run_paired(variant_a, variant_b, games, seed=None, processes=None, chunk_size=sim.SUMMARY_CHUNK_SIZE):
+    """
+    두 변형 (team_A, team_B)을 같은 경기별·용도별 난수로 games경기씩 시뮬레이션해 차이 추정
+    seed 생략 시 무작위 마스터 시드 (결과에 포함, 재현용)
+
+    returns: {"games", "seed", "metrics": paired_stats 결과}
+    """
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    tasks = sim.summary_tasks(0, games, seed, chunk_size)
+    variants = [variant_a, variant_b]
+    sums = np.zeros((len(PAIRED_METRICS), 5))
+    processes = processes or mp.cpu_count()
+
+    if processes == 1:
+        _init_matchup_worker(variants)
+        for part in map(simulate_paired_chunk, tasks):
+            sums += part
+    else:
+        with mp.Pool(processes, initializer=_init_matchup_worker, initargs=(variants,)) as pool:
+            for part in pool.imap_unordered(simulate_paired_chunk, tasks):
+                sums += part
+    return {"games": games, "seed": seed, "metrics": paired_stats(sums, games)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="두 팀 매치업 / 전체 대진 일괄 시뮬레이션")
+    parser.add_argument("away", nargs="?", help="원정(선공) 팀 코드 또는 이름")
+    parser.add_argument("home", nargs="?", help="홈(후공) 팀 코드 또는 이름")
+    parser.add_argument("--starter-a", default=None, help="원정 선발 (기본: 로테이션 1번)")
+    parser.add_argument("--starter-b", default=None, help="홈 선발 (기본: 로테이션 1번)")
+    parser.add_argument("--slate", action="store_true", help="전체 45개 대진 + 일정표 경기 일괄 평가")
+    parser.add_argument("--date", default=None, help="--slate: 이 날짜(YYYY-MM-DD) 일정 경기만")
+    parser.add_argument("--no-pairings", action="store_true", help="--slate: 전체 대진 생략 (일정 경기만)")
+    parser.add_argument("--no-schedule", action="store_true", help="--slate: 일정 경기 생략 (전체 대진만)")
+    parser.add_argument("--output", default=None, help="--slate: 결과표 CSV 저장 경로")
+    parser.add_argument("--paired", default=None, help="두 변형 paired 비교 JSON 파일 ({\"a\": [원정, 홈], \"b\": [원정, 홈]})")
+    parser.add_argument("--year", type=int, default=SEASON_YEAR, help="로스터 구성 기준 연도")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="매치업당 경기 수")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.slate:
+        start = time.perf_counter()
+        table = run_slate(
+            pairings=not args.no_pairings, schedule_path=None if args.no_schedule else SCHEDULE_PATH,
+            date=args.date, games=args.games, year=args.year, seed=args.seed, processes=args.workers
+        )
+        elapsed = time.perf_counter() - start
+        if table.empty:
+            print("=== 일괄 평가: 평가할 매치업이 없습니다 ===")
+            raise SystemExit(0)
+        print(f"=== 일괄 평가: {len(table)}개 매치업, {table['games'].sum():,}경기, {elapsed:.1f}초 ===")
+        print_slate(table)
+        if args.output:
+            table.to_csv(args.output, index=False, encoding="utf-8-sig", float_format="%.3f")
+            print(f"\n결과표 저장: {args.output}")
+        raise SystemExit(0)
+
+    if args.paired:
+        with open(args.paired, encoding="utf-8") as f:
+            variants = json.load(f)
+        variant_a, variant_b = compile_matchups([variants["a"], variants["b"]], args.year)
+        start = time.perf_counter()
+        result = run_paired(variant_a, variant_b, args.games, seed=args.seed, processes=args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"=== paired 비교: 변형당 {result['games']}경기, {elapsed:.1f}초 (seed {result['seed']}) ===")
+        for label, (team_a, team_b) in [("A", variant_a), ("B", variant_b)]:
+            print(f"{label}: {team_a['name']}({team_a['starter']}) vs {team_b['name']}({team_b['starter']}) "
+                  f"/ {', '.join(team_a['lineup'])}")
+        print(f"{'지표':<8}{'A':>9}{'B':>9}{'B-A':>9}{'SE':>8}{'독립 SE':>9}{'분산 비':>8}")
+        for metric, m in result["metrics"].items():
+            print(f"{metric:<8}{m['a']:>9.4f}{m['b']:>9.4f}{m['diff']:>+9.4f}{m['se']:>8.4f}"
+                  f"{m['se_independent']:>9.4f}{m['variance_ratio']:>8.1f}")
+        raise SystemExit(0)
+
+    if args.away is None or args.home is None:
+        parser.error("원정/홈 팀을 지정하거나 --slate / --paired를 사용하세요")
+
+    [(team_a, team_b)] = compile_matchups([((args.away, args.starter_a), (args.home, args.starter_b))], args.year)
+    start = time.perf_counter()
+    [summary] = run_matchups([(team_a, team_b)], args.games, seed=args.seed, processes=args.workers)
+    elapsed = time.perf_counter() - start
+
+    stats = sim.summary_stats(summary)
+    wins_a, wins_b = stats["wins"]
+    low, high = sim.win_rate_interval(wins_a, stats["games"])
+    print(f"=== {team_a['name']}({team_a['starter']}) vs {team_b['name']}({team_b['starter']}) "
+          f"{stats['games']}경기, {elapsed:.1f}초 ===")
+    print(f"{team_a['name']} 승률: {wins_a / stats['games']:.2%} (95% CI {low:.2%} ~ {high:.2%})")
+    print(f"{team_b['name']} 승률: {wins_b / stats['games']:.2%}")
+    print(f"무승부: {stats['draws'] / stats['games']:.2%}")
+    print(f"평균 득점: {team_a['name']} {stats['avg_runs'][0]:.2f}, {team_b['name']} {stats['avg_runs'][1]:.2f}")
+    print(f"라인업 {team_a['name']}: {', '.join(team_a['lineup'])}")
+    print(f"라인업 {team_b['name']}: {', '.join(team_b['lineup'])}")
@@ -1,13 +1,20 @@
 import os
 import time
 import random
+import argparse
 import pandas as pd
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:  # HTTP 백엔드/offline 모드는 Selenium 없이 동작 (selenium 백엔드를 쓸 때만 필요)
+    webdriver = None
+
+from crawl_pool import DEFAULT_DRIVERS, CrawlPool, Task
+from statiz_cache import CURRENT_SEASON, PageCache, parse_units
 
 CHROMEDRIVER_PATH = "C:/Users/user/Downloads/chromedriver-win64/chromedriver.exe"
 OUTPUT_PATH = "statiz_pitchers.csv"
@@ -31,10 +38,16 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15"
 ]
 
+BASE_URL = "https://statiz.co.kr/stats/?m=main&m2=pitching&reg=A&year={year}"
+DEEPEN_URL = "https://statiz.co.kr/stats/?m=main&m2=pitching&m3=deepen&year={year}&reg=A"
+SITUATION_URL = "https://statiz.co.kr/stats/?m=main&m2=pitching&m3=situation1&year={year}&reg=A&pt={bt}"
+
 def wait(min_sec=3, max_sec=6):
     time.sleep(random.uniform(min_sec, max_sec))
 
 def setup_driver():
+    if webdriver is None:
+        raise ImportError("Selenium으로 수집하려면 selenium 패키지가 필요합니다 (pip install selenium)")
     options = webdriver.ChromeOptions()
     options.add_argument("--headless=new")
     options.add_argument("--disable-gpu")
@@ -43,11 +56,13 @@ def setup_driver():
     options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
     return webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options)
 
-def get_table_soup(driver):
+def wait_for_table(driver):
     WebDriverWait(driver, 15).until(
         EC.visibility_of_element_located((By.CSS_SELECTOR, "div.table_type01 table"))
     )
-    return BeautifulSoup(driver.page_source, "html.parser").select_one("div.table_type01 table")
+
+def get_table_soup(html):
+    return BeautifulSoup(html, "html.parser").select_one("div.table_type01 table")
 
 def select_team(driver, team_code):
     WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "#select_team > button"))).click()
@@ -67,73 +82,104 @@ def set_all_pa(driver):
     driver.execute_script("arguments[0].click();", all_option)
     wait(3, 5)
 
-def collect_pitcher_stats():
-    all_data = []
-
-    for year in YEARS:
-        for team_code, team_name in TEAMS.items():
-            try:
-                driver = setup_driver()
-                pitcher_stats = {}
-
-                # 기본 성적 탭
-                driver.get(f"https://statiz.co.kr/stats/?m=main&m2=pitching&reg=A&year={year}")
-                wait()
-                select_team(driver, team_code)
-                for row in get_table_soup(driver).select("tbody tr"):
-                    cols = row.find_all("td")
-                    if len(cols) < 36: continue
-                    name = cols[1].text.strip()
-                    pitcher_stats[name] = [cols[i].text.strip() for i in [4, 10, 11, 14, 30, 34, 35]]
-
-                # 심화 탭: K%, BB%, HR/9, BABIP
-                driver.get(f"https://statiz.co.kr/stats/?m=main&m2=pitching&m3=deepen&year={year}&reg=A")
-                wait()
-                select_team(driver, team_code)
-                for row in get_table_soup(driver).select("tbody tr"):
-                    cols = row.find_all("td")
-                    if len(cols) < 13: continue
-                    name = cols[1].text.strip()
-                    if name in pitcher_stats:
-                        pitcher_stats[name] += [cols[i].text.strip() for i in [9, 10, 8, 12]]
-
-                # 상황별 우/좌타자 상대 성적
-                for bt_code, labels in BATTER_TYPES.items():
-                    driver.get(f"https://statiz.co.kr/stats/?m=main&m2=pitching&m3=situation1&year={year}&reg=A&pt={bt_code}")
-                    wait()
-                    select_team(driver, team_code)
-                    set_all_pa(driver)
-                    for row in get_table_soup(driver).select("tbody tr"):
-                        cols = row.find_all("td")
-                        if len(cols) < 22: continue
-                        name = cols[1].text.strip()
-                        if name in pitcher_stats:
-                            pitcher_stats[name] += [cols[i].text.strip() for i in [3, 19, 20, 21]]
-
-                for name, stats in pitcher_stats.items():
-                    row = [year, team_name, name] + stats
-                    if len(row) == len(COLUMNS):
-                        all_data.append(row)
-
-                print(f"{year}년 {team_name} 성공")
-                driver.quit()
-                wait(20, 40)
-
-            except Exception as e:
-                print(f"{year}년 {team_name} 실패: {type(e).__name__} - {str(e)}")
-                try: driver.quit()
-                except: pass
-                wait(40, 60)
-
-    return all_data
+def team_pages(year):
+    """연도별 필요한 페이지: 이름 → URL (팀은 페이지에서 선택)"""
+    pages = {"basic": BASE_URL.format(year=year), "deepen": DEEPEN_URL.format(year=year)}
+    for bt_code in BATTER_TYPES:
+        pages[f"bt_{bt_code}"] = SITUATION_URL.format(year=year, bt=bt_code)
+    return pages
+
+# === 가져오기 (Selenium) ===
+def fetch_page(driver, task):
+    driver.get(task.url)
+    wait()
+    select_team(driver, task.team)
+    if task.split.startswith("bt_"):
+        set_all_pa(driver)
+    wait_for_table(driver)
+    return driver.page_source
+
+def crawl_tasks():
+    """수집 작업 목록 (연도 × 팀 × 페이지)"""
+    return [
+        Task("pitcher", year, team_code, name, url, {"team": team_code})
+        for year in YEARS for team_code in TEAMS
+        for name, url in team_pages(year).items()
+    ]
+
+# === 파싱 (캐시 HTML → 행) ===
+def parse_team(unit):
+    """(캐시 디렉터리, 연도, 팀 코드) → 해당 팀 투수 행 목록 (캐시에 없는 페이지가 있으면 빈 목록)"""
+    cache_dir, year, team_code = unit
+    cache = PageCache(cache_dir, offline=True)
+    team_name = TEAMS[team_code]
+    try:
+        html = {name: cache.read(url, team=team_code) for name, url in team_pages(year).items()}
+    except KeyError as e:
+        print(f"{year}년 {team_name} 파싱 생략: {e}")
+        return []
+
+    pitcher_stats = {}
+
+    # 기본 성적 탭
+    for row in get_table_soup(html["basic"]).select("tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) < 36: continue
+        name = cols[1].text.strip()
+        pitcher_stats[name] = [cols[i].text.strip() for i in [4, 10, 11, 14, 30, 34, 35]]
+
+    # 심화 탭: K%, BB%, HR/9, BABIP
+    for row in get_table_soup(html["deepen"]).select("tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) < 13: continue
+        name = cols[1].text.strip()
+        if name in pitcher_stats:
+            pitcher_stats[name] += [cols[i].text.strip() for i in [9, 10, 8, 12]]
+
+    # 상황별 우/좌타자 상대 성적
+    for bt_code in BATTER_TYPES:
+        for row in get_table_soup(html[f"bt_{bt_code}"]).select("tbody tr"):
+            cols = row.find_all("td")
+            if len(cols) < 22: continue
+            name = cols[1].text.strip()
+            if name in pitcher_stats:
+                pitcher_stats[name] += [cols[i].text.strip() for i in [3, 19, 20, 21]]
+
+    rows = []
+    for name, stats in pitcher_stats.items():
+        row = [year, team_name, name] + stats
+        if len(row) == len(COLUMNS):
+            rows.append(row)
+    return rows
+
+def collect_pitcher_stats(cache, workers=None, drivers=DEFAULT_DRIVERS):
+    if not cache.offline:
+        stats = CrawlPool(setup_driver, fetch_page, cache, drivers).run(crawl_tasks())
+        print(f"페이지 수집: 새로 받음 {stats['fetched']}, 캐시 {stats['skipped']}, 재시도 {stats['retries']}, "
+              f"실패 {len(stats['failed'])}")
+
+    units = [(cache.directory, year, team_code) for year in YEARS for team_code in TEAMS]
+    return [row for rows in parse_units(parse_team, units, workers) for row in rows]
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 투수 성적 수집")
+    parser.add_argument("--offline", action="store_true", help="네트워크 없이 캐시된 HTML만으로 CSV 재생성")
+    parser.add_argument("--cache-dir", default=None, help="HTML 캐시(또는 픽스처) 디렉터리")
+    parser.add_argument("--current-season", type=int, default=CURRENT_SEASON, help="이 연도 이후는 진행 중 시즌으로 재수집")
+    parser.add_argument("--drivers", type=int, default=DEFAULT_DRIVERS, help="동시에 띄울 브라우저 수")
+    parser.add_argument("--workers", type=int, default=None, help="파싱 프로세스 수")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+
     print("KBO 투수 성적 수집 시작")
-    result = collect_pitcher_stats()
+    start = time.perf_counter()
+
+    cache = PageCache(args.cache_dir, offline=args.offline, current_season=args.current_season)
+    result = collect_pitcher_stats(cache, args.workers, args.drivers)
 
     valid_data = [row for row in result if len(row) == len(COLUMNS)]
     if len(valid_data) < len(result):
         print(f"유효하지 않은 행 {len(result) - len(valid_data)}개 제외")
 
-    pd.DataFrame(valid_data, columns=COLUMNS).to_csv(OUTPUT_PATH, index=False, encoding="utf-8-sig")
-    print("KBO 투수 성적 수집 완료")
+    pd.DataFrame(valid_data, columns=COLUMNS).to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"KBO 투수 성적 수집 완료 ({time.perf_counter() - start:.1f}초, 새로 받은 페이지 {cache.fetches}개)")
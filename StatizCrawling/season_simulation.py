@@ -0,0 +1,232 @@
+# KBO 정규시즌 전체 시뮬레이션
+# schedule.csv의 전 경기를 선발 로테이션대로 진행하고, 시즌 M회를 프로세스 풀로 분산
+# 작업 단위는 경기 하나가 아닌 시즌 묶음 → 결과는 시즌별 팀 승/패/무 배열만 전달
+
+import argparse
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import final_simulation_v6 as sim
+
+# ========== 설정 파라미터 ==========
+SEASON_YEAR = 2025
+SCHEDULE_PATH = os.path.join(sim.DATA_DIR, "schedule.csv")
+PLAYOFF_SPOTS = 5  # 정규시즌 5위까지 포스트시즌 진출
+ROTATION_SIZE = 5
+BULLPEN_SIZE = 8
+STARTER_MIN_IP_PER_GAME = 3.5  # 경기당 평균 이닝이 이 이상이면 선발 자원으로 분류
+
+TIEBREAK_STREAM_KEY = (0, 1)  # 시즌 스트림 키 (시즌 번호,)와 겹치지 않는 순위 동률 처리용 키
+
+
+# ========== 로스터 구성 ==========
+def innings_to_float(ip):
+    """야구식 이닝 표기(123.1 = 123과 1/3) → 실수"""
+    whole, _, outs = str(ip).partition(".")
+    return int(whole) + int(outs or 0) / 3
+
+
+def build_team_roster(team_name, year=SEASON_YEAR):
+    """
+    스탯 테이블에서 팀 로스터 구성
+    타순: 타석 수 상위 9명을 wRC+ 순으로 배치
+    로테이션: 경기당 이닝이 많은 투수 중 총 이닝 상위 5명
+    불펜: 나머지 중 등판 수 상위 8명 (create_team 기본 역할에 맞게 마무리가 마지막에 오도록 정렬)
+    """
+    hitters = sim.hitters_df[(sim.hitters_df["Year"] == year) & (sim.hitters_df["Team"] == team_name)]
+    hitters = hitters[hitters["Player"].isin(sim.hitter_ids)]
+    regulars = hitters.sort_values("PA", ascending=False)["Player"].drop_duplicates().head(9).tolist()
+    lineup = sorted(regulars, key=lambda h: -sim.hitter_ratings[sim.hitter_ids[h], sim.H_WRC])
+
+    pitchers = sim.pitchers_df[(sim.pitchers_df["Year"] == year) & (sim.pitchers_df["Team"] == team_name)].copy()
+    pitchers = pitchers.drop_duplicates("Player")
+    pitchers["innings"] = pitchers["IP"].map(innings_to_float)
+    pitchers["ip_per_game"] = pitchers["innings"] / pitchers["G"].clip(lower=1)
+
+    starters = pitchers[pitchers["ip_per_game"] >= STARTER_MIN_IP_PER_GAME]
+    rotation = starters.sort_values("innings", ascending=False)["Player"].head(ROTATION_SIZE).tolist()
+    if len(rotation) < ROTATION_SIZE:
+        extra = pitchers[~pitchers["Player"].isin(rotation)].sort_values("innings", ascending=False)
+        rotation += extra["Player"].head(ROTATION_SIZE - len(rotation)).tolist()
+
+    relievers = pitchers[~pitchers["Player"].isin(rotation)].sort_values("G", ascending=False)
+    bullpen = relievers["Player"].head(BULLPEN_SIZE).tolist()
+    bullpen.sort(key=lambda p: -sim.pitcher_quality.get(p, 5.0))
+
+    if len(lineup) < 9 or not rotation:
+        raise ValueError(f"{team_name} {year}년 로스터 구성 불가 (타자 {len(lineup)}명, 선발 {len(rotation)}명)")
+
+    return {"name": team_name, "lineup": lineup, "rotation": rotation, "bullpen": bullpen}
+
+
+def build_rotation_teams(roster):
+    """로테이션 선발별 create_team 결과 목록"""
+    return [
+        sim.create_team(roster["name"], roster["lineup"], starter, roster["bullpen"])
+        for starter in roster["rotation"]
+    ]
+
+
+def load_schedule(path=SCHEDULE_PATH):
+    """일정표 → [(원정팀, 홈팀), ...] (날짜순)"""
+    schedule = pd.read_csv(path, encoding="utf-8-sig").sort_values("date", kind="stable")
+    return list(zip(schedule["away_team"], schedule["home_team"]))
+
+
+# ========== 시즌 진행 ==========
+def simulate_season(schedule, rotation_teams, team_names):
+    """
+    일정표대로 한 시즌 진행 (팀별 선발은 자기 경기 순서대로 로테이션)
+
+    returns: int 배열[팀 수, 3] (승, 패, 무)
+    """
+    team_index = {name: i for i, name in enumerate(team_names)}
+    record = np.zeros((len(team_names), 3), dtype=np.int32)
+    games_played = dict.fromkeys(team_names, 0)
+
+    for away, home in schedule:
+        away_team = rotation_teams[away][games_played[away] % len(rotation_teams[away])]
+        home_team = rotation_teams[home][games_played[home] % len(rotation_teams[home])]
+        games_played[away] += 1
+        games_played[home] += 1
+
+        away_score, home_score = sim.play_game(away_team, home_team)
+        a, h = team_index[away], team_index[home]
+        if away_score > home_score:
+            record[a, 0] += 1
+            record[h, 1] += 1
+        elif home_score > away_score:
+            record[h, 0] += 1
+            record[a, 1] += 1
+        else:
+            record[a, 2] += 1
+            record[h, 2] += 1
+
+    return record
+
+
+_season_context = {}
+
+
+def _init_season_worker(schedule, rotation_teams, team_names, seed):
+    """워커 초기화: 일정/로스터는 워커당 한 번만 전달, fork로 물려받은 난수 상태는 재설정"""
+    _season_context.update(schedule=schedule, rotation_teams=rotation_teams, team_names=team_names, seed=seed)
+    sim.init_worker()
+
+
+def _simulate_season_chunk(chunk):
+    """워커 작업 단위: (첫 시즌 번호, 시즌 수) → (첫 시즌 번호, int 배열[시즌 수, 팀 수, 3])"""
+    first_season, n_seasons = chunk
+    ctx = _season_context
+    records = []
+    for season in range(first_season, first_season + n_seasons):
+        if ctx["seed"] is not None:
+            sim.seed_game(ctx["seed"], season)
+        records.append(simulate_season(ctx["schedule"], ctx["rotation_teams"], ctx["team_names"]))
+    return first_season, np.stack(records)
+
+
+def run_seasons(n_seasons, processes=None, chunk_size=None, schedule_path=SCHEDULE_PATH, year=SEASON_YEAR,
+                seed=None):
+    """
+    시즌 n_seasons회 병렬 시뮬레이션
+    seed 지정 시 시즌마다 (seed, 시즌 번호) 스트림을 사용하므로 워커 수와 무관하게 같은 결과
+
+    returns: (팀 이름 목록, int 배열[n_seasons, 팀 수, 3])
+    """
+    schedule = load_schedule(schedule_path)
+    team_names = sorted({team for game in schedule for team in game})
+    rotation_teams = {name: build_rotation_teams(build_team_roster(name, year)) for name in team_names}
+
+    processes = processes or mp.cpu_count()
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(n_seasons / (processes * 4)))
+    chunks = [(start, min(chunk_size, n_seasons - start)) for start in range(0, n_seasons, chunk_size)]
+
+    init_args = (schedule, rotation_teams, team_names, seed)
+    if processes == 1:
+        _init_season_worker(*init_args)
+        results = [_simulate_season_chunk(n) for n in chunks]
+    else:
+        with mp.Pool(processes, initializer=_init_season_worker, initargs=init_args) as pool:
+            results = list(pool.imap_unordered(_simulate_season_chunk, chunks))
+
+    results.sort(key=lambda result: result[0])
+    return team_names, np.concatenate([records for _, records in results])
+
+
+# ========== 결과 집계 ==========
+def season_rankings(records, rng=None):
+    """
+    시즌별 순위 (승률 = 승 / (승 + 패), 동률은 무작위)
+
+    returns: int 배열[시즌 수, 팀 수] (1위 = 1)
+    """
+    rng = rng or np.random.default_rng()
+    wins, losses = records[:, :, 0], records[:, :, 1]
+    win_pct = wins / np.maximum(wins + losses, 1)
+    tiebreak = rng.random(win_pct.shape)
+    order = np.lexsort((tiebreak, -win_pct), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, records.shape[1] + 1)[None, :], axis=1)
+    return ranks
+
+
+def summarize_seasons(team_names, records, rng=None):
+    """팀별 승수 분포, 평균 순위, 순위별 확률, 포스트시즌 진출 확률 표"""
+    ranks = season_rankings(records, rng)
+    wins = records[:, :, 0]
+
+    summary = pd.DataFrame({
+        "team": team_names,
+        "avg_W": records[:, :, 0].mean(axis=0),
+        "avg_L": records[:, :, 1].mean(axis=0),
+        "avg_D": records[:, :, 2].mean(axis=0),
+        "W_p10": np.percentile(wins, 10, axis=0),
+        "W_p50": np.percentile(wins, 50, axis=0),
+        "W_p90": np.percentile(wins, 90, axis=0),
+        "avg_rank": ranks.mean(axis=0),
+        "playoff_pct": (ranks <= PLAYOFF_SPOTS).mean(axis=0) * 100,
+    })
+    for rank in range(1, len(team_names) + 1):
+        summary[f"rank{rank}_pct"] = (ranks == rank).mean(axis=0) * 100
+
+    return summary.sort_values("avg_rank").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 정규시즌 시뮬레이션")
+    parser.add_argument("--seasons", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None, help="워커 작업당 시즌 수")
+    parser.add_argument("--output", default=None, help="팀별 요약 CSV 저장 경로")
+    parser.add_argument("--seed", type=int, default=None, help="마스터 시드 (지정 시 결과 재현 가능)")
+    args = parser.parse_args()
+
+    print("=== KBO 정규시즌 시뮬레이션 시작 ===")
+    start = time.perf_counter()
+    team_names, records = run_seasons(
+        args.seasons, processes=args.workers, chunk_size=args.chunk_size, seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+    games = args.seasons * len(load_schedule())
+    print(f"시즌 {args.seasons}회 ({games:,}경기) / {elapsed:.1f}초 ({games / elapsed:,.0f} 경기/초)\n")
+
+    tiebreak_rng = np.random.default_rng(sim.derive_seed(args.seed, *TIEBREAK_STREAM_KEY) if args.seed is not None else None)
+    summary = summarize_seasons(team_names, records, tiebreak_rng)
+    print("=== 시즌 전망 ===")
+    print(f"{'팀':<6}{'평균 승':>8}{'평균 패':>8}{'무':>6}{'승 10~90%':>12}{'평균 순위':>10}{'1위%':>8}{'PS%':>8}")
+    for row in summary.itertuples():
+        print(
+            f"{row.team:<6}{row.avg_W:>8.1f}{row.avg_L:>8.1f}{row.avg_D:>6.1f}"
+            f"{f'{row.W_p10:.0f}~{row.W_p90:.0f}':>12}{row.avg_rank:>10.2f}{row.rank1_pct:>8.1f}{row.playoff_pct:>8.1f}"
+        )
+
+    if args.output:
+        summary.to_csv(args.output, index=False, encoding="utf-8-sig")
+        print(f"\n요약 저장: {args.output}")
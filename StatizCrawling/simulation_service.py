@@ -0,0 +1,462 @@
+# KBO 승률 예측 시뮬레이션 서비스
+# 데이터 로딩/능력치 컴파일은 프로세스 시작 시 한 번만 하고, 워커 풀을 계속 유지한 채
+# 로컬 HTTP(또는 Unix 소켓) JSON API로 매치업 요청을 받아 승률을 돌려줌
+#
+#   POST /simulate  {"team_a": {...}, "team_b": {...}, "games": 1000, "seed": 1, "engine": "pool"}
+#   POST /live      {"inning": 7, "half": "top", "outs": 1, "bases": [true, false, false], "score": [3, 2],
+#                    "team_a_state": {"batter_index": 27, "current_pitcher": "...", "pitcher_fatigue": {...},
+#                                     "starter_runs_allowed": 3}, "team_b_state": {...}, "games": 400}
+#   GET  /health
+#
+# 팀 형식: {"name", "lineup": [9명], "starter", "bullpen": [...], "roles": {...}} (roles 생략 가능)
+#         또는 팀 코드/이름 ("KIA", "2002") → 기록 테이블로 로스터 구성 (matchup.resolve_team)
+# team_a/team_b 생략 시 기본 매치업(KIA vs KT), team_a가 선공
+# /live의 score는 [team_a, team_b], 팀 상태 항목은 생략 시 경기 시작 값
+# statiz_refresh로 기록이 갱신되면 다음 요청부터 새 능력치를 쓰고, 바뀐 선수가 들어간 캐시 항목만 버림
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import final_simulation_v6 as sim
+import batch_engine
+import matchup
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_GAMES = 1000
+MAX_GAMES = 200000
+ENGINES = ("pool", "batch")
+
+LIVE_DEFAULT_GAMES = 400
+LIVE_MAX_GAMES = 20000
+LIVE_SEED = 0
+LIVE_CACHE_SIZE = 4096
+LAST_INNING = 12
+
+
+class RequestError(ValueError):
+    """잘못된 요청 (HTTP 400)"""
+
+
+def _is_int(value):
+    """JSON 정수 여부 (bool은 int의 하위 클래스라 제외)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# ========== 요청 해석 ==========
+def parse_team(spec, default):
+    """요청의 팀 정보(팀 코드/이름 또는 라인업) → create_team 결과 (생략 시 default)"""
+    if spec is None:
+        return default
+    if not isinstance(spec, (str, dict)):
+        raise RequestError("팀은 팀 코드/이름 또는 라인업 객체여야 합니다")
+    try:
+        return matchup.resolve_team(spec)
+    except ValueError as e:
+        raise RequestError(str(e))
+
+
+def parse_request(payload):
+    """POST /simulate 본문 → (team_a, team_b, 경기 수, 시드, 엔진)"""
+    default_a, default_b = sim.default_matchup()
+    team_a = parse_team(payload.get("team_a"), default_a)
+    team_b = parse_team(payload.get("team_b"), default_b)
+
+    games = payload.get("games", DEFAULT_GAMES)
+    if not _is_int(games) or not 0 < games <= MAX_GAMES:
+        raise RequestError(f"games는 1~{MAX_GAMES} 정수여야 합니다")
+
+    seed = payload.get("seed")
+    if seed is not None and (not _is_int(seed) or seed < 0):
+        raise RequestError("seed는 0 이상의 정수여야 합니다")
+
+    engine = payload.get("engine", "pool")
+    if engine not in ENGINES:
+        raise RequestError(f"engine은 {ENGINES} 중 하나여야 합니다")
+
+    return team_a, team_b, games, seed, engine
+
+
+# ========== 시뮬레이션 ==========
+def simulate_matchup_chunk(task):
+    """
+    워커 작업 단위: (team_a, team_b, seed, 첫 경기 번호, 경기 수)
+    returns: (team_a 승, team_b 승, 무, team_a 총득점, team_b 총득점)
+    """
+    team_a, team_b, seed, first_game, count = task
+    sim.refresh_stats()
+    wins_a = wins_b = draws = runs_a = runs_b = 0
+
+    for game_index in range(first_game, first_game + count):
+        if seed is not None:
+            sim.seed_game(seed, game_index)
+        s1, s2 = sim.play_game(team_a, team_b)
+        runs_a += s1
+        runs_b += s2
+        if s1 > s2:
+            wins_a += 1
+        elif s2 > s1:
+            wins_b += 1
+        else:
+            draws += 1
+
+    return wins_a, wins_b, draws, runs_a, runs_b
+
+
+def summarize_matchup(team_a, team_b, totals, games):
+    """집계값 → 응답 본문"""
+    wins_a, wins_b, draws, runs_a, runs_b = totals
+    low, high = sim.win_rate_interval(wins_a, games)
+    return {
+        "games": games,
+        "team_a": {"name": team_a["name"], "win_prob": wins_a / games, "avg_runs": runs_a / games,
+                   "win_prob_ci95": [low, high]},
+        "team_b": {"name": team_b["name"], "win_prob": wins_b / games, "avg_runs": runs_b / games},
+        "draw_prob": draws / games,
+    }
+
+
+# ========== 실시간 승리 확률 ==========
+# 진행 중인 경기 상태에서 continue_game으로 남은 경기를 반복 시뮬레이션
+# 기본 시드가 고정이라 상태마다 같은 경기 번호별 난수 스트림을 사용(common random numbers)
+# → 투구마다 갱신해도 예측이 잡음 없이 상황 변화만 반영, 같은 상태는 캐시에서 응답
+def parse_team_state(team, spec):
+    """팀 + 진행 상태 → new_game_state 형식"""
+    state = sim.new_game_state(team)
+    if spec is None:
+        return state
+    if not isinstance(spec, dict):
+        raise RequestError(f"{team['name']}: 상태는 객체여야 합니다")
+
+    pitchers = set(state["pitcher_fatigue"])
+    batter_index = spec.get("batter_index", 0)
+    if not _is_int(batter_index) or batter_index < 0:
+        raise RequestError(f"{team['name']}: batter_index는 0 이상의 정수여야 합니다")
+
+    current_pitcher = spec.get("current_pitcher", team["starter"])
+    if current_pitcher not in pitchers:
+        raise RequestError(f"{team['name']}: 현재 투수 {current_pitcher}가 선발/불펜 명단에 없습니다")
+
+    fatigue = spec.get("pitcher_fatigue", {})
+    if not isinstance(fatigue, dict):
+        raise RequestError(f"{team['name']}: pitcher_fatigue는 객체여야 합니다")
+    unknown = [p for p in fatigue if p not in pitchers]
+    if unknown:
+        raise RequestError(f"{team['name']}: 명단에 없는 투수의 피로도 {unknown}")
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and v >= 0 for v in fatigue.values()):
+        raise RequestError(f"{team['name']}: 피로도는 0 이상의 숫자여야 합니다")
+
+    starter_runs = spec.get("starter_runs_allowed", 0)
+    if not _is_int(starter_runs) or starter_runs < 0:
+        raise RequestError(f"{team['name']}: starter_runs_allowed는 0 이상의 정수여야 합니다")
+
+    state.update(
+        batter_index=batter_index,
+        current_pitcher=current_pitcher,
+        starter_runs_allowed=starter_runs,
+    )
+    state["pitcher_fatigue"].update(fatigue)
+    return state
+
+
+def parse_live_request(payload):
+    """
+    POST /live 본문 → (경기 위치, 시뮬레이션 경기 수, 시드)
+    경기 위치: {"t1", "t2", "inning", "top", "score1", "score2", "half_state"}
+    """
+    default_a, default_b = sim.default_matchup()
+    team_a = parse_team(payload.get("team_a"), default_a)
+    team_b = parse_team(payload.get("team_b"), default_b)
+
+    inning = payload.get("inning", 1)
+    if not _is_int(inning) or not 1 <= inning <= LAST_INNING:
+        raise RequestError(f"inning은 1~{LAST_INNING} 정수여야 합니다")
+    half = payload.get("half", "top")
+    if half not in ("top", "bottom"):
+        raise RequestError("half는 'top' 또는 'bottom'이어야 합니다")
+
+    outs = payload.get("outs", 0)
+    if not _is_int(outs) or not 0 <= outs <= 2:
+        raise RequestError("outs는 0~2 정수여야 합니다")
+    bases = payload.get("bases", [False, False, False])
+    if not isinstance(bases, list) or len(bases) != 3 or not all(isinstance(b, bool) for b in bases):
+        raise RequestError("bases는 [1루, 2루, 3루] bool 3개여야 합니다")
+
+    score = payload.get("score", [0, 0])
+    if not isinstance(score, list) or len(score) != 2 or not all(_is_int(s) and s >= 0 for s in score):
+        raise RequestError("score는 [team_a, team_b] 0 이상의 정수 2개여야 합니다")
+
+    games = payload.get("games", LIVE_DEFAULT_GAMES)
+    if not _is_int(games) or not 0 < games <= LIVE_MAX_GAMES:
+        raise RequestError(f"games는 1~{LIVE_MAX_GAMES} 정수여야 합니다")
+    seed = payload.get("seed", LIVE_SEED)
+    if seed is not None and (not _is_int(seed) or seed < 0):
+        raise RequestError("seed는 0 이상의 정수여야 합니다")
+
+    # 반 이닝 시작 전(무사 주자 없음)이면 투수 교체 판단부터, 아니면 현재 투수로 이어서 진행
+    in_progress = outs > 0 or any(bases)
+    position = {
+        "t1": parse_team_state(team_a, payload.get("team_a_state")),
+        "t2": parse_team_state(team_b, payload.get("team_b_state")),
+        "inning": inning,
+        "top": half == "top",
+        "score1": score[0],
+        "score2": score[1],
+        "half_state": (outs, bases) if in_progress else None,
+    }
+    return position, games, seed
+
+
+def position_key(position, games, seed):
+    """캐시 키 (같은 상태/경기 수/시드면 같은 결과)"""
+    return json.dumps([position, games, seed], sort_keys=True, ensure_ascii=False)
+
+
+def position_players(position):
+    """경기 위치에 등장하는 선수 (데이터 갱신 시 캐시 무효화 판단용)"""
+    return frozenset(p for team in (position["t1"], position["t2"]) for p in [*team["lineup"], *team["pitcher_fatigue"]])
+
+
+def copy_team_state(state):
+    return {**state, "pitcher_fatigue": dict(state["pitcher_fatigue"])}
+
+
+def simulate_live_chunk(task):
+    """워커 작업 단위: (경기 위치, 시드, 첫 경기 번호, 경기 수) → 최종 점수 집계"""
+    position, seed, first_game, count = task
+    sim.refresh_stats()
+    summary = sim.new_summary()
+    no_line_score = ([], [])
+    for game_index in range(first_game, first_game + count):
+        if seed is not None:
+            sim.seed_game(seed, game_index)
+        s1, s2 = sim.continue_game(
+            copy_team_state(position["t1"]), copy_team_state(position["t2"]), position["inning"],
+            position["top"], position["score1"], position["score2"], position["half_state"],
+        )
+        sim.add_game(summary, s1, s2, no_line_score)
+    return summary
+
+
+def summarize_live(position, summary):
+    """집계 → 응답 본문"""
+    stats = sim.summary_stats(summary)
+    games = stats["games"]
+    wins_a, wins_b = stats["wins"]
+    low, high = sim.win_rate_interval(wins_a, games)
+    pairs = summary["score_pairs"]
+    return {
+        "games": games,
+        "team_a": {
+            "name": position["t1"]["name"], "win_prob": wins_a / games, "win_prob_ci95": [low, high],
+            "expected_runs": stats["avg_runs"][0], "final_score_dist": (pairs.sum(axis=1) / games).tolist(),
+        },
+        "team_b": {
+            "name": position["t2"]["name"], "win_prob": wins_b / games,
+            "expected_runs": stats["avg_runs"][1], "final_score_dist": (pairs.sum(axis=0) / games).tolist(),
+        },
+        "draw_prob": stats["draws"] / games,
+    }
+
+
+class SimulationService:
+    """데이터와 워커 풀을 유지하는 장기 실행 시뮬레이션 서비스"""
+
+    def __init__(self, processes=None):
+        self.processes = processes or mp.cpu_count()
+        self.pool = mp.Pool(self.processes, initializer=sim.init_worker)
+        self.started = time.time()
+        self.requests = 0
+        self.live_cache = OrderedDict()
+        self.live_lock = threading.Lock()
+        self.live_hits = 0
+        self.data_refreshes = 0
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def refresh_data(self):
+        """기록 데이터가 갱신됐으면 다시 읽고, 바뀐 선수가 들어간 실시간 캐시 항목만 삭제 (워커는 작업 시작 시 확인)"""
+        changed = sim.refresh_stats()
+        if changed is None:
+            return
+        with self.live_lock:
+            if changed["hitters"] is None:
+                self.live_cache.clear()
+            else:
+                players = set(changed["hitters"]) | set(changed["pitchers"])
+                for key in [k for k, (members, _) in self.live_cache.items() if members & players]:
+                    del self.live_cache[key]
+            self.data_refreshes += 1
+
+    def simulate(self, team_a, team_b, games, seed=None, engine="pool"):
+        """매치업 games 경기 → 응답 본문"""
+        if engine == "batch":
+            s1, s2 = batch_engine.simulate_games_batch(team_a, team_b, games, seed=seed)
+            totals = (
+                int((s1 > s2).sum()), int((s2 > s1).sum()), int((s1 == s2).sum()), int(s1.sum()), int(s2.sum())
+            )
+        else:
+            chunk = math.ceil(games / self.processes)
+            tasks = [
+                (team_a, team_b, seed, first, min(chunk, games - first))
+                for first in range(0, games, chunk)
+            ]
+            totals = [sum(values) for values in zip(*self.pool.map(simulate_matchup_chunk, tasks))]
+
+        self.requests += 1
+        return summarize_matchup(team_a, team_b, totals, games)
+
+    def live(self, position, games, seed=LIVE_SEED):
+        """진행 중인 경기 상태 → 응답 본문 (시드가 있으면 상태별 캐시)"""
+        key = position_key(position, games, seed) if seed is not None else None
+        with self.live_lock:
+            entry = self.live_cache.get(key) if key else None
+            cached = entry[1] if entry else None
+            if cached is not None:
+                self.live_cache.move_to_end(key)
+                self.live_hits += 1
+        if cached is None:
+            chunk = math.ceil(games / self.processes)
+            tasks = [(position, seed, first, min(chunk, games - first)) for first in range(0, games, chunk)]
+            summary = sim.new_summary()
+            for part in self.pool.map(simulate_live_chunk, tasks):
+                sim.merge_summaries(summary, part)
+            cached = summarize_live(position, summary)
+            if key:
+                with self.live_lock:
+                    self.live_cache[key] = (position_players(position), cached)
+                    if len(self.live_cache) > LIVE_CACHE_SIZE:
+                        self.live_cache.popitem(last=False)
+
+        self.requests += 1
+        return dict(cached)
+
+    def health(self):
+        return {
+            "status": "ok",
+            "workers": self.processes,
+            "uptime_sec": time.time() - self.started,
+            "requests": self.requests,
+            "live_cache": {"entries": len(self.live_cache), "hits": self.live_hits},
+            "data_refreshes": self.data_refreshes,
+        }
+
+
+# ========== HTTP 서버 ==========
+def make_handler(service):
+    class SimulationRequestHandler(BaseHTTPRequestHandler):
+        def address_string(self):
+            # Unix 소켓은 client_address가 문자열
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def send_json(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_json(self):
+            """요청 본문 → JSON 객체 (dict가 아니면 RequestError)"""
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                raise RequestError(f"Content-Length 형식 오류: {self.headers.get('Content-Length')!r}")
+            if length < 0:
+                raise RequestError(f"Content-Length 형식 오류: {length}")
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise RequestError(f"JSON 형식 오류: {e}")
+            if not isinstance(payload, dict):
+                raise RequestError(f"요청 본문은 JSON 객체여야 합니다: {type(payload).__name__}")
+            return payload
+
+        def do_GET(self):
+            if self.path == "/health":
+                self.send_json(200, service.health())
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            handlers = {"/simulate": self.handle_simulate, "/live": self.handle_live}
+            handler = handlers.get(self.path)
+            if handler is None:
+                self.send_json(404, {"error": "not found"})
+                return
+            try:
+                start = time.perf_counter()
+                service.refresh_data()
+                body = handler(self.read_json())
+                body["elapsed_ms"] = (time.perf_counter() - start) * 1000
+                self.send_json(200, body)
+            except RequestError as e:
+                self.send_json(400, {"error": str(e)})
+            except Exception as e:
+                # 워커 오류(없는 선수 등)도 연결을 끊지 않고 JSON으로 응답
+                self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def handle_simulate(self, payload):
+            team_a, team_b, games, seed, engine = parse_request(payload)
+            return service.simulate(team_a, team_b, games, seed=seed, engine=engine)
+
+        def handle_live(self, payload):
+            position, games, seed = parse_live_request(payload)
+            return service.live(position, games, seed=seed)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SimulationRequestHandler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None, processes=None):
+    """서비스 실행 (Ctrl+C로 종료)"""
+    service = SimulationService(processes)
+    handler = make_handler(service)
+
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = UnixHTTPServer(unix_socket, handler)
+        address = unix_socket
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        address = f"http://{host}:{port}"
+
+    print(f"KBO 시뮬레이션 서비스 시작: {address} (워커 {service.processes}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.remove(unix_socket)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 승률 예측 시뮬레이션 서비스")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", default=None, help="TCP 대신 사용할 Unix 소켓 경로")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.unix_socket, args.workers)
@@ -0,0 +1,118 @@
+# Statiz 페이지 HTML 디스크 캐시
+# URL + 페이지 조작 파라미터(팀, 탭, 상대 유형 등)를 키로 원본 HTML을 저장해 두고
+#  - 끝난 시즌 페이지는 다시 받지 않음
+#  - 진행 중인 시즌(CURRENT_SEASON 이후) 페이지는 max_age가 지나면 다시 받음
+#  - offline 모드에서는 네트워크 없이 캐시(또는 저장해 둔 HTML 픽스처)만 사용
+#
+# 크롤러는 가져오기(fetch, Selenium)와 파싱(HTML → 행)을 나눠서
+# 캐시에 없는 페이지만 브라우저로 받고, 파싱은 캐시에서 병렬로 수행
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import lxml.html
+except ImportError:  # lxml 없으면 BeautifulSoup(html.parser)으로 파싱
+    lxml = None
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIRNAME = "html_cache"
+CURRENT_SEASON = 2025
+IN_PROGRESS_MAX_AGE = 12 * 3600  # 진행 중인 시즌 페이지 재수집 주기(초)
+TABLE_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' table_type01 ')]//table"
+
+
+class CacheMiss(KeyError):
+    """offline 모드에서 캐시에 없는 페이지"""
+
+
+def page_key(url, **params):
+    """캐시 키 (URL + 페이지 조작 파라미터)"""
+    raw = json.dumps([url, sorted(params.items())], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """HTML 페이지 캐시"""
+
+    def __init__(self, directory=None, offline=False, current_season=CURRENT_SEASON,
+                 max_age=IN_PROGRESS_MAX_AGE):
+        self.directory = directory or os.path.join(DATA_DIR, CACHE_DIRNAME)
+        self.offline = offline
+        self.current_season = current_season
+        self.max_age = max_age
+        self.hits = self.fetches = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, url, **params):
+        key = page_key(url, **params)
+        return os.path.join(self.directory, key[:2], key + ".html")
+
+    def is_fresh(self, year, url, **params):
+        """캐시에 있고 다시 받을 필요가 없는지"""
+        path = self.path(url, **params)
+        if not os.path.exists(path):
+            return False
+        if self.offline or year < self.current_season:
+            return True
+        return time.time() - os.path.getmtime(path) < self.max_age
+
+    def read(self, url, **params):
+        path = self.path(url, **params)
+        if not os.path.exists(path):
+            raise CacheMiss(f"캐시에 없는 페이지: {url} {params}")
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def write(self, html, url, **params):
+        path = self.path(url, **params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = path + ".tmp"
+        with open(staging, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(staging, path)
+
+    def get(self, fetch, year, url, **params):
+        """
+        캐시된 HTML 반환, 없거나 오래됐으면 fetch()로 받아 저장
+        offline 모드에서 없으면 CacheMiss
+        """
+        if self.is_fresh(year, url, **params):
+            self.hits += 1
+            return self.read(url, **params)
+        if self.offline:
+            raise CacheMiss(f"캐시에 없는 페이지: {url} {params}")
+
+        html = fetch()
+        self.write(html, url, **params)
+        self.fetches += 1
+        return html
+
+
+def parse_units(parse_unit, units, workers=None):
+    """(연도, 팀) 단위 파싱을 프로세스 풀에서 병렬 실행 → 단위별 결과 목록 (입력 순서)"""
+    if workers == 1:
+        return [parse_unit(unit) for unit in units]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(parse_unit, units))
+
+
+def table_rows(html):
+    """
+    페이지의 기록 표(div.table_type01 table) → 행별 td 텍스트 목록 (th만 있는 머리글 행은 빈 목록)
+    lxml이 있으면 lxml, 없으면 BeautifulSoup으로 파싱 (결과 동일)
+    """
+    if lxml is not None:
+        tables = lxml.html.fromstring(html).xpath(TABLE_XPATH)
+        if not tables:
+            return []
+        return [[td.text_content().strip() for td in tr.xpath("./td")] for tr in tables[0].iter("tr")]
+
+    from bs4 import BeautifulSoup
+    table = BeautifulSoup(html, "html.parser").select_one("div.table_type01 table")
+    if table is None:
+        return []
+    return [[td.text.strip() for td in tr.find_all("td", recursive=False)] for tr in table.find_all("tr")]
@@ -0,0 +1,140 @@
+# 시즌 기록 증분 갱신 (시즌 중 매일 실행)
+# 새로 수집한 시즌 CSV(크롤러 출력)를 (Year, Team, Player) 키로 전체 기록 CSV에 병합하고,
+# 기록이 바뀐 선수만 능력치를 다시 계산해 스냅샷을 갱신
+#  - 바뀌지 않은 행은 원문 그대로 유지 (문자열로 읽고 씀), 새 키는 끝에 추가
+#  - 스냅샷에 이전 지문 + 변경 선수 목록을 남겨, 실행 중인 서비스/워커는
+#    final_simulation_v6.refresh_stats()로 해당 선수의 캐시만 무효화
+#
+#   python statiz_refresh.py                  # statiz_hitters_2025.csv, statiz_pitchers_2025.csv 병합
+#   python statiz_refresh.py --hitters new_hitters.csv --pitchers new_pitchers.csv
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+import final_simulation_v6 as sim
+import statiz_snapshot
+from statiz_cache import CURRENT_SEASON
+
+KEY_COLUMNS = ["Year", "Team", "Player"]
+# 기본 입력: 진행 중인 시즌 크롤링 결과
+SEASON_FILES = {"hitters": "statiz_hitters_{season}.csv", "pitchers": "statiz_pitchers_{season}.csv"}
+
+
+def read_rows(path):
+    """CSV → 문자열 DataFrame (숫자 표기를 바꾸지 않도록 변환 없이)"""
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def stage_rows(df, path):
+    """원본과 같은 형식(BOM, 줄바꿈)으로 임시 파일에 기록 → 임시 파일 경로 (교체는 호출한 쪽에서)"""
+    with open(path, "rb") as f:
+        newline = "\r\n" if b"\r\n" in f.read(4096) else "\n"
+    staging = path + ".tmp"
+    df.to_csv(staging, index=False, encoding="utf-8-sig", lineterminator=newline)
+    return staging
+
+
+def as_number(values):
+    """문자열 값 배열 → 숫자 배열 (숫자가 아니면 NaN)"""
+    return pd.DataFrame(values).apply(pd.to_numeric, errors="coerce").to_numpy()
+
+
+def merge_rows(store, delta):
+    """
+    delta 행을 키 기준으로 store에 반영 (같은 키는 교체, 새 키는 추가)
+
+    returns: (병합 DataFrame, 기록이 바뀌거나 새로 생긴 선수 이름 목록)
+    """
+    if list(delta.columns) != list(store.columns):
+        raise ValueError(f"컬럼이 다릅니다: {list(delta.columns)}")
+    delta_keys = pd.MultiIndex.from_frame(delta[KEY_COLUMNS])
+    if delta_keys.duplicated().any():
+        raise ValueError(f"중복 키: {delta_keys[delta_keys.duplicated()].tolist()[:5]}")
+
+    position = pd.MultiIndex.from_frame(store[KEY_COLUMNS]).get_indexer(delta_keys)
+    existing = position >= 0
+    old_values = store.to_numpy()[position[existing]]
+    new_values = delta.to_numpy()[existing]
+    differs = old_values != new_values
+    if differs.any():
+        # 표기만 다른 숫자("0.310" / "0.31")는 같은 값으로 봄
+        differs &= ~(as_number(old_values) == as_number(new_values))
+    differs = differs.any(axis=1)
+
+    merged = store.copy()
+    merged.iloc[position[existing][differs]] = new_values[differs]
+    added = delta[~existing]
+    if len(added):
+        merged = pd.concat([merged, added], ignore_index=True)
+
+    changed = set(delta["Player"][existing][differs]) | set(added["Player"])
+    return merged, sorted(changed)
+
+
+def refresh(deltas):
+    """
+    deltas: {"hitters": 시즌 CSV 경로, "pitchers": 시즌 CSV 경로}
+    기록 CSV 병합 → 바뀐 선수만 재컴파일 → 스냅샷 갱신
+    타자/투수 CSV는 둘 다 임시 파일에 쓴 뒤에 교체 (쓰기 실패 시 원본 그대로)
+    교체 후 스냅샷 생성이 실패하면 지문이 달라져 시뮬레이터는 CSV에서 다시 컴파일하고,
+    다시 실행하면 변경 없음으로 끝나므로 python statiz_snapshot.py로 스냅샷을 새로 만듦
+
+    returns: {"hitters": [변경 타자], "pitchers": [변경 투수]}
+    """
+    previous = sim.stats_fingerprint()
+    old_tables = None
+    changed = {"hitters": [], "pitchers": []}
+
+    staged = []
+    try:
+        for kind, delta_path in deltas.items():
+            store_path = os.path.join(sim.DATA_DIR, statiz_snapshot.SOURCE_FILES[kind])
+            merged, changed[kind] = merge_rows(read_rows(store_path), read_rows(delta_path))
+            if not changed[kind]:
+                continue
+            if old_tables is None:
+                # 갱신 전 테이블 (CSV를 덮어쓰기 전에 확보)
+                old_tables = statiz_snapshot.load_snapshot(sim.DATA_DIR, previous) or sim.load_stats_tables()
+            staged.append((stage_rows(merged, store_path), store_path))
+    except BaseException:
+        for staging, _ in staged:
+            os.remove(staging)
+        raise
+
+    if old_tables is None:
+        return changed
+    for staging, store_path in staged:
+        os.replace(staging, store_path)
+
+    hitters_df, pitchers_df = sim.read_stats_frames()
+    tables = sim.update_stats_tables(old_tables, hitters_df, pitchers_df, changed["hitters"], changed["pitchers"])
+    if tables is None:
+        tables = sim.load_stats_tables()
+    statiz_snapshot.write_snapshot(sim.DATA_DIR, tables, sim.stats_fingerprint(), changes={"previous": previous, **changed})
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="시즌 기록 증분 갱신")
+    parser.add_argument("--season", type=int, default=CURRENT_SEASON)
+    parser.add_argument("--hitters", default=None, help="타자 시즌 CSV (기본 statiz_hitters_<season>.csv)")
+    parser.add_argument("--pitchers", default=None, help="투수 시즌 CSV (기본 statiz_pitchers_<season>.csv)")
+    args = parser.parse_args()
+
+    deltas = {}
+    for kind, path in [("hitters", args.hitters), ("pitchers", args.pitchers)]:
+        path = path or os.path.join(sim.DATA_DIR, SEASON_FILES[kind].format(season=args.season))
+        if os.path.exists(path):
+            deltas[kind] = path
+        else:
+            print(f"{kind}: {path} 없음, 건너뜀")
+
+    start = time.perf_counter()
+    changed = refresh(deltas)
+    print(f"=== 증분 갱신 ({time.perf_counter() - start:.2f}초) ===")
+    for kind, players in changed.items():
+        preview = ", ".join(players[:10]) + (" ..." if len(players) > 10 else "")
+        print(f"{kind}: 변경 {len(players)}명{f' ({preview})' if players else ''}")
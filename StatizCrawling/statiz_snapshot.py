@@ -0,0 +1,171 @@
+# Statiz 데이터 바이너리 스냅샷
+# CSV 파싱/groupby/가중 평균 컴파일 결과를 버전이 붙은 NumPy 배열 디렉터리로 저장하고,
+# 시뮬레이터는 memory-map으로 읽어 시작 시간을 줄이고 워커끼리 같은 페이지를 공유
+#
+#   python statiz_snapshot.py          # 스냅샷 생성/갱신
+#
+# 원본 CSV 내용이나 연도 가중치, 스냅샷 형식이 바뀌면 자동으로 무효 처리되어 CSV에서 다시 읽음
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIRNAME = "statiz_snapshot"
+MANIFEST_NAME = "manifest.json"
+
+SOURCE_FILES = {
+    "hitters": "statiz_hitters.csv",
+    "pitchers": "statiz_pitchers.csv",
+    "hitter_types": "statiz_hitters_type.csv",
+    "pitcher_types": "statiz_pitchers_type.csv",
+}
+
+# 선수 ID 순서로 정렬된 배열
+ARRAY_TABLES = ["hitter_ratings", "pitcher_ratings", "steal_attempt", "steal_success", "hitter_power",
+                "pitcher_quality"]
+# 원본 행 단위 테이블 (컬럼별 배열로 저장, 필요할 때만 DataFrame으로 복원)
+FRAME_TABLES = ["hitters_df", "pitchers_df"]
+
+
+def snapshot_dir(data_dir):
+    return os.path.join(data_dir, SNAPSHOT_DIRNAME)
+
+
+def source_fingerprint(data_dir, year_weights, rating_columns):
+    """스냅샷 유효성 판단용 지문 (원본 CSV 해시 + 능력치 컴파일 설정)"""
+    hashes = {}
+    for name, filename in SOURCE_FILES.items():
+        with open(os.path.join(data_dir, filename), "rb") as f:
+            hashes[name] = hashlib.sha1(f.read()).hexdigest()
+    return {
+        "version": SNAPSHOT_VERSION,
+        "sources": hashes,
+        "year_weights": {str(year): weight for year, weight in sorted(year_weights.items())},
+        "rating_columns": rating_columns,
+    }
+
+
+# ========== 저장 ==========
+def _write_frame(directory, name, df):
+    """DataFrame → 컬럼별 .npy (문자열 컬럼은 코드 배열 + 어휘 목록)"""
+    columns = []
+    for i, column in enumerate(df.columns):
+        filename = f"{name}.{i}.npy"
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series):
+            np.save(os.path.join(directory, filename), series.to_numpy())
+            columns.append({"name": column, "file": filename})
+        else:
+            codes, uniques = pd.factorize(series)
+            np.save(os.path.join(directory, filename), codes.astype(np.int32))
+            columns.append({"name": column, "file": filename, "categories": [str(u) for u in uniques]})
+    return columns
+
+
+def write_snapshot(data_dir, tables, fingerprint, changes=None):
+    """
+    시뮬레이터 테이블 dict를 스냅샷 디렉터리에 저장 (임시 디렉터리에 쓴 뒤 교체)
+    changes: 증분 갱신 시 {"previous": 이전 지문, "hitters": [...], "pitchers": [...]} (캐시 선택 무효화용)
+    """
+    target = snapshot_dir(data_dir)
+    staging = target + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for name in ARRAY_TABLES:
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(tables[name]))
+
+    manifest = {
+        "fingerprint": fingerprint,
+        "hitters": sorted(tables["hitter_ids"], key=tables["hitter_ids"].get),
+        "pitchers": sorted(tables["pitcher_ids"], key=tables["pitcher_ids"].get),
+        "hitter_type_names": list(tables["hitter_type_names"]),
+        "hitter_handedness": list(tables["hitter_handedness"]),
+        "pitching_types": list(tables["pitching_types"]),
+        "frames": {name: _write_frame(staging, name, tables[name]) for name in FRAME_TABLES},
+        "changes": changes,
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return target
+
+
+# ========== 로딩 ==========
+def _read_manifest(data_dir):
+    path = os.path.join(snapshot_dir(data_dir), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_snapshot(data_dir, fingerprint):
+    """
+    유효한 스냅샷이 있으면 시뮬레이터 테이블 dict 반환 (배열은 읽기 전용 memory-map), 없으면 None
+    행 단위 DataFrame은 포함하지 않음 → load_frame으로 필요할 때 복원
+    """
+    try:
+        manifest = _read_manifest(data_dir)
+    except (OSError, ValueError):
+        return None
+    if manifest is None or manifest.get("fingerprint") != fingerprint:
+        return None
+
+    directory = snapshot_dir(data_dir)
+    tables = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in ARRAY_TABLES
+    }
+    tables.update(
+        hitter_ids={p: i for i, p in enumerate(manifest["hitters"])},
+        pitcher_ids={p: i for i, p in enumerate(manifest["pitchers"])},
+        hitter_type_names=manifest["hitter_type_names"],
+        hitter_handedness=manifest["hitter_handedness"],
+        pitching_types=manifest["pitching_types"],
+    )
+    return tables
+
+
+def snapshot_changes(data_dir):
+    """마지막 증분 갱신의 변경 내역 (없으면 None)"""
+    try:
+        manifest = _read_manifest(data_dir)
+    except (OSError, ValueError):
+        return None
+    return manifest.get("changes") if manifest else None
+
+
+def load_frame(data_dir, name):
+    """스냅샷에 저장된 행 단위 테이블 → DataFrame"""
+    manifest = _read_manifest(data_dir)
+    directory = snapshot_dir(data_dir)
+    data = {}
+    for column in manifest["frames"][name]:
+        values = np.load(os.path.join(directory, column["file"]))
+        if "categories" in column:
+            values = np.asarray(column["categories"], dtype=object)[values]
+        data[column["name"]] = values
+    return pd.DataFrame(data)
+
+
+if __name__ == "__main__":
+    import time
+
+    import final_simulation_v6 as sim
+
+    start = time.perf_counter()
+    tables = sim.load_stats_tables()
+    path = write_snapshot(sim.DATA_DIR, tables, sim.stats_fingerprint())
+    print(f"스냅샷 생성 완료: {path} ({time.perf_counter() - start:.2f}초)")
+
+    start = time.perf_counter()
+    assert load_snapshot(sim.DATA_DIR, sim.stats_fingerprint()) is not None
+    print(f"스냅샷 로딩: {(time.perf_counter() - start) * 1000:.1f}ms")